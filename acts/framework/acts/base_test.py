@@ -15,6 +15,8 @@
 # limitations under the License.
 
 import os
+import queue
+import threading
 import traceback
 
 from acts import asserts
@@ -142,6 +144,12 @@ class BaseTestClass(object):
         Implementation is optional.
         """
 
+    def _teardown_class(self):
+        """Proxy function to guarantee the base implementation of
+        teardown_class is called.
+        """
+        return self.teardown_class()
+
     def teardown_class(self):
         """Teardown function that will be called after all the selected test
         cases in the test class have been executed.
@@ -208,8 +216,25 @@ class BaseTestClass(object):
             self.log.error(record.details)
         begin_time = logger.epoch_to_log_line_timestamp(record.begin_time)
         self.log.info(RESULT_LINE_TEMPLATE, test_name, record.result)
+        self._cat_sniffer_captures(record)
         self.on_fail(test_name, begin_time)
 
+    def _cat_sniffer_captures(self, record):
+        """Takes an excerpt of the captures of the sniffers for the period of
+        a test case. Only sniffers indexing their captures take excerpts.
+
+        Args:
+            record: The records.TestResultRecord object of the test case.
+        """
+        end_time = record.end_time or utils.get_current_epoch_time()
+        for s in getattr(self, "sniffers", []):
+            try:
+                s.cat_capture(record.test_name, record.begin_time / 1000,
+                              end_time / 1000)
+            except Exception:
+                self.log.exception("Failed to take a capture excerpt of %s.",
+                                   s.get_descriptor())
+
     def on_fail(self, test_name, begin_time):
         """A function that is executed upon a test case failure.
 
@@ -330,6 +355,19 @@ class BaseTestClass(object):
             args: A tuple of params.
             kwargs: Extra kwargs.
         """
+        self._exec_one_testcase(self.results, test_name, test_func, args,
+                                kwargs)
+
+    def _exec_one_testcase(self, results, test_name, test_func, args, kwargs):
+        """Executes one test case and adds its record to results.
+
+        Args:
+            results: The records.TestResult object to add the record to.
+            test_name: Name of the test.
+            test_func: The test function.
+            args: A tuple of params.
+            kwargs: A dict of extra kwargs.
+        """
         is_generate_trigger = False
         tr_record = records.TestResultRecord(test_name, self.TAG)
         tr_record.test_begin()
@@ -372,7 +410,7 @@ class BaseTestClass(object):
         except signals.TestSilent as e:
             # This is a trigger test for generated tests, suppress reporting.
             is_generate_trigger = True
-            self.results.requested.remove(test_name)
+            results.requested.remove(test_name)
         except Exception as e:
             self.log.error(traceback.format_exc())
             # Exception happened during test.
@@ -393,7 +431,7 @@ class BaseTestClass(object):
             self._exec_procedure_func(self._on_fail, tr_record)
         finally:
             if not is_generate_trigger:
-                self.results.add_record(tr_record)
+                results.add_record(tr_record)
 
     def run_generated_testcases(self,
                                 test_func,
@@ -401,13 +439,22 @@ class BaseTestClass(object):
                                 args=None,
                                 kwargs=None,
                                 tag="",
-                                name_func=None):
+                                name_func=None,
+                                device_pool=None):
         """Runs generated test cases.
 
         Generated test cases are not written down as functions, but as a list
         of parameter sets. This way we reduce code repetition and improve
         test case scalability.
 
+        If a device_pool is provided, the generated test cases are distributed
+        across its devices: each case leases one device for its whole
+        execution, and up to one case per device runs at a time. The records
+        are added to the results in the order of the settings, whatever the
+        order the cases finish in. The cases must be independent, and
+        setup_test, teardown_test and the on_* procedures must be safe to run
+        concurrently. current_test_name is not meaningful in this mode.
+
         Args:
             test_func: The common logic shared by all these generated test
                        cases. This function should take at least one argument,
@@ -423,22 +470,23 @@ class BaseTestClass(object):
                        proper test name. The test name should be shorter than
                        utils.MAX_FILENAME_LEN. Names over the limit will be
                        truncated.
+            device_pool: A list of equivalent devices, e.g. AndroidDevice
+                         objects. If provided, the device leased by a case is
+                         passed to test_func as the keyword arg "ad".
 
         Returns:
             A list of settings that did not pass.
         """
         args = args or ()
         kwargs = kwargs or {}
+        if device_pool:
+            return self._run_generated_testcases_on_pool(
+                test_func, settings, args, kwargs, tag, name_func,
+                device_pool)
         failed_settings = []
         for s in settings:
-            test_name = "{} {}".format(tag, s)
-            if name_func:
-                try:
-                    test_name = name_func(s, *args, **kwargs)
-                except:
-                    self.log.exception(
-                        ("Failed to get test name from "
-                         "test_func. Fall back to default %s"), test_name)
+            test_name = self._get_generated_test_name(s, args, kwargs, tag,
+                                                      name_func)
             self.results.requested.append(test_name)
             if len(test_name) > utils.MAX_FILENAME_LEN:
                 test_name = test_name[:utils.MAX_FILENAME_LEN]
@@ -449,6 +497,70 @@ class BaseTestClass(object):
                 failed_settings.append(s)
         return failed_settings
 
+    def _get_generated_test_name(self, setting, args, kwargs, tag, name_func):
+        """Gets the name of a generated test case, see run_generated_testcases.
+        """
+        test_name = "{} {}".format(tag, setting)
+        if name_func:
+            try:
+                test_name = name_func(setting, *args, **kwargs)
+            except:
+                self.log.exception(
+                    ("Failed to get test name from "
+                     "test_func. Fall back to default %s"), test_name)
+        return test_name
+
+    def _run_generated_testcases_on_pool(self, test_func, settings, args,
+                                         kwargs, tag, name_func, device_pool):
+        """Runs generated test cases concurrently on a pool of devices, see
+        run_generated_testcases.
+        """
+        devices = queue.Queue()
+        for ad in device_pool:
+            devices.put(ad)
+        abort_event = threading.Event()
+        case_results = [records.TestResult() for _ in settings]
+
+        def exec_on_device(i, setting):
+            results = case_results[i]
+            test_name = self._get_generated_test_name(setting, args, kwargs,
+                                                      tag, name_func)
+            results.requested.append(test_name)
+            if len(test_name) > utils.MAX_FILENAME_LEN:
+                test_name = test_name[:utils.MAX_FILENAME_LEN]
+            ad = devices.get()
+            try:
+                case_kwargs = dict(kwargs, ad=ad)
+                self._exec_one_testcase(results, test_name, test_func,
+                                        (setting, ) + args, case_kwargs)
+            except (signals.TestAbortClass, signals.TestAbortAll):
+                # Cases not started yet are not executed, like in serial mode.
+                abort_event.set()
+                raise
+            finally:
+                devices.put(ad)
+
+        returns = utils.concurrent_map(
+            exec_on_device,
+            list(enumerate(settings)),
+            max_workers=len(device_pool),
+            cancel_event=abort_event,
+            raise_on_error=False)
+        failed_settings = []
+        abort_signal = None
+        for setting, results, ret in zip(settings, case_results, returns):
+            self.results.requested.extend(results.requested)
+            for record in results.executed:
+                self.results.add_record(record)
+            if len(results.passed) != 1:
+                failed_settings.append(setting)
+            if (abort_signal is None and isinstance(
+                    ret, (signals.TestAbortClass, signals.TestAbortAll))):
+                abort_signal = ret
+        if abort_signal:
+            raise abort_signal
+        return failed_settings
+
     def _exec_func(self, func, *args):
         """Executes a function with exception safeguard.
 
@@ -557,7 +669,7 @@ class BaseTestClass(object):
             self.log.exception("Failed to setup %s.", self.TAG)
             class_record.test_fail(e)
             self._exec_procedure_func(self._on_fail, class_record)
-            self._exec_func(self.teardown_class)
+            self._exec_func(self._teardown_class)
             self.results.fail_class(class_record)
             return self.results
         # Run tests in order.
@@ -573,7 +685,7 @@ class BaseTestClass(object):
             setattr(e, "results", self.results)
             raise e
         finally:
-            self._exec_func(self.teardown_class)
+            self._exec_func(self._teardown_class)
             self.log.info("Summary for test class %s: %s", self.TAG,
                           self.results.summary_str())
 
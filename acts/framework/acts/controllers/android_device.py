@@ -19,6 +19,8 @@ from builtins import open
 
 import logging
 import os
+import shutil
+import threading
 import time
 
 from acts import logger as acts_logger
@@ -28,6 +30,7 @@ from acts.controllers import adb
 from acts.controllers import event_dispatcher
 from acts.controllers import fastboot
 from acts.controllers import sl4a_client
+from acts.controllers.utils_lib import logcat
 
 ACTS_CONTROLLER_CONFIG_NAME = "AndroidDevice"
 ACTS_CONTROLLER_REFERENCE_NAME = "android_devices"
@@ -35,8 +38,24 @@ ACTS_CONTROLLER_REFERENCE_NAME = "android_devices"
 ANDROID_DEVICE_PICK_ALL_TOKEN = "*"
 # Key name for adb logcat extra params in config file.
 ANDROID_DEVICE_ADB_LOGCAT_PARAM_KEY = "adb_logcat_param"
+# Key name for the adb logcat segment size in config file. If set, adb logcat
+# is written to size-rotated, compressed segments.
+ANDROID_DEVICE_ADB_LOGCAT_SEGMENT_SIZE_KEY = "adb_logcat_segment_size"
+# Key name for the max number of adb logcat segments kept in config file.
+ANDROID_DEVICE_ADB_LOGCAT_MAX_SEGMENTS_KEY = "adb_logcat_max_segments"
 ANDROID_DEVICE_EMPTY_CONFIG_MSG = "Configuration is empty, abort!"
 ANDROID_DEVICE_NOT_LIST_CONFIG_MSG = "Configuration should be a list, abort!"
+# A bug report requested within this many seconds after the previous one on
+# the same device is skipped if the previous one was taken after the test
+# started, since it covers the same failure window.
+BUG_REPORT_DEDUP_WINDOW = 60
+# Max total size in bytes of the bug reports taken in one test run. Once
+# reached, no more bug reports are taken.
+MAX_BUG_REPORT_TOTAL_SIZE = 4 * 1024**3
+
+# Total size in bytes of the bug reports taken so far in this test run.
+_bug_report_total_size = 0
+_bug_report_lock = threading.Lock()
 
 
 class AndroidDeviceError(signals.ControllerError):
@@ -290,7 +309,22 @@ def take_bug_reports(ads, test_name, begin_time):
         ad.take_bug_report(test_name, begin_time)
 
     args = [(test_name, begin_time, ad) for ad in ads]
-    utils.concurrent_exec(take_br, args)
+    results = utils.concurrent_map(take_br, args, raise_on_error=False)
+    for ad, result in zip(ads, results):
+        if isinstance(result, Exception):
+            ad.log.error("Failed to take a bug report for %s: %s", test_name,
+                         result)
+
+
+def _get_bug_report_compressor():
+    """Gets the command used to compress legacy text bug reports as they are
+    streamed to disk, and the extension of its output.
+
+    zstd is preferred for its speed if it is installed on the host.
+    """
+    if shutil.which("zstd"):
+        return "zstd -q -c", ".zst"
+    return "gzip -c", ".gz"
 
 
 class AndroidDevice:
@@ -313,7 +347,11 @@ class AndroidDevice:
              AndroidDevice instance.
         adb_logcat_process: A process that collects the adb logcat.
         adb_logcat_file_path: A string that's the full path to the adb logcat
-                              file collected, if any.
+                              file collected, if any. With a rotating adb
+                              logcat, the segments are named after it.
+        adb_logcat_rotator: A logcat.RotatingLogcat writing the adb logcat to
+                            rotated segments, if adb_logcat_segment_size is
+                            configured.
         adb: An AdbProxy object used for interacting with the device via adb.
         fastboot: A FastbootProxy object used for interacting with the device
                   via fastboot.
@@ -332,6 +370,8 @@ class AndroidDevice:
         self._event_dispatchers = {}
         self.adb_logcat_process = None
         self.adb_logcat_file_path = None
+        self.adb_logcat_rotator = None
+        self._last_bug_report = None
         self.adb = adb.AdbProxy(serial)
         self.fastboot = fastboot.FastbootProxy(serial)
         if not self.is_bootloader:
@@ -584,6 +624,10 @@ class AndroidDevice:
         tag = tag[:tag_len]
         out_name = tag + out_name
         full_adblog_path = os.path.join(adb_excerpt_path, out_name)
+        if self.adb_logcat_rotator:
+            with open(full_adblog_path, 'w', encoding='utf-8') as out:
+                self.adb_logcat_rotator.cat(begin_time, end_time, out)
+            return
         with open(full_adblog_path, 'w', encoding='utf-8') as out:
             in_file = self.adb_logcat_file_path
             with open(in_file, 'r', encoding='utf-8', errors='replace') as f:
@@ -612,6 +656,11 @@ class AndroidDevice:
     def start_adb_logcat(self):
         """Starts a standing adb logcat collection in separate subprocesses and
         save the logcat in a file.
+
+        If adb_logcat_segment_size is set in the device config, the logcat is
+        read in-process and written to segments of that many bytes instead.
+        Full segments are compressed and only the newest
+        adb_logcat_max_segments segments are kept.
         """
         if self.is_adb_logcat_on:
             raise AndroidDeviceError(("Android device {} already has an adb "
@@ -626,6 +675,21 @@ class AndroidDevice:
             extra_params = self.adb_logcat_param
         except AttributeError:
             extra_params = "-b all"
+        segment_size = getattr(self,
+                               ANDROID_DEVICE_ADB_LOGCAT_SEGMENT_SIZE_KEY, None)
+        if segment_size:
+            if not self.adb_logcat_rotator:
+                max_segments = getattr(
+                    self, ANDROID_DEVICE_ADB_LOGCAT_MAX_SEGMENTS_KEY,
+                    logcat.DEFAULT_MAX_SEGMENTS)
+                cmd = "adb -s {} logcat -v threadtime {}".format(
+                    self.serial, extra_params)
+                self.adb_logcat_rotator = logcat.RotatingLogcat(
+                    cmd, self.log_path, os.path.splitext(f_name)[0],
+                    int(segment_size), int(max_segments))
+            self.adb_logcat_process = self.adb_logcat_rotator.start()
+            self.adb_logcat_file_path = logcat_file_path
+            return
         cmd = "adb -s {} logcat -v threadtime {} >> {}".format(
             self.serial, extra_params, logcat_file_path)
         self.adb_logcat_process = utils.start_standing_subprocess(cmd)
@@ -638,16 +702,44 @@ class AndroidDevice:
             raise AndroidDeviceError(
                 "Android device %s does not have an ongoing adb logcat collection."
                 % self.serial)
-        utils.stop_standing_subprocess(self.adb_logcat_process)
+        if self.adb_logcat_rotator:
+            # Keep the rotator, so excerpts can still be taken and a restart
+            # continues the segment numbering.
+            self.adb_logcat_rotator.stop()
+        else:
+            utils.stop_standing_subprocess(self.adb_logcat_process)
         self.adb_logcat_process = None
 
     def take_bug_report(self, test_name, begin_time):
         """Takes a bug report on the device and stores it in a file.
 
+        Legacy text bug reports are compressed while being written. The bug
+        report is skipped if one was taken on this device less than
+        BUG_REPORT_DEDUP_WINDOW seconds ago and after begin_time, or if the
+        bug reports of this test run already reached
+        MAX_BUG_REPORT_TOTAL_SIZE.
+
         Args:
             test_name: Name of the test case that triggered this bug report.
             begin_time: Logline format timestamp taken when the test started.
         """
+        global _bug_report_total_size
+        if self._last_bug_report and acts_logger.is_valid_logline_timestamp(
+                begin_time):
+            last_time, last_begin_time, last_path = self._last_bug_report
+            elapsed = time.time() - last_time
+            # A report taken before this test started misses its failure.
+            if (elapsed < BUG_REPORT_DEDUP_WINDOW and
+                    acts_logger.logline_timestamp_comparator(
+                        last_begin_time, begin_time) >= 0):
+                self.log.info("Skipping bugreport for %s, %s taken %ds ago "
+                              "covers it.", test_name, last_path, elapsed)
+                return
+        if _bug_report_total_size >= MAX_BUG_REPORT_TOTAL_SIZE:
+            self.log.warning("Skipping bugreport for %s, bug reports of this "
+                             "run already take %d bytes.", test_name,
+                             _bug_report_total_size)
+            return
         new_br = True
         try:
             stdout = self.adb.shell("bugreportz -v").decode("utf-8")
@@ -662,21 +754,32 @@ class AndroidDevice:
         base_name = ",{},{}.txt".format(begin_time, self.serial)
         if new_br:
             base_name = base_name.replace(".txt", ".zip")
+        else:
+            compress_cmd, ext = _get_bug_report_compressor()
+            base_name += ext
         test_name_len = utils.MAX_FILENAME_LEN - len(base_name)
         out_name = test_name[:test_name_len] + base_name
-        full_out_path = os.path.join(br_path, out_name.replace(' ', '\ '))
+        full_out_path = os.path.join(br_path, out_name)
+        escaped_out_path = full_out_path.replace(' ', '\\ ')
         # in case device restarted, wait for adb interface to return
         self.wait_for_boot_completion()
         self.log.info("Taking bugreport for %s.", test_name)
+        report_begin_time = acts_logger.get_log_line_timestamp()
         if new_br:
             out = self.adb.shell("bugreportz").decode("utf-8")
             if not out.startswith("OK"):
                 raise AndroidDeviceError("Failed to take bugreport on %s: %s" %
                                          (self.serial, out))
             br_out_path = out.split(':')[1].strip()
-            self.adb.pull("%s %s" % (br_out_path, full_out_path))
+            self.adb.pull("%s %s" % (br_out_path, escaped_out_path))
         else:
-            self.adb.bugreport(" > {}".format(full_out_path))
+            self.adb.bugreport(" | {} > {}".format(compress_cmd,
+                                                   escaped_out_path))
+        self._last_bug_report = (time.time(), report_begin_time,
+                                 full_out_path)
+        if os.path.exists(full_out_path):
+            with _bug_report_lock:
+                _bug_report_total_size += os.path.getsize(full_out_path)
         self.log.info("Bugreport for %s taken at %s.", test_name,
                       full_out_path)
 
@@ -14,14 +14,23 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import bisect
+import collections
+import decimal
 import importlib
 import logging
+import math
+import threading
+import time
 
 from acts.keys import Config
 
 ACTS_CONTROLLER_CONFIG_NAME = "Attenuator"
 ACTS_CONTROLLER_REFERENCE_NAME = "attenuators"
 
+# Default number of seconds between two updates of an AttenuatorSweep.
+DEFAULT_SWEEP_INTERVAL = 0.1
+
 
 def create(configs):
     objs = []
@@ -125,6 +134,11 @@ class AttenuatorInstrument(object):
         self.num_atten = num_atten
         self.max_atten = AttenuatorInstrument.INVALID_MAX_ATTEN
         self.properties = None
+        # Write-through cache of the last known value of each attenuator, shared by all the
+        # Attenuator objects on this instrument.
+        self.atten_cache = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def set_atten(self, idx, value):
         r"""This function sets the attenuation of an attenuator given its index in the instrument.
@@ -142,6 +156,20 @@ class AttenuatorInstrument(object):
         """
         raise NotImplementedError("Base class should not be called directly!")
 
+    def set_atten_multi(self, values):
+        r"""This function sets the attenuation of several attenuators in the instrument.
+
+        Instruments which can set several channels at once, or accept pipelined commands, should
+        override this. The default implementation sets the attenuators one at a time.
+
+        Parameters
+        ----------
+        values : A dict mapping the zero-based index of each attenuator to set to its nominal
+        attenuation value.
+        """
+        for idx, value in sorted(values.items()):
+            self.set_atten(idx, value)
+
     def get_atten(self, idx):
         r"""This function returns the current attenuation from an attenuator at a given index in
         the instrument.
@@ -162,6 +190,68 @@ class AttenuatorInstrument(object):
         """
         raise NotImplementedError("Base class should not be called directly!")
 
+    def is_dirty(self, idx, value):
+        r"""This function checks whether setting an attenuator to a value would change it,
+        according to the cache, and counts a cache hit or miss.
+
+        Parameters
+        ----------
+        idx : This zero-based index is the identifier for a particular attenuator in an instrument.
+        value : This is a floating point value for nominal attenuation to be set.
+
+        Returns
+        -------
+        bool
+            False if the cached value of the attenuator is already the value.
+        """
+        if self.atten_cache.get(idx) == value:
+            self.cache_hits += 1
+            return False
+        self.cache_misses += 1
+        return True
+
+    def get_cached_atten(self, idx, refresh=False):
+        r"""This function returns the current attenuation of an attenuator, from the cache if
+        its value is known.
+
+        Parameters
+        ----------
+        idx : This zero-based index is the identifier for a particular attenuator in an instrument.
+        refresh : If True, the instrument is always queried and the cache updated.
+
+        Returns
+        -------
+        float
+            Returns a the current attenuation value
+        """
+        if not refresh and idx in self.atten_cache:
+            self.cache_hits += 1
+            return self.atten_cache[idx]
+        self.cache_misses += 1
+        value = self.get_atten(idx)
+        self.atten_cache[idx] = value
+        return value
+
+    def resync(self):
+        r"""This function queries the value of every attenuator of the instrument into the cache.
+
+        This should be called if the attenuators may have been changed outside of this object,
+        e.g. by another host or through the instrument front panel.
+        """
+        self.atten_cache.clear()
+        for idx in range(self.num_atten):
+            self.atten_cache[idx] = self.get_atten(idx)
+
+    def get_cache_stats(self):
+        r"""This function returns the number of cache hits and misses.
+
+        Returns
+        -------
+        dict
+            The number of hits and misses of the cache.
+        """
+        return {"hits": self.cache_hits, "misses": self.cache_misses}
+
 
 class Attenuator(object):
     r"""This class defines an object representing a single attenuator in a remote instrument.
@@ -222,19 +312,29 @@ class Attenuator(object):
             raise ValueError(
                 "Attenuator Value+Offset greater than Max Attenuation!")
 
-        self.instrument.set_atten(self.idx, value + self.offset)
+        value += self.offset
+        if not self.instrument.is_dirty(self.idx, value):
+            return
+        # The value is unknown if the command fails midway.
+        self.instrument.atten_cache.pop(self.idx, None)
+        self.instrument.set_atten(self.idx, value)
+        self.instrument.atten_cache[self.idx] = value
 
-    def get_atten(self):
+    def get_atten(self, refresh=False):
         r"""This function returns the current attenuation setting of Attenuator, normalized by
         the set offset.
 
+        Parameters
+        ----------
+        refresh : If True, the instrument is queried even if the value is cached.
+
         Returns
         -------
         float
             Returns a the current attenuation value
         """
 
-        return self.instrument.get_atten(self.idx) - self.offset
+        return self.instrument.get_cached_atten(self.idx, refresh) - self.offset
 
     def get_max_atten(self):
         r"""This function returns the max attenuation setting of Attenuator, normalized by
@@ -251,6 +351,24 @@ class Attenuator(object):
 
         return self.instrument.max_atten - self.offset
 
+    def sweep(self, profile, interval=DEFAULT_SWEEP_INTERVAL, resolution=None):
+        r"""This function starts applying an attenuation profile in the background.
+
+        Parameters
+        ----------
+        profile : The AttenuationProfile to apply.
+        interval : The number of seconds between two updates.
+        resolution : If set, values are rounded to a multiple of it.
+
+        Returns
+        -------
+        AttenuatorSweep
+            The started sweep, to wait for or stop.
+        """
+        sweep = AttenuatorSweep([(self, profile)], interval, resolution)
+        sweep.start()
+        return sweep
+
 
 class AttenuatorGroup(object):
     r"""This is a handy abstraction for groups of attenuators that will share behavior.
@@ -332,10 +450,14 @@ class AttenuatorGroup(object):
 
         self.set_atten(self._value)
 
-    def is_synchronized(self):
+    def is_synchronized(self, refresh=False):
         r"""This function queries all the Attenuators in the group to determine whether or not
         they are synchronized.
 
+        Parameters
+        ----------
+        refresh : If True, the instruments are queried even for the cached values.
+
         Returns
         -------
         bool
@@ -343,7 +465,7 @@ class AttenuatorGroup(object):
         """
 
         for att in self.attens:
-            if att.get_atten() != self._value:
+            if att.get_atten(refresh) != self._value:
                 return False
         return True
 
@@ -361,8 +483,20 @@ class AttenuatorGroup(object):
         """
 
         value = float(value)
+        # Attenuators of the same instrument are set in one go.
+        values_by_instrument = collections.OrderedDict()
         for att in self.attens:
-            att.set_atten(value)
+            if value + att.offset > att.instrument.max_atten:
+                raise ValueError(
+                    "Attenuator Value+Offset greater than Max Attenuation!")
+            if att.instrument.is_dirty(att.idx, value + att.offset):
+                values = values_by_instrument.setdefault(att.instrument, {})
+                values[att.idx] = value + att.offset
+        for instrument, values in values_by_instrument.items():
+            for idx in values:
+                instrument.atten_cache.pop(idx, None)
+            instrument.set_atten_multi(values)
+            instrument.atten_cache.update(values)
         self._value = value
 
     def get_atten(self):
@@ -380,3 +514,233 @@ class AttenuatorGroup(object):
         """
 
         return float(self._value)
+
+    def sweep(self, profile, interval=DEFAULT_SWEEP_INTERVAL, resolution=None):
+        r"""This function starts applying an attenuation profile in the background.
+
+        Parameters
+        ----------
+        profile : The AttenuationProfile to apply.
+        interval : The number of seconds between two updates.
+        resolution : If set, values are rounded to a multiple of it.
+
+        Returns
+        -------
+        AttenuatorSweep
+            The started sweep, to wait for or stop.
+        """
+        sweep = AttenuatorSweep([(self, profile)], interval, resolution)
+        sweep.start()
+        return sweep
+
+
+class AttenuationProfile(object):
+    r"""This class defines attenuation values over time, for use with AttenuatorSweep.
+
+    The profile is defined by waypoints. Between two waypoints, the value is either linearly
+    interpolated, or held at the value of the earlier waypoint.
+    """
+
+    def __init__(self, waypoints, interpolate=True):
+        r"""This is the constructor for AttenuationProfile
+
+        Parameters
+        ----------
+        waypoints : A list of (time, value) tuples, time being the number of seconds since the
+        beginning of the profile. The first waypoint should be at time 0.
+        interpolate : If True, values between waypoints are linearly interpolated. Otherwise the
+        value of the earlier waypoint is held until the next one.
+        """
+        self.waypoints = sorted(waypoints)
+        self.interpolate = interpolate
+
+    @property
+    def duration(self):
+        r"""The number of seconds from the beginning to the last waypoint."""
+        return self.waypoints[-1][0]
+
+    def value_at(self, t):
+        r"""This function returns the value of the profile at a given time.
+
+        Parameters
+        ----------
+        t : The number of seconds since the beginning of the profile.
+
+        Returns
+        -------
+        float
+            The attenuation value at time t. The last value is held after the end.
+        """
+        times = [w[0] for w in self.waypoints]
+        i = bisect.bisect_right(times, t)
+        if i == 0:
+            return self.waypoints[0][1]
+        if i == len(self.waypoints) or not self.interpolate:
+            return self.waypoints[i - 1][1]
+        (t0, v0), (t1, v1) = self.waypoints[i - 1], self.waypoints[i]
+        return v0 + (v1 - v0) * (t - t0) / (t1 - t0)
+
+
+class SinusoidalProfile(AttenuationProfile):
+    r"""This class defines a sinusoidal attenuation over time, emulating a slow fading channel.
+    """
+
+    def __init__(self, center, amplitude, period, duration):
+        r"""This is the constructor for SinusoidalProfile
+
+        Parameters
+        ----------
+        center : The attenuation value the sine wave is centered on.
+        amplitude : The max deviation from the center value.
+        period : The number of seconds of one full cycle.
+        duration : The number of seconds of the profile.
+        """
+        super(SinusoidalProfile, self).__init__([(0, center), (duration, center)])
+        self.center = center
+        self.amplitude = amplitude
+        self.period = period
+
+    def value_at(self, t):
+        t = min(max(t, 0), self.duration)
+        return self.center + self.amplitude * math.sin(2 * math.pi * t / self.period)
+
+
+def linear_profile(start, end, duration):
+    r"""This function returns a profile going linearly from start to end in duration seconds.
+    """
+    return AttenuationProfile([(0, start), (duration, end)])
+
+
+def stepped_profile(start, end, step_size, time_per_step):
+    r"""This function returns a profile going from start towards end by steps of step_size
+    every time_per_step seconds, then to end after the last full step.
+
+    The first step is applied right away.
+    """
+    number_of_steps = int(abs(end - start) / step_size)
+    step = math.copysign(step_size, end - start)
+    waypoints = [(i * time_per_step, start + (i + 1) * step)
+                 for i in range(number_of_steps)]
+    waypoints.append((number_of_steps * time_per_step, end))
+    return AttenuationProfile(waypoints, interpolate=False)
+
+
+class AttenuatorSweep(object):
+    r"""This class runs attenuation profiles on Attenuators or AttenuatorGroups in a background
+    thread.
+
+    All targets of a sweep are updated in lockstep: at every tick, the value of each profile at
+    the tick time is set on its target. Ticks are scheduled against a monotonic clock from the
+    start of the sweep, so the latency of the set commands does not make the sweep drift. A
+    target is only written when its value changes. Late ticks are skipped rather than queued.
+
+    Attributes
+    ----------
+    trace : A list of (scheduled_time, set_time, target, value) tuples for every value set,
+    times being the number of seconds since the start of the sweep.
+    """
+
+    def __init__(self, targets, interval=DEFAULT_SWEEP_INTERVAL, resolution=None):
+        r"""This is the constructor for AttenuatorSweep
+
+        Parameters
+        ----------
+        targets : A list of (target, profile) tuples. A target is an Attenuator or an
+        AttenuatorGroup, a profile an AttenuationProfile.
+        interval : The number of seconds between two ticks.
+        resolution : If set, values are rounded to a multiple of it, e.g. the attenuator step.
+        """
+        self.targets = targets
+        self.interval = interval
+        self.resolution = resolution
+        # Multiples of the resolution are rounded to its number of decimals, so float errors
+        # like 0.30000000000000004 are not sent to the instruments.
+        self._decimals = 0
+        if resolution:
+            self._decimals = max(0, -decimal.Decimal(str(resolution)).as_tuple().exponent)
+        self.trace = []
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._error = None
+
+    @property
+    def duration(self):
+        r"""The number of seconds of the longest profile."""
+        return max(profile.duration for _, profile in self.targets)
+
+    def start(self):
+        r"""This function starts the sweep in a background thread."""
+        if self._thread:
+            raise InvalidOperationError("Sweep already started!")
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        r"""This function stops the sweep and waits for the background thread to end."""
+        self._stop_event.set()
+        if self._thread:
+            self.wait()
+
+    def wait(self, timeout=None):
+        r"""This function waits for the sweep to finish.
+
+        Parameters
+        ----------
+        timeout : The max number of seconds to wait. Never times out if None.
+
+        Returns
+        -------
+        bool
+            True if the sweep finished.
+
+        Raises
+        ------
+        InvalidOperationError
+            The sweep was not started.
+        Exception
+            The exception that ended the sweep, if setting a value failed.
+        """
+        if not self._thread:
+            raise InvalidOperationError("Sweep not started!")
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            return False
+        if self._error:
+            raise self._error
+        return True
+
+    def run(self):
+        r"""This function runs the sweep and blocks until it finishes."""
+        self.start()
+        self.wait()
+
+    def _run(self):
+        last_values = [None] * len(self.targets)
+        begin_time = time.monotonic()
+        duration = self.duration
+        tick = 0
+        try:
+            while not self._stop_event.is_set():
+                scheduled_time = min(tick * self.interval, duration)
+                for i, (target, profile) in enumerate(self.targets):
+                    value = profile.value_at(scheduled_time)
+                    if self.resolution:
+                        value = round(round(value / self.resolution) * self.resolution,
+                                      self._decimals)
+                    if value == last_values[i]:
+                        continue
+                    target.set_atten(value)
+                    last_values[i] = value
+                    self.trace.append((scheduled_time, time.monotonic() - begin_time,
+                                       target, value))
+                if scheduled_time >= duration:
+                    break
+                # Skip the ticks already missed, and wait for the next one.
+                elapsed = time.monotonic() - begin_time
+                tick = max(tick + 1, int(elapsed / self.interval) + 1)
+                self._stop_event.wait(tick * self.interval - elapsed)
+        except Exception as e:
+            logging.exception("Attenuator sweep failed.")
+            self._error = e
+        logging.debug("Attenuator sweep trace: %s", self.trace)
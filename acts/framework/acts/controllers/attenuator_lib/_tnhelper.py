@@ -40,6 +40,10 @@ class _TNHelper(object):
         self.tx_cmd_separator = tx_cmd_separator
         self.rx_cmd_separator = rx_cmd_separator
         self.prompt = prompt
+        # Number of prompts the instrument sent or will send that were not read
+        # yet. Pipelined commands leave one prompt each, which are read before
+        # the next write.
+        self._pending_prompts = 0
 
     def open(self, host, port=23):
         if self._tn:
@@ -47,6 +51,7 @@ class _TNHelper(object):
 
         self._tn = telnetlib.Telnet()
         self._tn.open(host, port, 10)
+        self._pending_prompts = 1
 
     def is_open(self):
         return bool(self._tn)
@@ -56,20 +61,24 @@ class _TNHelper(object):
             self._tn.close()
             self._tn = None
 
-    def cmd(self, cmd_str, wait_ret=True):
-        if not isinstance(cmd_str, str):
-            raise TypeError("Invalid command string", cmd_str)
+    def _check_cmds(self, cmd_strs):
+        for cmd_str in cmd_strs:
+            if not isinstance(cmd_str, str):
+                raise TypeError("Invalid command string", cmd_str)
 
         if not self.is_open():
             raise attenuator.InvalidOperationError("Telnet connection not open for commands")
 
-        cmd_str.strip(self.tx_cmd_separator)
+    def _write(self, cmd_strs):
+        while self._pending_prompts > 1:
+            self._tn.read_until(_ascii_string(self.prompt), 2)
+            self._pending_prompts -= 1
         self._tn.read_until(_ascii_string(self.prompt), 2)
-        self._tn.write(_ascii_string(cmd_str+self.tx_cmd_separator))
-
-        if wait_ret is False:
-            return None
+        self._tn.write(_ascii_string("".join(
+            cmd_str + self.tx_cmd_separator for cmd_str in cmd_strs)))
+        self._pending_prompts = len(cmd_strs)
 
+    def _read_ret(self):
         match_idx, match_val, ret_text = \
             self._tn.expect([_ascii_string("\S+"+self.rx_cmd_separator)], 1)
 
@@ -80,3 +89,47 @@ class _TNHelper(object):
         ret_text = ret_text.strip(self.tx_cmd_separator + self.rx_cmd_separator + self.prompt)
 
         return ret_text
+
+    def cmd(self, cmd_str, wait_ret=True):
+        self._check_cmds([cmd_str])
+
+        cmd_str.strip(self.tx_cmd_separator)
+        self._write([cmd_str])
+
+        if wait_ret is False:
+            return None
+
+        return self._read_ret()
+
+    def cmds(self, cmd_strs, wait_ret=True):
+        """Sends several commands in a single write, without waiting for the
+        response of a command before sending the next one.
+
+        This saves a round trip per command, but should only be used with
+        instruments that queue the commands received back to back.
+
+        Args:
+            cmd_strs: A list of command strings.
+            wait_ret: If True, read the responses of all the commands after
+                sending them. Otherwise the prompts that follow the commands
+                are read before the next write.
+
+        Returns:
+            A list of the responses in the order of the commands, None if
+            wait_ret is False.
+        """
+        self._check_cmds(cmd_strs)
+
+        if not cmd_strs:
+            return [] if wait_ret else None
+
+        self._write(cmd_strs)
+
+        if wait_ret is False:
+            return None
+
+        rets = [self._read_ret() for _ in cmd_strs]
+        # Reading the responses consumed the prompts in between, only the one
+        # after the last response is left.
+        self._pending_prompts = 1
+        return rets
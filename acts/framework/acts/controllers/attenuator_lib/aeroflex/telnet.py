@@ -50,6 +50,8 @@ class AttenuatorInstrument(attenuator.AttenuatorInstrument):
         instrument.
         port : An optional port number (defaults to telnet default 23)
         """
+        # The instrument may have been changed or power cycled since the cache was filled.
+        self.atten_cache.clear()
         self._tnhelper.open(host, port)
 
         # work around a bug in IO, but this is a good thing to do anyway
@@ -85,6 +87,7 @@ class AttenuatorInstrument(attenuator.AttenuatorInstrument):
         instrument leaving scope.
         """
 
+        self.atten_cache.clear()
         self._tnhelper.close()
 
     def set_atten(self, idx, value):
@@ -120,6 +123,40 @@ class AttenuatorInstrument(attenuator.AttenuatorInstrument):
 
         self._tnhelper.cmd("ATTN " + str(idx+1) + " " + str(value), False)
 
+    def set_atten_multi(self, values):
+        r"""This function sets the attenuation of several attenuators in the instrument.
+
+        The commands are written at once without waiting for the instrument in between.
+
+        Parameters
+        ----------
+        values : A dict mapping the zero-based index of each attenuator to set to its nominal
+        attenuation value.
+
+        Raises
+        ------
+        InvalidOperationError
+            This error occurs if the underlying telnet connection to the instrument is not open.
+        IndexError
+            If the index of an attenuator is greater than the maximum index of the underlying
+            instrument, this error will be thrown.
+        ValueError
+            If a requested set value is greater than the maximum attenuation value, this error
+            will be thrown.
+        """
+
+        if not self.is_open():
+            raise attenuator.InvalidOperationError("Connection not open!")
+
+        for idx, value in values.items():
+            if idx >= self.num_atten:
+                raise IndexError("Attenuator index out of range!", self.num_atten, idx)
+            if value > self.max_atten:
+                raise ValueError("Attenuator value out of range!", self.max_atten, value)
+
+        self._tnhelper.cmds(["ATTN " + str(idx+1) + " " + str(value)
+                             for idx, value in sorted(values.items())], False)
+
     def get_atten(self, idx):
         r"""This function returns the current attenuation from an attenuator at a given index in
         the instrument.
@@ -59,6 +59,8 @@ class AttenuatorInstrument(attenuator.AttenuatorInstrument):
         port : An optional port number (defaults to telnet default 23)
         """
 
+        # The instrument may have been changed or power cycled since the cache was filled.
+        self.atten_cache.clear()
         self._tnhelper.open(host, port)
 
         if self.num_atten == 0:
@@ -91,6 +93,7 @@ class AttenuatorInstrument(attenuator.AttenuatorInstrument):
         instrument leaving scope.
         """
 
+        self.atten_cache.clear()
         self._tnhelper.close()
 
     def set_atten(self, idx, value):
@@ -125,6 +128,47 @@ class AttenuatorInstrument(attenuator.AttenuatorInstrument):
         # The actual device uses one-based index for channel numbers.
         self._tnhelper.cmd("CHAN:%s:SETATT:%s" % (idx + 1, value))
 
+    def set_atten_multi(self, values):
+        r"""This function sets the attenuation of several attenuators in the instrument.
+
+        If all the channels of the instrument are set to the same value, a single SETATT command
+        sets them at once. Otherwise the per-channel commands are pipelined, so the round trip to
+        the instrument is only paid once.
+
+        Parameters
+        ----------
+        values : A dict mapping the zero-based index of each attenuator to set to its nominal
+        attenuation value.
+
+        Raises
+        ------
+        InvalidOperationError
+            This error occurs if the underlying telnet connection to the instrument is not open.
+        IndexError
+            If the index of an attenuator is greater than the maximum index of the underlying
+            instrument, this error will be thrown.
+        ValueError
+            If a requested set value is greater than the maximum attenuation value, this error
+            will be thrown.
+        """
+
+        if not self.is_open():
+            raise attenuator.InvalidOperationError("Connection not open!")
+
+        for idx, value in values.items():
+            if idx >= self.num_atten:
+                raise IndexError("Attenuator index out of range!", self.num_atten, idx)
+            if value > self.max_atten:
+                raise ValueError("Attenuator value out of range!", self.max_atten, value)
+
+        if (self.num_atten > 1 and len(values) == self.num_atten and
+                len(set(values.values())) == 1):
+            self._tnhelper.cmd("SETATT=%s" % list(values.values())[0])
+            return
+        # The actual device uses one-based index for channel numbers.
+        self._tnhelper.cmds(["CHAN:%s:SETATT:%s" % (idx + 1, value)
+                             for idx, value in sorted(values.items())])
+
     def get_atten(self, idx):
         r"""This function returns the current attenuation from an attenuator at a given index in
         the instrument.
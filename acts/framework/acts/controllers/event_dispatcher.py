@@ -413,6 +413,34 @@ class EventDispatcher:
         finally:
             self.lock.release()
 
+    def wait_and_pop_all(self, event_name, timeout=DEFAULT_TIMEOUT):
+        """Wait for an event of a specified name, then return and remove all
+        the stored events of that name.
+
+        Unlike calling pop_event in a loop, the events queued up while the
+        caller was busy are drained at once.
+
+        Args:
+            event_name: Name of the events to be popped.
+            timeout: Number of seconds to wait when no event is present.
+                Never times out if None.
+
+        Returns:
+            results: List of the desired events, oldest first. Never empty.
+
+        Raises:
+            IllegalStateError: Raised if pop is called before the dispatcher
+                starts polling.
+            queue.Empty: Raised if no event was found before time out.
+        """
+        results = [self.pop_event(event_name, timeout)]
+        e_queue = self.get_event_q(event_name)
+        while True:
+            try:
+                results.append(e_queue.get(block=False))
+            except queue.Empty:
+                return results
+
     def clear_events(self, event_name):
         """Clear all events of a particular name.
 
@@ -14,16 +14,42 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import array
 import json
 import logging
+import math
 import os
+import re
+import socket
 import subprocess
+import time
 
 from acts import utils
 
 ACTS_CONTROLLER_CONFIG_NAME = "IPerfServer"
 ACTS_CONTROLLER_REFERENCE_NAME = "iperf_servers"
 
+# Per-interval metrics collected by IPerfStreamParser, in column order.
+INTERVAL_COLUMNS = ("start", "end", "bytes", "bits_per_second", "jitter_ms",
+                    "lost_percent")
+# Matches an interval line of iperf3 text output, e.g.
+# "[  5]   0.00-1.00   sec  1.25 MBytes  10.5 Mbits/sec  0.012 ms  0/906 (0%)"
+IPERF_INTERVAL_LINE = re.compile(
+    r"^\[\s*(?P<id>\w+)\]\s+(?P<start>[\d.]+)-(?P<end>[\d.]+)\s+sec\s+"
+    r"(?P<bytes>[\d.]+)\s+(?P<bytes_unit>[KMGT]?)Bytes\s+"
+    r"(?P<bits>[\d.]+)\s+(?P<bits_unit>[KMGT]?)bits/sec"
+    r"(?:\s+(?P<jitter>[\d.]+)\s+ms\s+\d+/\d+\s+\((?P<lost>[\d.e+-]+)%\))?")
+# Max number of seconds to wait for a server to write the result of a flow
+# after its client finished.
+IPERF_RESULT_WAIT_TIME = 5
+# Max number of seconds to wait for a server to listen after it started, and
+# seconds between two checks.
+IPERF_SERVER_LISTEN_TIMEOUT = 5
+IPERF_SERVER_LISTEN_POLL_INTERVAL = 0.05
+# Exponents of the unit prefixes of iperf3 text output, of 1024 for Bytes and
+# of 1000 for bits/sec.
+IPERF_UNIT_PREFIXES = {"": 0, "K": 1, "M": 2, "G": 3, "T": 4}
+
 
 def create(configs):
     results = []
@@ -112,6 +138,219 @@ class IPerfResult(object):
         return bps / 8 / 1024 / 1024
 
 
+class IPerfStreamParser(object):
+    """Incremental parser of an iperf3 log, read while iperf3 is running.
+
+    Supports the JSON lines output of "--json-stream", the text output and,
+    once the run is over, the single JSON document output of "-J". Only the
+    bytes appended since the previous poll are read, and the per-interval
+    metrics are kept in compact columns instead of parsed JSON objects.
+
+    Attributes:
+        result_path: The path of the iperf3 log.
+        columns: A dict mapping each of INTERVAL_COLUMNS to an array of the
+            values of every interval so far. jitter_ms and lost_percent are
+            nan for TCP.
+        error: The error reported by iperf3, None if no error.
+        ended: True if the end of the run was parsed.
+    """
+
+    def __init__(self, result_path):
+        self.result_path = result_path
+        self.columns = {c: array.array("d") for c in INTERVAL_COLUMNS}
+        self.error = None
+        self.ended = False
+        self._offset = 0
+        self._partial_line = b""
+        self._text_interval = None
+        self._unparsed_lines = []
+
+    def __len__(self):
+        return len(self.columns["start"])
+
+    def poll(self):
+        """Parses the lines appended to the log since the last poll.
+
+        Returns:
+            A list of dicts, one per new interval, keyed by INTERVAL_COLUMNS.
+        """
+        try:
+            with open(self.result_path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        self._offset += len(data)
+        lines = (self._partial_line + data).split(b"\n")
+        self._partial_line = lines.pop()
+        num_intervals = len(self)
+        for line in lines:
+            self._parse_line(line.decode("utf-8", errors="replace").strip())
+        return [self.get_interval(i) for i in range(num_intervals, len(self))]
+
+    def finish(self):
+        """Parses the rest of the log once iperf3 has exited.
+
+        Returns:
+            A list of dicts, one per new interval, keyed by INTERVAL_COLUMNS.
+        """
+        num_intervals = len(self)
+        self.poll()
+        if self._partial_line:
+            self._parse_line(self._partial_line.decode(
+                "utf-8", errors="replace").strip())
+            self._partial_line = b""
+        self._flush_text_interval()
+        if (not self.ended and not len(self) and
+                any(line.startswith("{") for line in self._unparsed_lines)):
+            # Not line based, possibly the single JSON document of "-J".
+            self._parse_document("\n".join(self._unparsed_lines))
+        self._unparsed_lines = []
+        return [self.get_interval(i) for i in range(num_intervals, len(self))]
+
+    def get_interval(self, i):
+        """Returns the metrics of an interval as a dict."""
+        return {c: self.columns[c][i] for c in INTERVAL_COLUMNS}
+
+    def _add_interval(self, start, end, num_bytes, bps, jitter=None,
+                      lost=None):
+        values = (start, end, num_bytes, bps,
+                  float("nan") if jitter is None else jitter,
+                  float("nan") if lost is None else lost)
+        for column, value in zip(INTERVAL_COLUMNS, values):
+            self.columns[column].append(value)
+
+    def _add_json_interval(self, interval):
+        total = interval.get("sum")
+        if total is None or total.get("omitted"):
+            return
+        self._add_interval(total["start"], total["end"], total["bytes"],
+                           total["bits_per_second"], total.get("jitter_ms"),
+                           total.get("lost_percent"))
+
+    def _parse_line(self, line):
+        if not line:
+            return
+        if line.startswith("{") and line.endswith("}"):
+            try:
+                event = json.loads(line)
+            except ValueError:
+                event = None
+            if isinstance(event, dict) and "event" in event:
+                self._parse_event(event)
+                return
+        match = IPERF_INTERVAL_LINE.match(line)
+        if match and not line.endswith(("sender", "receiver")):
+            self._parse_text_interval(match)
+        elif line.startswith("iperf3: error"):
+            self.error = line[len("iperf3: error - "):]
+        else:
+            self._unparsed_lines.append(line)
+
+    def _parse_event(self, event):
+        data = event.get("data")
+        if event["event"] == "interval":
+            self._add_json_interval(data)
+        elif event["event"] == "error":
+            self.error = data
+        elif event["event"] == "end":
+            self.ended = True
+
+    def _parse_text_interval(self, match):
+        start = float(match.group("start"))
+        end = float(match.group("end"))
+        num_bytes = float(match.group("bytes")) * 1024**IPERF_UNIT_PREFIXES[
+            match.group("bytes_unit")]
+        bps = float(match.group("bits")) * 1000**IPERF_UNIT_PREFIXES[
+            match.group("bits_unit")]
+        jitter = match.group("jitter")
+        lost = match.group("lost")
+        interval = [start, end, num_bytes, bps,
+                    float(jitter) if jitter else None,
+                    float(lost) if lost else None]
+        pending = self._text_interval
+        if pending and pending[:2] == interval[:2]:
+            if match.group("id") == "SUM":
+                # Replaces the per stream lines of the same interval.
+                self._text_interval = interval
+            else:
+                pending[2] += num_bytes
+                pending[3] += bps
+            return
+        self._flush_text_interval()
+        self._text_interval = interval
+
+    def _flush_text_interval(self):
+        # An interval is only complete once the next one starts, as several
+        # streams and their sum may be reported for it.
+        if self._text_interval:
+            self._add_interval(*self._text_interval)
+            self._text_interval = None
+
+    def _parse_document(self, text):
+        try:
+            result = json.loads(text[text.find("{"):])
+        except ValueError:
+            logging.warning("Failed to parse iperf3 log %s.", self.result_path)
+            return
+        self.error = result.get("error", self.error)
+        for interval in result.get("intervals", []):
+            self._add_json_interval(interval)
+        self.ended = "end" in result
+
+    def percentiles(self, column, percents=(50, 90, 99)):
+        """Computes percentiles of a metric over all the intervals so far.
+
+        Args:
+            column: One of INTERVAL_COLUMNS.
+            percents: The percentiles to compute, between 0 and 100.
+
+        Returns:
+            A dict mapping each percentile to its value, None if there is no
+            value for the metric.
+        """
+        values = sorted(v for v in self.columns[column] if not math.isnan(v))
+        return {p: utils.percentile(values, p) for p in percents}
+
+    def summary(self, percents=(50, 90, 99)):
+        """Summarizes throughput, jitter and loss over all the intervals.
+
+        Returns:
+            A dict mapping "bits_per_second", "jitter_ms" and "lost_percent"
+            to a dict with the "min", "max", "mean" and percentiles of the
+            metric. The metrics without values are skipped.
+        """
+        result = {}
+        for column in ("bits_per_second", "jitter_ms", "lost_percent"):
+            values = [v for v in self.columns[column] if not math.isnan(v)]
+            if not values:
+                continue
+            stats = self.percentiles(column, percents)
+            stats.update({"min": min(values), "max": max(values),
+                          "mean": sum(values) / len(values)})
+            result[column] = stats
+        return result
+
+    @property
+    def avg_rate(self):
+        """Average rate in MB/s over the intervals so far, None if there is
+        no interval yet.
+        """
+        if not len(self):
+            return None
+        duration = self.columns["end"][-1] - self.columns["start"][0]
+        if duration <= 0:
+            return None
+        return sum(self.columns["bytes"]) / duration / 1024 / 1024
+
+    def export_csv(self, out_path):
+        """Writes the metrics of every interval to a csv file."""
+        with open(out_path, "w") as f:
+            f.write(",".join(INTERVAL_COLUMNS) + "\n")
+            for row in zip(*(self.columns[c] for c in INTERVAL_COLUMNS)):
+                f.write(",".join(repr(v) for v in row) + "\n")
+
+
 class IPerfServer():
     """Class that handles iperf3 operations.
     """
@@ -146,7 +385,194 @@ class IPerfServer():
         self.log_files.append(full_out_path)
         self.started = True
 
+    def get_stream_parser(self):
+        """Returns an IPerfStreamParser of the log of the current or last
+        iperf run, None if the server has never been started.
+
+        Start the server with extra_args "--json-stream" to get interval
+        results while iperf runs.
+        """
+        if not self.log_files:
+            return None
+        return IPerfStreamParser(self.log_files[-1])
+
+    def wait_for_listening(self, timeout=IPERF_SERVER_LISTEN_TIMEOUT):
+        """Waits for the started server to listen on its port.
+
+        With "-J" the server writes nothing before the end of a run, so the
+        port is checked instead of the log.
+
+        Returns:
+            True if the server listens, False if it exited or timed out.
+        """
+        deadline = time.time() + timeout
+        while self.started and self.iperf_process.poll() is None:
+            if _is_port_listening(self.port):
+                return True
+            if time.time() > deadline:
+                break
+            time.sleep(IPERF_SERVER_LISTEN_POLL_INTERVAL)
+        logging.error("iperf server on port %d is not listening.", self.port)
+        return False
+
     def stop(self):
         if self.started:
             utils.stop_standing_subprocess(self.iperf_process)
             self.started = False
+
+
+def _is_port_listening(port):
+    """Checks if a socket listens on a local port, by failing to bind it.
+
+    Connecting instead would start a test on an iperf server.
+    """
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        s.bind(("", port))
+        return False
+    except socket.error:
+        return True
+    finally:
+        s.close()
+
+
+class IPerfServerPool(object):
+    """A pool of iperf3 servers on a range of ports, to measure several
+    simultaneous flows from different clients.
+
+    Attributes:
+        servers: The IPerfServer objects of the pool, one per port.
+    """
+
+    def __init__(self, ports, log_path):
+        """
+        Args:
+            ports: An iterable of the ports to run servers on.
+            log_path: The directory the server logs are written under.
+        """
+        self.servers = [IPerfServer(port, log_path) for port in ports]
+
+    def __len__(self):
+        return len(self.servers)
+
+    def stop(self):
+        """Stops all the servers of the pool."""
+        for server in self.servers:
+            server.stop()
+
+    def assign(self, clients):
+        """Assigns a server to each client, in order.
+
+        Args:
+            clients: A list of clients, e.g. AndroidDevice objects.
+
+        Returns:
+            A list of (client, server) tuples.
+
+        Raises:
+            ValueError is raised if there are more clients than servers.
+        """
+        if len(clients) > len(self.servers):
+            raise ValueError("{} clients but only {} iperf servers.".format(
+                len(clients), len(self.servers)))
+        return list(zip(clients, self.servers))
+
+    def run_clients(self, clients, server_host, extra_args="", tag="",
+                    timeout=None):
+        """Runs iperf clients simultaneously, each against its own server.
+
+        Each assigned server is restarted with a new log file. Once they all
+        listen, every client runs AndroidDevice.run_iperf_client
+        concurrently against the port of its server.
+
+        Args:
+            clients: A list of objects with a run_iperf_client method, e.g.
+                AndroidDevice objects.
+            server_host: Address of the iperf servers as seen by the clients.
+            extra_args: A string representing extra arguments for the
+                clients, e.g. "-i 1 -t 30".
+            tag: Appended to the server log file names.
+            timeout: The max number of seconds to wait for all the clients.
+                Never times out if None.
+
+        Returns:
+            An IPerfPoolResult.
+        """
+        assignments = self.assign(clients)
+        for _, server in assignments:
+            server.stop()
+            server.start(tag=tag)
+        try:
+            # Clients started before their server listens get "connection
+            # refused". The servers start concurrently, so the waits overlap.
+            for _, server in assignments:
+                server.wait_for_listening()
+            client_results = utils.concurrent_map(
+                lambda client, server: client.run_iperf_client(
+                    server_host, "-p {} {}".format(server.port, extra_args)),
+                assignments,
+                timeout=timeout,
+                raise_on_error=False)
+            server_results = [_wait_for_iperf_result(server)
+                              for _, server in assignments]
+        finally:
+            for _, server in assignments:
+                server.stop()
+        return IPerfPoolResult(assignments, client_results, server_results)
+
+
+class IPerfPoolResult(object):
+    """The results of simultaneous flows run by IPerfServerPool.run_clients.
+
+    Attributes:
+        clients: The clients, in order.
+        client_results: The (status, output) tuple returned by each client,
+            or the exception it raised.
+        server_results: The IPerfResult of each flow on the server side, None
+            if the server wrote no valid result.
+    """
+
+    def __init__(self, assignments, client_results, server_results):
+        self.clients = [client for client, _ in assignments]
+        self.client_results = client_results
+        self.server_results = server_results
+
+    @property
+    def flow_rates(self):
+        """Average rate in MB/s of each flow, None for the failed flows."""
+        return [r.avg_rate if r else None for r in self.server_results]
+
+    @property
+    def total_rate(self):
+        """Sum of the average rates in MB/s of the successful flows."""
+        return sum(rate for rate in self.flow_rates if rate is not None)
+
+    @property
+    def all_succeeded(self):
+        """True if every client and server reported a result."""
+        for result in self.client_results:
+            if isinstance(result, Exception) or not result[0]:
+                return False
+        return None not in self.flow_rates
+
+
+def _wait_for_iperf_result(server, timeout=IPERF_RESULT_WAIT_TIME):
+    """Waits for a server to write the result of the flow of its log file.
+
+    Returns:
+        The IPerfResult of the latest log of the server, None if there is
+        no valid result after timeout.
+    """
+    deadline = time.time() + timeout
+    while True:
+        try:
+            result = IPerfResult(server.log_files[-1])
+            if result._has_data():
+                return result
+        except (IOError, ValueError):
+            pass
+        if time.time() > deadline:
+            logging.error("No iperf result in %s.", server.log_files[-1])
+            return None
+        time.sleep(0.5)
@@ -16,6 +16,7 @@
 
 import importlib
 import logging
+import time
 
 ACTS_CONTROLLER_CONFIG_NAME = "Sniffer"
 ACTS_CONTROLLER_REFERENCE_NAME = "sniffers"
@@ -101,6 +102,13 @@ class Sniffer(object):
     """
 
     CONFIG_KEY_CHANNEL = "channel"
+    # If True, packets are indexed while they are captured.
+    CONFIG_KEY_INDEX = "index"
+    # Max size in bytes of a capture file. Captures are rotated over several
+    # files, and indexed, if set.
+    CONFIG_KEY_SEGMENT_SIZE = "segment_size"
+    # Max number of rotated capture files kept, the oldest ones are deleted.
+    CONFIG_KEY_MAX_SEGMENTS = "max_segments"
 
     def __init__(self, interface, logger, base_configs=None):
         """The constructor for the Sniffer. It constructs a sniffer and
@@ -170,6 +178,31 @@ class Sniffer(object):
         """
         raise NotImplementedError("Base class should not be called directly!")
 
+    def get_capture_index(self):
+        """Returns the index of the packets of the current or last capture,
+        if the sniffer indexes its captures.
+
+        Returns:
+            A pcap.IndexedPcapCapture object, None if the capture is not
+            indexed.
+        """
+        return None
+
+    def cat_capture(self, tag, begin_time, end_time=None):
+        """Takes an excerpt of the current capture from a certain time point,
+        if the sniffer indexes its captures.
+
+        Args:
+            tag: An identifier of the time period, usually the name of a test.
+            begin_time: Epoch seconds of the beginning of the time period.
+            end_time: Epoch seconds of the end of the time period. Current time
+                if None.
+
+        Returns:
+            The path of the pcap excerpt, None if the capture is not indexed.
+        """
+        return None
+
     def start_capture(self,
                       override_configs=None,
                       additional_args=None,
@@ -282,9 +315,27 @@ class ActiveCaptureContext(object):
     def __init__(self, sniffer, timeout=None):
         self._sniffer = sniffer
         self._timeout = timeout
+        self.begin_time = time.time()
 
     def __enter__(self):
-        pass
+        return self
+
+    def cat_capture(self, tag, begin_time=None, end_time=None):
+        """Takes an excerpt of the active capture, see Sniffer.cat_capture.
+
+        Args:
+            tag: An identifier of the time period.
+            begin_time: Epoch seconds of the beginning of the time period. The
+                beginning of the capture if None.
+            end_time: Epoch seconds of the end of the time period. Current time
+                if None.
+
+        Returns:
+            The path of the pcap excerpt, None if the capture is not indexed.
+        """
+        if begin_time is None:
+            begin_time = self.begin_time
+        return self._sniffer.cat_capture(tag, begin_time, end_time)
 
     def __exit__(self, type, value, traceback):
         if self._sniffer is not None:
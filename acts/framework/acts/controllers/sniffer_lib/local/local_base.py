@@ -29,6 +29,7 @@ import tempfile
 from acts import logger
 from acts import utils
 from acts.controllers import sniffer
+from acts.controllers.sniffer_lib import pcap
 
 class SnifferLocalBase(sniffer.Sniffer):
     """This class defines the common behaviors of WLAN sniffers running on
@@ -42,6 +43,8 @@ class SnifferLocalBase(sniffer.Sniffer):
         """See base class documentation
         """
         self._base_configs = None
+        self._capture = None
+        self._capture_configs = {}
         self._capture_file_path = ""
         self._interface = ""
         self._logger = logger
@@ -71,8 +74,33 @@ class SnifferLocalBase(sniffer.Sniffer):
         return "local"
 
     def get_capture_file(self):
+        if self._capture:
+            return self._capture.current_path
         return self._capture_file_path
 
+    def get_capture_index(self):
+        """See base class documentation
+        """
+        return self._capture
+
+    def cat_capture(self, tag, begin_time, end_time=None):
+        """See base class documentation
+        """
+        if not self._capture:
+            return None
+        excerpt_dir = os.path.join(os.path.dirname(self._capture_file_path),
+                                   "CaptureExcerpts")
+        utils.create_dir(excerpt_dir)
+        out_name = ",{}.pcap".format(logger.epoch_to_log_line_timestamp(
+            int(begin_time * 1000)))
+        out_name = tag[:utils.MAX_FILENAME_LEN - len(out_name)] + out_name
+        out_path = os.path.join(excerpt_dir, out_name)
+        with open(out_path, "wb") as out:
+            num_packets = self._capture.write_excerpt(out, begin_time,
+                                                      end_time)
+        self._logger.debug("Wrote %d packets to %s.", num_packets, out_path)
+        return out_path
+
     def _pre_capture_config(self, override_configs=None):
         """Utility function which configures the wireless interface per the
         specified configurations. Operation is performed before every capture
@@ -84,6 +112,7 @@ class SnifferLocalBase(sniffer.Sniffer):
             final_configs.update(self._base_configs)
         if override_configs:
             final_configs.update(override_configs)
+        self._capture_configs = final_configs
 
         if sniffer.Sniffer.CONFIG_KEY_CHANNEL in final_configs:
             try:
@@ -103,9 +132,16 @@ class SnifferLocalBase(sniffer.Sniffer):
 
     def _post_process(self):
         """Utility function which is executed after a capture is done. It
-        moves the capture file to the requested location.
+        moves the capture file to the requested location, or waits for the
+        output of an indexed capture to be written.
         """
         self._process = None
+        if self._capture:
+            try:
+                self._capture.join()
+            except pcap.PcapError as err:
+                raise sniffer.ExecutionError(err)
+            return
         shutil.move(self._temp_capture_file_path, self._capture_file_path)
 
     def start_capture(self, override_configs=None,
@@ -119,16 +155,31 @@ class SnifferLocalBase(sniffer.Sniffer):
         capture_dir = os.path.join(self._logger.log_path,
                                    "Sniffer-{}".format(self._interface))
         os.makedirs(capture_dir, exist_ok=True)
+        capture_name = "capture_{}".format(logger.get_log_file_timestamp())
         self._capture_file_path = os.path.join(capture_dir,
-                      "capture_{}.pcap".format(logger.get_log_file_timestamp()))
+                                               "{}.pcap".format(capture_name))
 
         self._pre_capture_config(override_configs)
-        _, self._temp_capture_file_path = tempfile.mkstemp(suffix=".pcap")
+        configs = self._capture_configs
+        segment_size = configs.get(sniffer.Sniffer.CONFIG_KEY_SEGMENT_SIZE)
+        if segment_size or configs.get(sniffer.Sniffer.CONFIG_KEY_INDEX):
+            # The capture is written to stdout, and indexed and saved to the
+            # capture directory as it is read.
+            self._temp_capture_file_path = "-"
+        else:
+            self._capture = None
+            _, self._temp_capture_file_path = tempfile.mkstemp(suffix=".pcap")
 
         cmd = self._get_command_line(additional_args=additional_args,
                                 duration=duration, packet_count=packet_count)
 
-        self._process = utils.start_standing_subprocess(cmd)
+        if self._temp_capture_file_path == "-":
+            self._capture = pcap.IndexedPcapCapture(
+                cmd, capture_dir, capture_name, segment_size,
+                configs.get(sniffer.Sniffer.CONFIG_KEY_MAX_SEGMENTS))
+            self._process = self._capture.start()
+        else:
+            self._process = utils.start_standing_subprocess(cmd)
         return sniffer.ActiveCaptureContext(self, duration)
 
     def stop_capture(self):
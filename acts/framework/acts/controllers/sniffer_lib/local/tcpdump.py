@@ -48,6 +48,9 @@ class Sniffer(local_base.SnifferLocalBase):
                           packet_count=None):
         cmd = "{} -i {} -w {}".format(self._executable_path, self._interface,
                                       self._temp_capture_file_path)
+        if self._temp_capture_file_path == "-":
+            # Write each packet to stdout as soon as it is captured.
+            cmd = "{} -U".format(cmd)
         if packet_count is not None:
             cmd = "{} -c {}".format(cmd, packet_count)
         if additional_args is not None:
@@ -49,6 +49,9 @@ class Sniffer(local_base.SnifferLocalBase):
                           packet_count=None):
         cmd = "{} -i {} -w {}".format(self._executable_path, self._interface,
                                       self._temp_capture_file_path)
+        if self._temp_capture_file_path == "-":
+            # tshark writes pcapng by default, the indexed capture reads pcap.
+            cmd = "{} -F pcap".format(cmd)
         if duration is not None:
             cmd = "{} -a duration:{}".format(cmd, duration)
         if packet_count is not None:
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3.4
+#
+#   Copyright 2016 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Streaming, indexed and size-rotated pcap captures.
+
+The pcap output of a capture command is read in-process and written to
+numbered segment files, each one a valid pcap file. Every packet is indexed by
+time, 802.11 frame type and MAC addresses as it is written, so packets of a
+time window or a station are found without parsing the captures again. Once a
+segment reaches its max size a new one is started, and only the newest
+segments are kept, which bounds the disk used by long captures.
+"""
+
+import array
+import bisect
+import collections
+import logging
+import os
+import struct
+import threading
+
+from acts import utils
+
+# Magic numbers of the pcap global header, for microsecond and nanosecond
+# timestamp precisions.
+PCAP_MAGIC_US = 0xa1b2c3d4
+PCAP_MAGIC_NS = 0xa1b23c4d
+PCAP_GLOBAL_HEADER_LEN = 24
+PCAP_RECORD_HEADER_LEN = 16
+# Link types of 802.11 captures, without and with a radiotap header.
+LINKTYPE_IEEE802_11 = 105
+LINKTYPE_IEEE802_11_RADIOTAP = 127
+# Number of bytes copied at once when taking an excerpt of a capture.
+EXCERPT_CHUNK_SIZE = 1024**2
+# 802.11 frame types.
+FRAME_TYPE_MANAGEMENT = 0
+FRAME_TYPE_CONTROL = 1
+FRAME_TYPE_DATA = 2
+# Subtypes of the control frames which have no transmitter address.
+CONTROL_SUBTYPES_WITHOUT_ADDR2 = (12, 13)  # CTS, ACK
+
+# A packet found in a capture. frame_type and subtype are None if the packet
+# is not an 802.11 frame.
+PcapPacket = collections.namedtuple(
+    "PcapPacket",
+    ["timestamp", "path", "offset", "length", "frame_type", "subtype"])
+
+
+class PcapError(Exception):
+    """Raised for invalid pcap data."""
+
+
+def _format_mac(data):
+    return ":".join("%02x" % b for b in data)
+
+
+def parse_global_header(header):
+    """Parses a pcap global header.
+
+    Args:
+        header: The first PCAP_GLOBAL_HEADER_LEN bytes of a pcap file.
+
+    Returns:
+        A (byte_order, timestamp_divisor, link_type) tuple, byte_order being
+        the struct prefix of the file.
+
+    Raises:
+        PcapError is raised if the header is not a pcap global header.
+    """
+    if len(header) < PCAP_GLOBAL_HEADER_LEN:
+        raise PcapError("Truncated pcap global header.")
+    for byte_order in ("<", ">"):
+        magic = struct.unpack_from(byte_order + "I", header)[0]
+        if magic in (PCAP_MAGIC_US, PCAP_MAGIC_NS):
+            divisor = 1e6 if magic == PCAP_MAGIC_US else 1e9
+            link_type = struct.unpack_from(byte_order + "I", header, 20)[0]
+            return byte_order, divisor, link_type
+    raise PcapError("Not a pcap file, magic %r." % header[:4])
+
+
+def parse_80211_header(data, link_type):
+    """Gets the type and addresses of an 802.11 frame.
+
+    Args:
+        data: The captured bytes of the packet.
+        link_type: The link type of the capture.
+
+    Returns:
+        A (frame_type, subtype, addr1, addr2) tuple. Values are None when they
+        can't be found, e.g. for other link types.
+    """
+    if link_type == LINKTYPE_IEEE802_11_RADIOTAP:
+        if len(data) < 4:
+            return None, None, None, None
+        data = data[struct.unpack_from("<H", data, 2)[0]:]
+    elif link_type != LINKTYPE_IEEE802_11:
+        return None, None, None, None
+    if len(data) < 10:
+        return None, None, None, None
+    frame_type = (data[0] >> 2) & 0x3
+    subtype = (data[0] >> 4) & 0xf
+    addr1 = _format_mac(data[4:10])
+    addr2 = None
+    if len(data) >= 16 and not (
+            frame_type == FRAME_TYPE_CONTROL and
+            subtype in CONTROL_SUBTYPES_WITHOUT_ADDR2):
+        addr2 = _format_mac(data[10:16])
+    return frame_type, subtype, addr1, addr2
+
+
+class PcapSegment(object):
+    """One file of a capture, with the index of its packets.
+
+    Packets are expected in chronological order, like captures write them.
+
+    Attributes:
+        path: The path of the segment file.
+        link_type: The link type of the capture.
+        size: Number of bytes written to the segment.
+        timestamps: Array of the timestamp of each packet, in epoch seconds.
+        offsets: Array of the offset in the file of each packet record,
+            header included.
+        lengths: Array of the number of bytes of each packet record, header
+            included.
+        frame_types: Array of the 802.11 type * 16 + subtype of each packet,
+            -1 if unknown.
+        stations: A dict mapping each MAC address to the array of the indexes
+            of the packets it is the receiver or the transmitter of.
+    """
+
+    def __init__(self, path, link_type):
+        self.path = path
+        self.link_type = link_type
+        self.size = 0
+        self.timestamps = array.array("d")
+        self.offsets = array.array("Q")
+        self.lengths = array.array("I")
+        self.frame_types = array.array("h")
+        self.stations = {}
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def begin_time(self):
+        return self.timestamps[0] if self.timestamps else None
+
+    @property
+    def end_time(self):
+        return self.timestamps[-1] if self.timestamps else None
+
+    def overlaps(self, begin_time=None, end_time=None):
+        """Whether the segment has packets between begin_time and end_time.
+        """
+        if not self.timestamps:
+            return False
+        return ((end_time is None or self.begin_time <= end_time) and
+                (begin_time is None or self.end_time >= begin_time))
+
+    def add_packet(self, timestamp, offset, length, data):
+        """Indexes a packet record written at offset in the segment."""
+        frame_type, subtype, addr1, addr2 = parse_80211_header(
+            data, self.link_type)
+        i = len(self.timestamps)
+        self.offsets.append(offset)
+        self.lengths.append(length)
+        self.frame_types.append(-1 if frame_type is None else
+                                frame_type * 16 + subtype)
+        # Appended last, so concurrent lookups never see a partial packet.
+        self.timestamps.append(timestamp)
+        for addr in {addr1, addr2}:
+            if addr:
+                self.stations.setdefault(addr, array.array("I")).append(i)
+
+    def get_byte_range(self, begin_time=None, end_time=None):
+        """Gets the contiguous records of the packets between two times.
+
+        Args:
+            begin_time: Epoch seconds, packets before are excluded.
+            end_time: Epoch seconds, packets after are excluded.
+
+        Returns:
+            A (begin_offset, end_offset, num_packets) tuple. The offsets are
+            equal if there is no packet in the period.
+        """
+        first = 0 if begin_time is None else bisect.bisect_left(
+            self.timestamps, begin_time)
+        last = len(self) if end_time is None else bisect.bisect_right(
+            self.timestamps, end_time)
+        if first >= last:
+            return 0, 0, 0
+        end_offset = self.offsets[last - 1] + self.lengths[last - 1]
+        return self.offsets[first], end_offset, last - first
+
+    def find(self, begin_time=None, end_time=None, mac=None,
+             frame_type=None):
+        """Finds the packets matching all the given criteria.
+
+        Args:
+            begin_time: Epoch seconds, packets before are excluded.
+            end_time: Epoch seconds, packets after are excluded.
+            mac: A MAC address, e.g. "aa:bb:cc:dd:ee:ff". Only the packets it
+                is the receiver or the transmitter of are included.
+            frame_type: An 802.11 frame type, e.g. FRAME_TYPE_DATA.
+
+        Returns:
+            A list of PcapPacket objects.
+        """
+        first = 0 if begin_time is None else bisect.bisect_left(
+            self.timestamps, begin_time)
+        last = len(self) if end_time is None else bisect.bisect_right(
+            self.timestamps, end_time)
+        if mac is None:
+            indexes = range(first, last)
+        else:
+            station = self.stations.get(mac.lower(), ())
+            indexes = station[bisect.bisect_left(station, first):
+                              bisect.bisect_left(station, last)]
+        packets = []
+        for i in indexes:
+            types = self.frame_types[i]
+            if frame_type is not None and (types < 0 or
+                                           types // 16 != frame_type):
+                continue
+            packets.append(PcapPacket(
+                self.timestamps[i], self.path, self.offsets[i],
+                self.lengths[i], None if types < 0 else types // 16,
+                None if types < 0 else types % 16))
+        return packets
+
+
+def read_packet(packet):
+    """Reads the captured bytes of a packet, without its record header."""
+    with open(packet.path, "rb") as f:
+        f.seek(packet.offset + PCAP_RECORD_HEADER_LEN)
+        return f.read(packet.length - PCAP_RECORD_HEADER_LEN)
+
+
+def _read_records(stream, byte_order, divisor):
+    """Reads the pcap records of a stream until its end.
+
+    Yields:
+        (timestamp, record) tuples, record being the record header and the
+        captured bytes.
+    """
+    header_format = byte_order + "IIII"
+    while True:
+        header = stream.read(PCAP_RECORD_HEADER_LEN)
+        if len(header) < PCAP_RECORD_HEADER_LEN:
+            return
+        ts_sec, ts_frac, incl_len, _ = struct.unpack(header_format, header)
+        data = stream.read(incl_len)
+        if len(data) < incl_len:
+            return
+        yield ts_sec + ts_frac / divisor, header + data
+
+
+def index_pcap_file(path):
+    """Indexes the packets of an existing pcap file.
+
+    Returns:
+        A PcapSegment of the file.
+    """
+    with open(path, "rb") as f:
+        global_header = f.read(PCAP_GLOBAL_HEADER_LEN)
+        byte_order, divisor, link_type = parse_global_header(global_header)
+        segment = PcapSegment(path, link_type)
+        offset = PCAP_GLOBAL_HEADER_LEN
+        for timestamp, record in _read_records(f, byte_order, divisor):
+            segment.add_packet(timestamp, offset, len(record),
+                               record[PCAP_RECORD_HEADER_LEN:])
+            offset += len(record)
+        segment.size = offset
+    return segment
+
+
+class IndexedPcapCapture(object):
+    """A capture command writing pcap to its stdout, saved to size-rotated
+    segments and indexed while it runs.
+
+    Attributes:
+        cmd: The capture command, e.g. "tcpdump -i wlan0 -U -w -".
+        capture_dir: The directory the segments are written to.
+        base_name: The segment file name prefix. Segments are named
+            <base_name>.pcap without rotation, <base_name>,<index>.pcap with.
+        segment_size: Max size in bytes of one segment, None to never rotate.
+        max_segments: Max number of segments kept on disk, None to keep all.
+        segments: The PcapSegment objects on disk, oldest first.
+        proc: The capture subprocess.
+        error: The PcapError raised if the output of the capture command is
+            not pcap, None otherwise.
+    """
+
+    def __init__(self,
+                 cmd,
+                 capture_dir,
+                 base_name,
+                 segment_size=None,
+                 max_segments=None):
+        self.cmd = cmd
+        self.capture_dir = capture_dir
+        self.base_name = base_name
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        self.segments = []
+        self.proc = None
+        self.error = None
+        self._index = 0
+        self._file = None
+        self._global_header = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    @property
+    def current_path(self):
+        """The path of the segment being written, None if there is none."""
+        with self._lock:
+            if not self.segments:
+                return None
+            return self.segments[-1].path
+
+    def start(self):
+        """Starts the capture subprocess and the thread reading its output.
+
+        Returns:
+            The capture subprocess.
+        """
+        utils.create_dir(self.capture_dir)
+        self.proc = utils.start_standing_subprocess(self.cmd)
+        self._reader = threading.Thread(target=self._read_output)
+        self._reader.daemon = True
+        self._reader.start()
+        return self.proc
+
+    def join(self, timeout=None):
+        """Waits for the output of the ended capture subprocess to be written.
+
+        Raises:
+            PcapError is raised if the output of the capture command is not
+            pcap, e.g. pcapng, so nothing was captured.
+        """
+        self._reader.join(timeout)
+        if self.error:
+            raise self.error
+
+    def _new_segment(self, link_type):
+        if self.segment_size is None:
+            name = "{}.pcap".format(self.base_name)
+        else:
+            name = "{},{:04d}.pcap".format(self.base_name, self._index)
+        self._index += 1
+        segment = PcapSegment(os.path.join(self.capture_dir, name), link_type)
+        self._file = open(segment.path, "wb")
+        self._file.write(self._global_header)
+        segment.size = len(self._global_header)
+        with self._lock:
+            self.segments.append(segment)
+            if self.max_segments:
+                expired = self.segments[:-self.max_segments]
+                self.segments = self.segments[-self.max_segments:]
+            else:
+                expired = []
+        for old in expired:
+            try:
+                os.remove(old.path)
+            except OSError:
+                logging.exception("Failed to remove pcap segment %s.",
+                                  old.path)
+        return segment
+
+    def _read_output(self):
+        stream = self.proc.stdout
+        self._global_header = stream.read(PCAP_GLOBAL_HEADER_LEN)
+        try:
+            byte_order, divisor, link_type = parse_global_header(
+                self._global_header)
+        except PcapError as e:
+            logging.exception("Invalid output of capture command %s.",
+                              self.cmd)
+            self.error = e
+            self._global_header = None
+            # Keep reading, so the command doesn't block on a full pipe.
+            while stream.read(EXCERPT_CHUNK_SIZE):
+                pass
+            return
+        segment = self._new_segment(link_type)
+        for timestamp, record in _read_records(stream, byte_order, divisor):
+            if (self.segment_size is not None and len(segment) and
+                    segment.size + len(record) > self.segment_size):
+                self._file.close()
+                segment = self._new_segment(link_type)
+            self._file.write(record)
+            segment.add_packet(timestamp, segment.size, len(record),
+                               record[PCAP_RECORD_HEADER_LEN:])
+            segment.size += len(record)
+        self._file.close()
+
+    def flush(self):
+        """Flushes the packets written so far to the current segment."""
+        try:
+            self._file.flush()
+        except (AttributeError, ValueError):
+            # No segment yet, or the capture ended in the meantime.
+            pass
+
+    def find_packets(self, begin_time=None, end_time=None, mac=None,
+                     frame_type=None):
+        """Finds the packets matching all the given criteria, in the segments
+        still on disk.
+
+        See PcapSegment.find for the args.
+
+        Returns:
+            A list of PcapPacket objects, in chronological order.
+        """
+        self.flush()
+        with self._lock:
+            segments = [s for s in self.segments
+                        if s.overlaps(begin_time, end_time)]
+        packets = []
+        for segment in segments:
+            packets += segment.find(begin_time, end_time, mac, frame_type)
+        return packets
+
+    def write_excerpt(self, out, begin_time=None, end_time=None):
+        """Writes the packets captured between two times to a pcap file.
+
+        The packet records are located with the index and copied as is,
+        without being decoded.
+
+        Args:
+            out: A binary file object to write the pcap excerpt to.
+            begin_time: Epoch seconds, packets before are excluded.
+            end_time: Epoch seconds, packets after are excluded.
+
+        Returns:
+            The number of packets written.
+        """
+        self.flush()
+        with self._lock:
+            segments = [s for s in self.segments
+                        if s.overlaps(begin_time, end_time)]
+        if not self._global_header:
+            return 0
+        out.write(self._global_header)
+        num_packets = 0
+        for segment in segments:
+            begin_offset, end_offset, count = segment.get_byte_range(
+                begin_time, end_time)
+            try:
+                with open(segment.path, "rb") as f:
+                    f.seek(begin_offset)
+                    remaining = end_offset - begin_offset
+                    while remaining > 0:
+                        chunk = f.read(min(remaining, EXCERPT_CHUNK_SIZE))
+                        if not chunk:
+                            break
+                        out.write(chunk)
+                        remaining -= len(chunk)
+            except FileNotFoundError:
+                # The segment expired in the meantime.
+                continue
+            num_packets += count
+        return num_packets
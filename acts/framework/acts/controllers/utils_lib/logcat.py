@@ -0,0 +1,239 @@
+#!/usr/bin/env python3.4
+#
+#   Copyright 2016 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Size-rotated, compressed capture of a standing adb logcat.
+
+The logcat output is read in-process and written to numbered segment files.
+Once a segment reaches its max size, it is compressed with gzip and a new one
+is started. Only the newest segments are kept, which bounds the disk used by
+multi-hour runs. The time range of every segment is indexed, so excerpts only
+read the segments overlapping the requested period.
+"""
+
+import gzip
+import logging
+import os
+import shutil
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from acts import logger as acts_logger
+from acts import utils
+
+# Default max size in bytes of one logcat segment before it is rotated.
+DEFAULT_SEGMENT_SIZE = 64 * 1024**2
+# Default max number of segments kept on disk, the oldest ones are deleted.
+DEFAULT_MAX_SEGMENTS = 32
+
+
+class LogcatSegment(object):
+    """One file of a rotating logcat capture.
+
+    Attributes:
+        path: The path of the segment file. Ends with ".gz" once compressed.
+        begin_time: Logline timestamp of the first line, None if no line has
+            a valid timestamp yet.
+        end_time: Logline timestamp of the last line, None if no line has a
+            valid timestamp yet.
+        size: Number of uncompressed bytes written to the segment.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.begin_time = None
+        self.end_time = None
+        self.size = 0
+
+    def overlaps(self, begin_time, end_time):
+        """Whether the segment may contain lines between begin_time and
+        end_time.
+        """
+        if self.begin_time is None:
+            return False
+        cmp = acts_logger.logline_timestamp_comparator
+        return (cmp(self.begin_time, end_time) <= 0 and
+                cmp(self.end_time, begin_time) >= 0)
+
+    def open(self):
+        """Opens the segment for reading text, compressed or not."""
+        path = self.path
+        if not path.endswith(".gz"):
+            try:
+                return open(path, "r", encoding="utf-8", errors="replace")
+            except FileNotFoundError:
+                # The segment got compressed in the meantime.
+                path += ".gz"
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+
+
+class RotatingLogcat(object):
+    """A standing logcat capture written to size-rotated segments.
+
+    Attributes:
+        cmd: The logcat command, its stdout is captured.
+        log_path: The directory the segments are written to.
+        base_name: The segment file name prefix. Segments are named
+            <base_name>,<index>.txt and <base_name>,<index>.txt.gz once
+            compressed.
+        segment_size: Max size in bytes of one segment.
+        max_segments: Max number of segments kept on disk.
+        segments: The LogcatSegment objects on disk, oldest first.
+    """
+
+    def __init__(self,
+                 cmd,
+                 log_path,
+                 base_name,
+                 segment_size=DEFAULT_SEGMENT_SIZE,
+                 max_segments=DEFAULT_MAX_SEGMENTS):
+        self.cmd = cmd
+        self.log_path = log_path
+        self.base_name = base_name
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        self.segments = []
+        self.proc = None
+        self._index = 0
+        self._file = None
+        self._reader = None
+        self._compressor = None
+        self._lock = threading.Lock()
+
+    @property
+    def current_path(self):
+        """The path of the segment being written, None if not started."""
+        with self._lock:
+            if not self.segments:
+                return None
+            return self.segments[-1].path
+
+    def start(self):
+        """Starts the logcat subprocess and the thread reading its output.
+
+        Returns:
+            The logcat subprocess.
+        """
+        utils.create_dir(self.log_path)
+        self._compressor = ThreadPoolExecutor(max_workers=1)
+        self._new_segment()
+        self.proc = utils.start_standing_subprocess(self.cmd)
+        self._reader = threading.Thread(target=self._read_output)
+        self._reader.daemon = True
+        self._reader.start()
+        return self.proc
+
+    def stop(self):
+        """Stops the logcat subprocess and waits for the output to be written.
+        """
+        try:
+            utils.stop_standing_subprocess(self.proc)
+        finally:
+            self._reader.join()
+            self._compressor.shutdown(wait=True)
+            self.proc = None
+
+    def _new_segment(self):
+        name = "{},{:04d}.txt".format(self.base_name, self._index)
+        self._index += 1
+        segment = LogcatSegment(os.path.join(self.log_path, name))
+        self._file = open(segment.path, "w", encoding="utf-8")
+        with self._lock:
+            self.segments.append(segment)
+        return segment
+
+    def _rotate(self):
+        self._file.close()
+        with self._lock:
+            full = self.segments[-1]
+        # The new segment must exist before the full one is compressed, so it
+        # counts in the segments kept.
+        self._new_segment()
+        self._compressor.submit(self._compress, full)
+
+    def _compress(self, segment):
+        """Compresses a full segment and deletes the oldest segments beyond
+        max_segments.
+        """
+        compressed_path = segment.path + ".gz"
+        with open(segment.path, "rb") as f_in:
+            with gzip.open(compressed_path, "wb") as f_out:
+                shutil.copyfileobj(f_in, f_out)
+        with self._lock:
+            segment.path = compressed_path
+            expired = self.segments[:-self.max_segments]
+            self.segments = self.segments[-self.max_segments:]
+        os.remove(compressed_path[:-len(".gz")])
+        for old in expired:
+            try:
+                os.remove(old.path)
+            except OSError:
+                logging.exception("Failed to remove logcat segment %s.",
+                                  old.path)
+
+    def _read_output(self):
+        segment = self.segments[-1]
+        for raw_line in iter(self.proc.stdout.readline, b""):
+            line = raw_line.decode("utf-8", errors="replace")
+            line_time = line[:acts_logger.log_line_timestamp_len]
+            if acts_logger.is_valid_logline_timestamp(line_time):
+                if segment.begin_time is None:
+                    segment.begin_time = line_time
+                segment.end_time = line_time
+            self._file.write(line)
+            segment.size += len(raw_line)
+            if segment.size >= self.segment_size:
+                self._rotate()
+                segment = self.segments[-1]
+        self._file.close()
+
+    def cat(self, begin_time, end_time, out):
+        """Writes the lines between two timestamps to a file object.
+
+        Only the segments whose time range overlaps the period are read.
+
+        Args:
+            begin_time: Logline format timestamp of the beginning of the
+                period.
+            end_time: Logline format timestamp of the end of the period.
+            out: A text file object to write the lines to.
+        """
+        try:
+            self._file.flush()
+        except ValueError:
+            # The segment got rotated or the capture stopped in the meantime.
+            pass
+        with self._lock:
+            segments = [s for s in self.segments
+                        if s.overlaps(begin_time, end_time)]
+        cmp = acts_logger.logline_timestamp_comparator
+        for segment in segments:
+            try:
+                f = segment.open()
+            except FileNotFoundError:
+                # The segment expired in the meantime.
+                continue
+            with f:
+                for line in f:
+                    line_time = line[:acts_logger.log_line_timestamp_len]
+                    if not acts_logger.is_valid_logline_timestamp(line_time):
+                        continue
+                    if cmp(line_time, begin_time) < 0:
+                        continue
+                    if cmp(line_time, end_time) > 0:
+                        return
+                    if not line.endswith('\n'):
+                        line += '\n'
+                    out.write(line)
@@ -22,8 +22,10 @@ import time
 from acts import utils
 from acts.base_test import BaseTestClass
 from acts.controllers import android_device
+from acts.test_utils.bt.bt_energy_utils import EnergyInfoSampler
 from acts.test_utils.bt.bt_test_utils import (
-    log_energy_info, reset_bluetooth, setup_multiple_devices_for_bt_test,
+    btsnoop_collector, get_bt_wait_stats, log_energy_info, reset_bluetooth,
+    reset_bt_wait_stats, setup_multiple_devices_for_bt_test,
     take_btsnoop_logs)
 from acts.utils import sync_device_time
 
@@ -32,6 +34,9 @@ class BluetoothBaseTest(BaseTestClass):
     DEFAULT_TIMEOUT = 10
     start_time = 0
     timer_list = []
+    # Samples the controller energy info of the devices in the background if
+    # the energy_sample_interval user param is set.
+    energy_sampler = None
 
     def __init__(self, controllers):
         BaseTestClass.__init__(self, controllers)
@@ -51,19 +56,58 @@ class BluetoothBaseTest(BaseTestClass):
         return _safe_wrap_test_case
 
     def setup_class(self):
+        reset_bt_wait_stats()
         for a in self.android_devices:
             sync_device_time(a)
-        return setup_multiple_devices_for_bt_test(self.android_devices)
+        result = setup_multiple_devices_for_bt_test(self.android_devices)
+        # Started once Bluetooth was reset, as the energy info is not
+        # available while Bluetooth is off.
+        if result and "energy_sample_interval" in self.user_params:
+            self.energy_sampler = EnergyInfoSampler(
+                self.android_devices,
+                float(self.user_params["energy_sample_interval"]))
+            self.energy_sampler.start()
+        return result
+
+    def _teardown_class(self):
+        # Many test classes override teardown_class without calling it here,
+        # so the energy sampler is stopped whatever they do.
+        try:
+            return BaseTestClass._teardown_class(self)
+        finally:
+            self._stop_energy_sampler()
+
+    def teardown_class(self):
+        stats = get_bt_wait_stats()
+        self.log.info("{} Bluetooth state waits of {} took {:.1f}s, saved "
+                      "{:.1f}s compared to fixed sleeps.".format(
+                          stats["waits"], self.__class__.__name__,
+                          stats["elapsed"], stats["saved"]))
+
+    def _stop_energy_sampler(self):
+        if self.energy_sampler:
+            self.energy_sampler.stop()
+            self.energy_sampler.export(self.log_path)
+            self.energy_sampler = None
 
     def setup_test(self):
         self.timer_list = []
-        self.log.debug(log_energy_info(self.android_devices, "Start"))
+        if self.energy_sampler:
+            self.energy_sampler.begin_phase(self.current_test_name)
+        else:
+            self.log.debug(log_energy_info(self.android_devices, "Start"))
         for a in self.android_devices:
             a.ed.clear_all_events()
+        # The btsnoop logs pulled on failure only cover this test.
+        btsnoop_collector.mark(self.android_devices)
         return True
 
     def teardown_test(self):
-        self.log.debug(log_energy_info(self.android_devices, "End"))
+        if self.energy_sampler:
+            self.log.debug("Energy info deltas: {}".format(
+                self.energy_sampler.end_phase(self.current_test_name)))
+        else:
+            self.log.debug(log_energy_info(self.android_devices, "End"))
         return True
 
     def on_fail(self, test_name, begin_time):
@@ -84,18 +128,22 @@ class BluetoothBaseTest(BaseTestClass):
 
         # magical sleep to ensure the runtime restart or reboot begins
         time.sleep(1)
-        for ad in self.android_devices:
+
+        def take_br(ad):
             try:
                 ad.adb.wait_for_device()
                 ad.take_bug_report(test_name, begin_time)
-                tombstone_path = os.path.join(ad.log_path, "BugReports",
-                        "{},{}".format(begin_time, ad.serial).replace(' ','_'))
+                tombstone_path = os.path.join(
+                    ad.log_path, "BugReports",
+                    "{},{}".format(begin_time, ad.serial).replace(' ', '_'))
                 utils.create_dir(tombstone_path)
                 ad.adb.pull('/data/tombstones/', tombstone_path)
             except:
                 self.log.error("Failed to take a bug report for {}, {}"
                              .format(ad.serial, test_name))
 
+        utils.concurrent_exec(take_br, [(ad, ) for ad in self.android_devices])
+
     def _get_time_in_milliseconds(self):
         return int(round(time.time() * 1000))
 
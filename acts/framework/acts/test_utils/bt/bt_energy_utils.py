@@ -0,0 +1,301 @@
+#!/usr/bin/env python3.4
+#
+#   Copyright 2016 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Background sampling of the Bluetooth controller energy info.
+
+The controller reports cumulative counters: the time spent transmitting,
+receiving and idle, and the energy used. Sampling them at a fixed cadence
+gives time series whose increase over a test phase is the activity and the
+energy of the controller during that phase.
+"""
+
+import array
+import bisect
+import collections
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+
+from acts import utils
+
+# Default seconds between two samples.
+DEFAULT_ENERGY_SAMPLE_INTERVAL = 1
+# Counters of the energy info, and their names in the reports of the
+# controller.
+ENERGY_INFO_COUNTERS = (("tx_time_ms", "mControllerTxTimeMs"),
+                        ("rx_time_ms", "mControllerRxTimeMs"),
+                        ("idle_time_ms", "mControllerIdleTimeMs"),
+                        ("energy_used", "mControllerEnergyUsed"))
+
+
+def parse_energy_info(info):
+    """Parses the result of bluetoothGetControllerActivityEnergyInfo.
+
+    Args:
+        info: The BluetoothActivityEnergyInfo string, or a dict of the
+            counters.
+
+    Returns:
+        A tuple of the values of ENERGY_INFO_COUNTERS, None if info does not
+        have them all.
+    """
+    if isinstance(info, dict):
+        values = info
+    elif info:
+        values = dict(re.findall(r"(\w+)=(-?\d+)", str(info)))
+    else:
+        return None
+    try:
+        return tuple(int(values.get(key, values.get(name)))
+                     for name, key in ENERGY_INFO_COUNTERS)
+    except (TypeError, ValueError):
+        return None
+
+
+class EnergyTimeSeries(object):
+    """The energy info samples of one device.
+
+    Attributes:
+        times: Epoch seconds of the samples, in increasing order.
+        counters: A dict of the values of each counter of
+            ENERGY_INFO_COUNTERS, in the order of times.
+    """
+
+    def __init__(self):
+        self.times = array.array("d")
+        self.counters = collections.OrderedDict(
+            (name, array.array("q")) for name, _ in ENERGY_INFO_COUNTERS)
+
+    def __len__(self):
+        return len(self.times)
+
+    def append(self, sample_time, values):
+        """Adds a sample, values being in the order of ENERGY_INFO_COUNTERS.
+        """
+        self.times.append(sample_time)
+        for counter, value in zip(self.counters.values(), values):
+            counter.append(value)
+
+    def delta(self, begin_time, end_time):
+        """Computes the increase of the counters between two times.
+
+        Only the samples taken between begin_time and end_time are used. The
+        counters of a controller start over from 0 once it resets, so a value
+        lower than the previous one counts from 0.
+
+        Returns:
+            A dict with the increase of every counter, the number of samples
+            and the seconds between the first and last ones. None if fewer
+            than two samples were taken in the period.
+        """
+        begin = bisect.bisect_left(self.times, begin_time)
+        end = bisect.bisect_right(self.times, end_time)
+        if end - begin < 2:
+            return None
+        result = {"samples": end - begin,
+                  "duration": self.times[end - 1] - self.times[begin]}
+        for name, values in self.counters.items():
+            total = 0
+            for i in range(begin + 1, end):
+                increase = values[i] - values[i - 1]
+                total += increase if increase >= 0 else values[i]
+            result[name] = total
+        return result
+
+
+class EnergyInfoSampler(object):
+    """Samples the controller energy info of Android devices in the
+    background.
+
+    All the devices are sampled at once, every interval seconds. Test phases
+    are delimited with begin_phase and end_phase, which also take a sample so
+    the boundaries of the phases are exact.
+
+    An sl4a client is not safe to use from several threads, so while
+    sampling in the background, the devices are sampled through sl4a
+    sessions of the sampler, opened by start and terminated by stop.
+
+    Attributes:
+        android_devices: The list of Android devices sampled.
+        interval: Seconds between two samples.
+        series: A dict of the EnergyTimeSeries of each device serial.
+        phases: An OrderedDict of the [begin_time, end_time] of each phase,
+            end_time being None until the phase ends.
+        num_errors: Number of samples that failed.
+    """
+
+    def __init__(self,
+                 android_devices,
+                 interval=DEFAULT_ENERGY_SAMPLE_INTERVAL):
+        self.android_devices = android_devices
+        self.interval = interval
+        self.series = {str(a.serial): EnergyTimeSeries()
+                       for a in android_devices}
+        self.phases = collections.OrderedDict()
+        self.num_errors = 0
+        self._device_locks = {str(a.serial): threading.Lock()
+                              for a in android_devices}
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._droids = {}
+
+    def _sample_device(self, ad):
+        serial = str(ad.serial)
+        # Samples of a device are appended in order even if sample is called
+        # from a test while the background thread samples too.
+        with self._device_locks[serial]:
+            droid = self._droids.get(serial, ad.droid)
+            values = parse_energy_info(
+                droid.bluetoothGetControllerActivityEnergyInfo(1))
+            if values is None:
+                raise ValueError("No energy info reported by {}.".format(
+                    serial))
+            self.series[serial].append(time.time(), values)
+
+    def sample(self):
+        """Samples the energy info of all the devices once."""
+        results = utils.concurrent_map(self._sample_device,
+                                       [(a, ) for a in self.android_devices],
+                                       raise_on_error=False)
+        for a, result in zip(self.android_devices, results):
+            if isinstance(result, Exception):
+                self.num_errors += 1
+                logging.debug("Failed to sample the energy info of %s: %s",
+                              a.serial, result)
+
+    def _run(self):
+        next_time = time.time()
+        while not self._stop_event.is_set():
+            self.sample()
+            next_time += self.interval
+            now = time.time()
+            if now > next_time:
+                # Sampling took longer than interval, skip the missed samples
+                # to stay on the cadence.
+                next_time += (math.ceil((now - next_time) / self.interval) *
+                              self.interval)
+            self._stop_event.wait(next_time - now)
+
+    def start(self):
+        """Opens an sl4a session on every device and starts sampling in a
+        background thread.
+        """
+        for a in self.android_devices:
+            self._droids[str(a.serial)] = a.get_droid(handle_event=False)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stops sampling, takes a last sample and terminates the sl4a
+        sessions of the sampler.
+        """
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        self.sample()
+        for a in self.android_devices:
+            droid = self._droids.pop(str(a.serial), None)
+            if droid is None:
+                continue
+            try:
+                a.terminate_session(droid.uid)
+            except Exception as err:
+                logging.debug("Failed to terminate the sl4a session of %s: "
+                              "%s", a.serial, err)
+
+    def begin_phase(self, name):
+        """Samples all the devices and begins a test phase.
+
+        Args:
+            name: The name of the phase, an earlier phase of the same name is
+                replaced.
+        """
+        begin_time = time.time()
+        self.sample()
+        self.phases[name] = [begin_time, None]
+
+    def end_phase(self, name):
+        """Samples all the devices and ends a test phase.
+
+        Returns:
+            The phase deltas, as returned by get_phase_deltas.
+        """
+        self.sample()
+        self.phases[name][1] = time.time()
+        return self.get_phase_deltas(name)
+
+    def get_phase_deltas(self, name):
+        """Computes the increase of the counters of all the devices over a
+        test phase.
+
+        The increase of energy_used is the energy integrated over the phase,
+        in the unit of the controller, mA * V * ms on most devices.
+
+        Returns:
+            A dict of the EnergyTimeSeries.delta of each device serial over
+            the phase, up to now if it has not ended.
+        """
+        begin_time, end_time = self.phases[name]
+        end_time = end_time or time.time()
+        return {serial: series.delta(begin_time, end_time)
+                for serial, series in self.series.items()}
+
+    def export(self, dir_path):
+        """Writes the samples and the phase deltas to files.
+
+        Every device gets a <serial>.bt_energy_info.txt file, with one sample
+        per line: the epoch time of the sample and the counters, so the
+        samples can be correlated with the files of MonsoonData. The phases
+        and their deltas are written to bt_energy_phases.json.
+
+        Args:
+            dir_path: The directory to write the files to, usually the one of
+                the Monsoon data.
+
+        Returns:
+            The list of paths of the files written.
+        """
+        utils.create_dir(dir_path)
+        paths = []
+        for serial, series in sorted(self.series.items()):
+            path = os.path.join(dir_path,
+                                "{}.bt_energy_info.txt".format(serial))
+            with open(path, "w") as f:
+                f.write("Bluetooth controller energy info of {}, {} samples "
+                        "taken every {}s.\n".format(serial, len(series),
+                                                    self.interval))
+                f.write(" ".join(["Time"] + list(series.counters)) + "\n")
+                for i, sample_time in enumerate(series.times):
+                    values = [str(c[i]) for c in series.counters.values()]
+                    f.write(" ".join(["{:.3f}".format(sample_time)] +
+                                     values) + "\n")
+            paths.append(path)
+        phases = collections.OrderedDict()
+        for name, (begin_time, end_time) in self.phases.items():
+            phases[name] = {"begin_time": begin_time,
+                            "end_time": end_time,
+                            "deltas": self.get_phase_deltas(name)}
+        path = os.path.join(dir_path, "bt_energy_phases.json")
+        with open(path, "w") as f:
+            json.dump(phases, f, indent=4)
+        paths.append(path)
+        return paths
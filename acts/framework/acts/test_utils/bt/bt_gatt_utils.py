@@ -26,9 +26,14 @@ from acts.test_utils.bt.GattEnum import GattDescriptor
 from acts.test_utils.bt.GattEnum import GattService
 from acts.test_utils.bt.GattEnum import GattTransport
 import pprint
+import threading
+import time
 from queue import Empty
 
 default_timeout = 10
+# Seconds the GATT stress responder waits for requests before checking
+# whether it should stop.
+GATT_STRESS_POLL_TIMEOUT = 1
 log = logging
 
 
@@ -99,65 +104,245 @@ def orchestrate_gatt_connection(cen_ad,
     return bluetooth_gatt, gatt_callback, adv_callback
 
 
+def get_discovered_descriptors(droid,
+                               discovered_services_index,
+                               services_count=None):
+    """Lists the descriptors of all the discovered services of a GATT
+    connection.
+
+    Args:
+        droid: The droid object of the GATT client.
+        discovered_services_index: The index of the discovered services.
+        services_count: The number of services to list, all of them if None.
+
+    Returns:
+        A list of (service index, characteristic uuid, descriptor uuid)
+        tuples.
+    """
+    descriptors = []
+    if services_count is None:
+        services_count = droid.gattClientGetDiscoveredServicesCount(
+            discovered_services_index)
+    for i in range(services_count):
+        characteristic_uuids = droid.gattClientGetDiscoveredCharacteristicUuids(
+            discovered_services_index, i)
+        for characteristic in characteristic_uuids:
+            descriptor_uuids = droid.gattClientGetDiscoveredDescriptorUuids(
+                discovered_services_index, i, characteristic)
+            for descriptor in descriptor_uuids:
+                descriptors.append((i, characteristic, descriptor))
+    log.debug("Discovered descriptors: {}".format(descriptors))
+    return descriptors
+
+
+class GattDescriptorWriteStress(object):
+    """Writes the descriptors of a GATT server continuously.
+
+    The descriptor tree is discovered once. The client keeps up to window
+    writes outstanding, and a responder thread answers the write requests on
+    the server while the client issues the next writes. Events are popped in
+    bulk as they come.
+
+    Attributes:
+        descriptors: The (service index, characteristic uuid, descriptor
+            uuid) tuples written in turn.
+        window: Max number of writes outstanding. The Bluetooth stack may
+            accept less, then the client waits for a write to complete
+            before retrying.
+        num_writes: Number of writes completed.
+        num_mismatches: Number of write requests whose value did not match
+            the value written.
+        num_skipped: Number of writes and responses skipped because their
+            RPC raised, with continue_on_error.
+        errors: The errors which stopped the writes.
+    """
+
+    def __init__(self,
+                 cen_droid,
+                 cen_ed,
+                 per_droid,
+                 per_ed,
+                 gatt_server,
+                 gatt_server_callback,
+                 bluetooth_gatt,
+                 discovered_services_index,
+                 services_count=None,
+                 window=1,
+                 test_value="1,2,3,4,5,6,7",
+                 test_value_return="1,2,3"):
+        self.cen_droid = cen_droid
+        self.cen_ed = cen_ed
+        self.per_droid = per_droid
+        self.per_ed = per_ed
+        self.gatt_server = gatt_server
+        self.bluetooth_gatt = bluetooth_gatt
+        self.discovered_services_index = discovered_services_index
+        self.window = window
+        self.test_value = test_value
+        self.test_value_return = test_value_return
+        self.descriptors = get_discovered_descriptors(
+            cen_droid, discovered_services_index, services_count)
+        self.num_writes = 0
+        self.num_mismatches = 0
+        self.num_skipped = 0
+        self.errors = []
+        self._continue_on_error = False
+        self._request_event = GattCbStrings.DESC_WRITE_REQ.value.format(
+            gatt_server_callback)
+        self._write_event = GattCbStrings.DESC_WRITE.value.format(
+            bluetooth_gatt)
+        self._stop = threading.Event()
+
+    def _respond(self):
+        bt_device_id = 0
+        status = 1
+        offset = 1
+        while not self._stop.is_set():
+            try:
+                events = self.per_ed.wait_and_pop_all(
+                    self._request_event, GATT_STRESS_POLL_TIMEOUT)
+            except Empty:
+                continue
+            for event in events:
+                if event['data']['value'] != self.test_value:
+                    self.num_mismatches += 1
+                    log.error("Values didn't match. Found: {}, "
+                              "Expected: {}".format(event['data']['value'],
+                                                    self.test_value))
+                try:
+                    self.per_droid.gattServerSendResponse(
+                        self.gatt_server, bt_device_id,
+                        event['data']['requestId'], status, offset,
+                        self.test_value_return)
+                except Exception as err:
+                    if not self._continue_on_error:
+                        self.errors.append("Failed to respond: {}".format(err))
+                        self._stop.set()
+                        return
+                    self.num_skipped += 1
+                    log.error("Continuing but found exception: {}".format(err))
+
+    def _wait_for_writes(self):
+        """Waits for at least one outstanding write to complete.
+
+        Returns:
+            The number of writes completed.
+        """
+        try:
+            events = self.cen_ed.wait_and_pop_all(self._write_event,
+                                                  default_timeout)
+        except Empty:
+            raise GattTestUtilsError(GattCbErr.DESC_WRITE_ERR.value.format(
+                self._write_event))
+        self.num_writes += len(events)
+        return len(events)
+
+    def _write(self, descriptor):
+        """Starts writing a descriptor.
+
+        Returns:
+            False if the stack can't take another write, None if the RPCs
+            raised and the write is skipped with continue_on_error.
+        """
+        i, characteristic, descriptor = descriptor
+        try:
+            self.cen_droid.gattClientDescriptorSetValue(
+                self.bluetooth_gatt, self.discovered_services_index, i,
+                characteristic, descriptor, self.test_value)
+            return self.cen_droid.gattClientWriteDescriptor(
+                self.bluetooth_gatt, self.discovered_services_index, i,
+                characteristic, descriptor) is not False
+        except Exception as err:
+            if not self._continue_on_error:
+                raise
+            self.num_skipped += 1
+            log.error("Continuing but found exception: {}".format(err))
+            return None
+
+    def run(self, num_writes, continue_on_error=False):
+        """Writes descriptors num_writes times, going through all the
+        descriptors in turn.
+
+        Args:
+            num_writes: The number of descriptor writes.
+            continue_on_error: If True, a write or response whose RPC raises
+                is logged and skipped instead of stopping the writes. Writes
+                not completed in time still stop them.
+
+        Returns:
+            The number of writes completed per second, None if the writes
+            failed, see errors.
+        """
+        if not self.descriptors:
+            self.errors.append("No descriptor discovered.")
+            return None
+        self._continue_on_error = continue_on_error
+        self._stop.clear()
+        responder = threading.Thread(target=self._respond)
+        responder.start()
+        begin_time = time.time()
+        begin_writes = self.num_writes
+        outstanding = 0
+        try:
+            for n in range(num_writes):
+                if self._stop.is_set():
+                    break
+                descriptor = self.descriptors[n % len(self.descriptors)]
+                if outstanding >= self.window:
+                    outstanding -= self._wait_for_writes()
+                # The stack returns False while it can't take another write.
+                written = self._write(descriptor)
+                while written is False:
+                    if not outstanding:
+                        raise GattTestUtilsError(
+                            "Failed to write descriptor {}.".format(
+                                descriptor))
+                    outstanding -= self._wait_for_writes()
+                    written = self._write(descriptor)
+                if written:
+                    outstanding += 1
+            while outstanding > 0 and not self._stop.is_set():
+                outstanding -= self._wait_for_writes()
+        except Exception as err:
+            self.errors.append(str(err))
+        finally:
+            self._stop.set()
+            responder.join()
+        elapsed = time.time() - begin_time
+        for error in self.errors:
+            log.error(error)
+        if self.errors:
+            return None
+        ops_per_sec = (self.num_writes - begin_writes) / elapsed
+        log.info("{} descriptor writes at {:.1f} writes/s.".format(
+            self.num_writes - begin_writes, ops_per_sec))
+        return ops_per_sec
+
+
 def run_continuous_write_descriptor(cen_droid, cen_ed, per_droid, per_ed,
                                     gatt_server, gatt_server_callback,
                                     bluetooth_gatt, services_count,
                                     discovered_services_index):
+    """Writes all the descriptors of a GATT server 100000 times.
+
+    Like the write loop this replaces, a write or response whose RPC raises
+    is logged and the writes continue, and a write not completed in time
+    stops them.
+
+    Returns:
+        True if the writes completed, False otherwise.
+    """
     log.info("Starting continuous write")
-    bt_device_id = 0
-    status = 1
-    offset = 1
-    test_value = "1,2,3,4,5,6,7"
-    test_value_return = "1,2,3"
-    for x in range(100000):
-        try:
-            for i in range(services_count):
-                characteristic_uuids = (
-                    cen_droid.gattClientGetDiscoveredCharacteristicUuids(
-                        discovered_services_index, i))
-                log.info(characteristic_uuids)
-                for characteristic in characteristic_uuids:
-                    descriptor_uuids = (
-                        cen_droid.gattClientGetDiscoveredDescriptorUuids(
-                            discovered_services_index, i, characteristic))
-                    log.info(descriptor_uuids)
-                    for descriptor in descriptor_uuids:
-                        log.info("descriptor to be written {}".format(descriptor))
-                        cen_droid.gattClientDescriptorSetValue(
-                            bluetooth_gatt, discovered_services_index, i,
-                            characteristic, descriptor, test_value)
-                        cen_droid.gattClientWriteDescriptor(
-                            bluetooth_gatt, discovered_services_index, i,
-                            characteristic, descriptor)
-                        expected_event = GattCbStrings.DESC_WRITE_REQ.value.format(
-                            gatt_server_callback)
-                        try:
-                            event = per_ed.pop_event(expected_event,
-                                                     default_timeout)
-                        except Empty:
-                            log.error(
-                                GattCbErr.DESC_WRITE_REQ_ERR.value.format(
-                                    expected_event))
-                            return False
-                        request_id = event['data']['requestId']
-                        found_value = event['data']['value']
-                        if found_value != test_value:
-                            log.error("Values didn't match. Found: {}, Expected: "
-                                      "{}".format(found_value, test_value))
-                        per_droid.gattServerSendResponse(gatt_server, bt_device_id,
-                                                         request_id, status,
-                                                         offset, test_value_return)
-                        expected_event = GattCbStrings.DESC_WRITE.value.format(
-                            bluetooth_gatt)
-                        try:
-                            cen_ed.pop_event(expected_event, default_timeout)
-                        except Empty:
-                            log.error(
-                                GattCbErr.DESC_WRITE_ERR.value.format(
-                                    expected_event))
-                            return False
-        except Exception as err:
-            log.error("Continuing but found exception: {}".format(err))
+    try:
+        stress = GattDescriptorWriteStress(
+            cen_droid, cen_ed, per_droid, per_ed, gatt_server,
+            gatt_server_callback, bluetooth_gatt, discovered_services_index,
+            services_count)
+    except Exception as err:
+        log.error("Failed to discover the descriptors: {}".format(err))
+        return False
+    return stress.run(100000 * len(stress.descriptors),
+                      continue_on_error=True) is not None
 
 
 def setup_characteristics_and_descriptors(droid):
@@ -14,14 +14,19 @@
 # License for the specific language governing permissions and limitations under
 # the License.
 
+import base64
 import logging
+import os
 import random
 import pprint
 import string
 from queue import Empty
 import threading
 import time
+import zlib
 from acts import utils
+from acts.controllers.adb import AdbError
+from acts.test_utils import capability_cache
 
 from subprocess import call
 
@@ -39,14 +44,35 @@ from acts.test_utils.bt.BleEnum import ScanSettingsScanResultType
 from acts.test_utils.bt.BleEnum import ScanSettingsScanMode
 from acts.test_utils.bt.BtEnum import BluetoothScanModeType
 from acts.test_utils.bt.BtEnum import RfcommUuid
+from acts.test_utils.bt import btsnoop
 from acts.test_utils.tel.tel_test_utils import toggle_airplane_mode
 from acts.test_utils.tel.tel_test_utils import verify_http_connection
-from acts.utils import exe_cmd
 
 DEFAULT_TIMEOUT = 15
 DEFAULT_RFCOMM_TIMEOUT = 10000
 MAGIC_PAN_CONNECT_TIMEOUT = 5
 DEFAULT_DISCOVERY_TIMEOUT = 3
+# Default number of characters of each RFCOMM throughput message.
+DEFAULT_RFCOMM_MESSAGE_SIZE = 990
+# Default number of RFCOMM throughput messages written ahead of the reads.
+DEFAULT_RFCOMM_WINDOW = 8
+# Number of characters of the sequence number starting each RFCOMM
+# throughput message.
+RFCOMM_SEQUENCE_LENGTH = 8
+# Seconds between two polls of the advertise events of pending advertisements.
+ADVERTISE_POLL_INTERVAL = 0.05
+# Min and max seconds between two checks of a Bluetooth state.
+BT_POLL_INTERVAL_MIN = 0.1
+BT_POLL_INTERVAL_MAX = 1
+# Seconds reset_bluetooth used to sleep between turning Bluetooth off and on.
+BT_RESET_REPLACED_SLEEP = 3
+# Seconds between two polls of the RFCOMM connections before they were waited
+# for with wait_for_bt_condition.
+RFCOMM_CONNECT_REPLACED_POLL_INTERVAL = 1
+# Number of advertisements started at once when probing max advertisements.
+ADVERTISE_PROBE_BATCH_SIZE = 4
+# Path of the HCI snoop log on the devices.
+BTSNOOP_LOG_PATH = "/sdcard/btsnoop_hci.log"
 
 log = logging
 
@@ -65,17 +91,178 @@ bluetooth_profile_connection_state_changed = \
 rfcomm_secure_uuid = "fa87c0d0-afac-11de-8a39-0800200c9a66"
 rfcomm_insecure_uuid = "8ce255c0-200a-11e0-ac64-0800200c9a66"
 
+# Max advertisements of the devices probed, by build fingerprint.
 advertisements_to_devices = {}
+# Name of the max advertisements in the capability cache.
+CAPABILITY_MAX_ADVERTISEMENTS = "ble_max_advertisements"
 
 batch_scan_not_supported_list = ["Nexus 4",
                                  "Nexus 5",
                                  "Nexus 7", ]
 
 
+# Accumulated statistics of Bluetooth state waits, see get_bt_wait_stats().
+_bt_wait_stats = {"waits": 0, "elapsed": 0.0, "saved": 0.0}
+_bt_wait_stats_lock = threading.Lock()
+
+
 class BtTestUtilsError(Exception):
     pass
 
 
+class BleScanAggregator(object):
+    """Aggregates the LE scan results reported to scan callbacks.
+
+    Every call to drain pops all the queued result events of the callbacks at
+    once, and the results are indexed by device address, device name and
+    RSSI, so deduplicating tens of thousands of results stays linear.
+
+    Attributes:
+        ed: The event dispatcher of the scanning Android device.
+        event_names: The names of the result events aggregated.
+        devices: A dict of address to the latest info of each device found:
+            name, rssi, first_seen and last_seen in timestampNanos of the
+            results, and count of results.
+        addresses_by_name: A dict of device name to the set of addresses
+            advertising it.
+        addresses_by_rssi: A dict of RSSI to the set of addresses whose
+            latest result has this RSSI.
+        num_events: Number of result events popped.
+        num_results: Number of scan results aggregated.
+    """
+
+    def __init__(self, ed, scan_callbacks, batch=False):
+        """
+        Args:
+            ed: The event dispatcher of the scanning Android device.
+            scan_callbacks: A list of scan callback ids to aggregate the
+                results of.
+            batch: True if the scans report batch scan results.
+        """
+        self.ed = ed
+        event_format = batch_scan_result if batch else scan_result
+        self.event_names = [event_format.format(c) for c in scan_callbacks]
+        self.devices = {}
+        self.addresses_by_name = {}
+        self.addresses_by_rssi = {}
+        self.num_events = 0
+        self.num_results = 0
+
+    @property
+    def num_devices(self):
+        """Number of different device addresses found."""
+        return len(self.devices)
+
+    def add_result(self, result):
+        """Adds one scan result to the indexes.
+
+        Args:
+            result: The scan result of a result event.
+
+        Returns:
+            True if the result is from a device not found before.
+        """
+        self.num_results += 1
+        device_info = result['deviceInfo']
+        address = device_info['address']
+        rssi = result.get('rssi')
+        timestamp = result.get('timestampNanos')
+        device = self.devices.get(address)
+        is_new = device is None
+        if is_new:
+            device = {'name': None,
+                      'rssi': None,
+                      'first_seen': timestamp,
+                      'count': 0}
+            self.devices[address] = device
+        name = device_info.get('name')
+        if name != device['name']:
+            if device['name'] is not None:
+                self.addresses_by_name[device['name']].discard(address)
+            if name is not None:
+                self.addresses_by_name.setdefault(name, set()).add(address)
+            device['name'] = name
+        if rssi != device['rssi']:
+            if device['rssi'] is not None:
+                self.addresses_by_rssi[device['rssi']].discard(address)
+            if rssi is not None:
+                self.addresses_by_rssi.setdefault(rssi, set()).add(address)
+            device['rssi'] = rssi
+        device['last_seen'] = timestamp
+        device['count'] += 1
+        return is_new
+
+    def add_event(self, event):
+        """Adds the results of a scan result or batch scan result event.
+
+        Args:
+            event: The result event popped from the event dispatcher.
+
+        Returns:
+            Number of devices found for the first time.
+        """
+        self.num_events += 1
+        data = event['data']
+        results = data['Results'] if 'Results' in data else [data['Result']]
+        return sum(self.add_result(r) for r in results)
+
+    def drain(self, timeout=DEFAULT_TIMEOUT):
+        """Pops all the queued result events of each scan callback.
+
+        Args:
+            timeout: Number of seconds to wait for the first event of each
+                scan callback.
+
+        Returns:
+            Number of devices found for the first time.
+
+        Raises:
+            queue.Empty: Raised if a scan callback got no event before time
+                out.
+        """
+        num_new = 0
+        for event_name in self.event_names:
+            for event in self.ed.wait_and_pop_all(event_name, timeout):
+                num_new += self.add_event(event)
+        return num_new
+
+    def wait_for_devices(self, num_devices, timeout=DEFAULT_TIMEOUT):
+        """Aggregates results until a number of devices are found.
+
+        Args:
+            num_devices: The number of different devices to find.
+            timeout: Number of seconds to wait for the devices.
+
+        Returns:
+            True if num_devices were found before time out, False otherwise.
+
+        Raises:
+            queue.Empty: Raised if no result was reported before time out.
+        """
+        deadline = time.time() + timeout
+        while self.num_devices < num_devices:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                self.drain(remaining)
+            except Empty:
+                if not self.num_events:
+                    raise
+                break
+        return self.num_devices >= num_devices
+
+    def get_addresses_with_rssi(self, min_rssi):
+        """Returns the set of addresses whose latest RSSI is at least
+        min_rssi.
+        """
+        addresses = set()
+        for rssi, rssi_addresses in self.addresses_by_rssi.items():
+            if rssi >= min_rssi:
+                addresses |= rssi_addresses
+        return addresses
+
+
 def scan_and_verify_n_advertisements(scn_ad, max_advertisements):
     """Verify that input number of advertisements can be found from the scanning
     Android device.
@@ -88,28 +275,17 @@ def scan_and_verify_n_advertisements(scn_ad, max_advertisements):
     Returns:
         True if successful, false if unsuccessful.
     """
-    test_result = False
-    address_list = []
     filter_list = scn_ad.droid.bleGenFilterList()
     scn_ad.droid.bleBuildScanFilter(filter_list)
     scan_settings = scn_ad.droid.bleBuildScanSetting()
     scan_callback = scn_ad.droid.bleGenScanCallback()
     scn_ad.droid.bleStartBleScan(filter_list, scan_settings, scan_callback)
-    start_time = time.time()
-    while (start_time + DEFAULT_TIMEOUT) > time.time():
-        event = None
-        try:
-            event = scn_ad.ed.pop_event(
-                scan_result.format(scan_callback), DEFAULT_TIMEOUT)
-        except Empty as error:
-            raise BtTestUtilsError("Failed to find scan event: {}".format(
-                error))
-        address = event['data']['Result']['deviceInfo']['address']
-        if address not in address_list:
-            address_list.append(address)
-        if len(address_list) == max_advertisements:
-            test_result = True
-            break
+    aggregator = BleScanAggregator(scn_ad.ed, [scan_callback])
+    try:
+        test_result = aggregator.wait_for_devices(max_advertisements,
+                                                  DEFAULT_TIMEOUT)
+    except Empty as error:
+        raise BtTestUtilsError("Failed to find scan event: {}".format(error))
     scn_ad.droid.bleStopBleScan(scan_callback)
     return test_result
 
@@ -162,6 +338,182 @@ def teardown_n_advertisements(adv_ad, num_advertisements,
     return True
 
 
+def wait_for_advertise_results(ed, advertise_callbacks,
+                               timeout=DEFAULT_TIMEOUT):
+    """Waits for the success or failure events of advertisements started
+    back to back.
+
+    The events of all the advertisements are collected as they come, so a
+    failure is seen as soon as it is reported and the total wait is bounded
+    by the slowest advertisement instead of the sum of them.
+
+    Args:
+        ed: The event dispatcher of the advertising Android device.
+        advertise_callbacks: The advertise callback ids to wait for.
+        timeout: Number of seconds to wait for all the events.
+
+    Returns:
+        A dict of advertise callback id to the time.time() its success event
+        was popped at, or None if it failed or timed out.
+    """
+    results = {}
+    pending = list(advertise_callbacks)
+    deadline = time.time() + timeout
+    while True:
+        still_pending = []
+        for callback in pending:
+            if ed.pop_all(adv_succ.format(callback)):
+                results[callback] = time.time()
+            elif ed.pop_all(adv_fail.format(callback)):
+                results[callback] = None
+            else:
+                still_pending.append(callback)
+        pending = still_pending
+        if not pending or time.time() > deadline:
+            break
+        time.sleep(ADVERTISE_POLL_INTERVAL)
+    for callback in pending:
+        results[callback] = None
+    return results
+
+
+def start_advertisements_async(ad, num_advertisements, include_name=False,
+                               timeout=DEFAULT_TIMEOUT):
+    """Starts advertisements on an Android device without waiting for each
+    of them to succeed before starting the next one.
+
+    The advertise mode, data and settings are built once and shared by all
+    the advertisements.
+
+    Args:
+        ad: The Android device to start LE advertisements on.
+        num_advertisements: The number of advertisements to start.
+        include_name: True to include the device name in the advertise data.
+        timeout: Number of seconds to wait for all the advertisements to
+            succeed or fail.
+
+    Returns:
+        A dict of advertise callback id to the time.time() the advertisement
+        succeeded at, or None if it failed.
+    """
+    droid = ad.droid
+    droid.bleSetAdvertiseDataIncludeDeviceName(include_name)
+    droid.bleSetAdvertiseSettingsAdvertiseMode(
+        AdvertiseSettingsAdvertiseMode.ADVERTISE_MODE_LOW_LATENCY.value)
+    advertise_data = droid.bleBuildAdvertiseData()
+    advertise_settings = droid.bleBuildAdvertiseSettings()
+    advertise_callbacks = _start_advertisements(
+        droid, num_advertisements, advertise_data, advertise_settings)
+    return wait_for_advertise_results(ad.ed, advertise_callbacks, timeout)
+
+
+def _start_advertisements(droid, num_advertisements, advertise_data,
+                          advertise_settings):
+    """Starts advertisements without waiting for their events, and returns
+    their advertise callback ids.
+    """
+    advertise_callbacks = []
+    for _ in range(num_advertisements):
+        advertise_callback = droid.bleGenBleAdvertiseCallback()
+        droid.bleStartBleAdvertising(advertise_callback, advertise_data,
+                                     advertise_settings)
+        advertise_callbacks.append(advertise_callback)
+    return advertise_callbacks
+
+
+class BleAdvertiserSwarm(object):
+    """Brings up LE advertisements on many Android devices at once.
+
+    All the devices are set up concurrently, and each of them starts its
+    advertisements back to back before collecting their success events.
+
+    Attributes:
+        android_devices: The Android devices advertising.
+        advertise_callbacks: A dict of device serial to the list of advertise
+            callback ids that started successfully.
+        device_names: The set of local Bluetooth names of the devices with at
+            least one advertisement started.
+        num_advertising: Number of advertisements started successfully.
+        time_to_full_swarm: Seconds between the beginning of the last start
+            and the success of its last advertisement, None if some failed.
+    """
+
+    def __init__(self, android_devices):
+        self.android_devices = android_devices
+        self.advertise_callbacks = {}
+        self.device_names = set()
+        self.num_advertising = 0
+        self.time_to_full_swarm = None
+
+    def _start_device(self, ad, num_advertisements, restart, timeout):
+        if restart and not reset_bluetooth([ad]):
+            raise BtTestUtilsError("Failed to reset Bluetooth on {}.".format(
+                ad.serial))
+        results = start_advertisements_async(ad, num_advertisements,
+                                             include_name=True,
+                                             timeout=timeout)
+        name = ad.droid.bluetoothGetLocalName()
+        return name, results
+
+    def start(self, num_advertisements, restart=False, timeout=DEFAULT_TIMEOUT):
+        """Starts advertisements on all the devices.
+
+        Args:
+            num_advertisements: The number of advertisements to start on each
+                device.
+            restart: True to reset Bluetooth on the devices first.
+            timeout: Number of seconds each device waits for its
+                advertisements to succeed.
+
+        Returns:
+            True if all the advertisements started successfully.
+        """
+        begin_time = time.time()
+        params = [(ad, num_advertisements, restart, timeout)
+                  for ad in self.android_devices]
+        device_results = utils.concurrent_map(self._start_device,
+                                              params,
+                                              raise_on_error=False)
+        self.advertise_callbacks = {}
+        self.device_names = set()
+        self.num_advertising = 0
+        success_times = []
+        all_started = True
+        for ad, device_result in zip(self.android_devices, device_results):
+            if isinstance(device_result, Exception):
+                log.error("Failed to start advertisements on {}: {}".format(
+                    ad.serial, device_result))
+                all_started = False
+                continue
+            name, results = device_result
+            started = [c for c, t in results.items() if t is not None]
+            self.advertise_callbacks[ad.serial] = started
+            self.num_advertising += len(started)
+            success_times.extend(results[c] for c in started)
+            if started:
+                self.device_names.add(name)
+            if len(started) < num_advertisements:
+                all_started = False
+        if all_started:
+            self.time_to_full_swarm = max(success_times,
+                                          default=begin_time) - begin_time
+            log.info("{} advertisements active after {:.2f}s.".format(
+                self.num_advertising, self.time_to_full_swarm))
+        else:
+            self.time_to_full_swarm = None
+            log.info("{} advertisements active, expected {}.".format(
+                self.num_advertising,
+                num_advertisements * len(self.android_devices)))
+        return all_started
+
+    def stop(self):
+        """Stops all the advertisements started."""
+        for ad in self.android_devices:
+            for callback in self.advertise_callbacks.pop(ad.serial, []):
+                ad.droid.bleStopBleAdvertising(callback)
+        self.num_advertising = 0
+
+
 def generate_ble_scan_objects(droid):
     """Generate generic LE scan objects.
 
@@ -215,36 +567,129 @@ def setup_multiple_devices_for_bt_test(android_devices):
     # TODO: Temp fix for an selinux error.
     for ad in android_devices:
         ad.adb.shell("setenforce 0")
-    threads = []
-    try:
-        for a in android_devices:
-            thread = threading.Thread(target=reset_bluetooth, args=([[a]]))
-            threads.append(thread)
-            thread.start()
-        for t in threads:
-            t.join()
-
-        for a in android_devices:
-            d = a.droid
-            setup_result = d.bluetoothSetLocalName(generate_id_by_size(4))
-            if not setup_result:
-                log.error("Failed to set device name.")
-                return setup_result
-            d.bluetoothDisableBLE()
-            bonded_devices = d.bluetoothGetBondedDevices()
-            for b in bonded_devices:
-                d.bluetoothUnbond(b['address'])
-        for a in android_devices:
-            setup_result = a.droid.bluetoothConfigHciSnoopLog(True)
-            if not setup_result:
-                log.error("Failed to enable Bluetooth Hci Snoop Logging.")
-                return setup_result
-    except Exception as err:
-        log.error("Something went wrong in multi device setup: {}".format(err))
-        return False
+    if not reset_bluetooth(android_devices):
+        log.error("Failed to reset Bluetooth, continuing...")
+    results = utils.concurrent_map(_setup_device_for_bt_test,
+                                   [(a, ) for a in android_devices],
+                                   raise_on_error=False)
+    for result in results:
+        if isinstance(result, Exception):
+            log.error("Something went wrong in multi device setup: {}".format(
+                result))
+            return False
+        if not result:
+            return result
+    return True
+
+
+def _setup_device_for_bt_test(ad):
+    d = ad.droid
+    setup_result = d.bluetoothSetLocalName(generate_id_by_size(4))
+    if not setup_result:
+        log.error("Failed to set device name.")
+        return setup_result
+    d.bluetoothDisableBLE()
+    bonded_devices = d.bluetoothGetBondedDevices()
+    for b in bonded_devices:
+        d.bluetoothUnbond(b['address'])
+    setup_result = d.bluetoothConfigHciSnoopLog(True)
+    if not setup_result:
+        log.error("Failed to enable Bluetooth Hci Snoop Logging.")
     return setup_result
 
 
+def get_bt_wait_stats():
+    """Gets the statistics of the Bluetooth state waits accumulated since
+    the last reset_bt_wait_stats.
+
+    "saved" is the time saved compared to the fixed sleeps the waits
+    replaced.
+
+    Returns:
+        A dict with the number of waits, the total seconds spent waiting and
+        the total seconds saved.
+    """
+    with _bt_wait_stats_lock:
+        return dict(_bt_wait_stats)
+
+
+def reset_bt_wait_stats():
+    """Starts accumulating the statistics of the Bluetooth state waits over.
+    """
+    with _bt_wait_stats_lock:
+        _bt_wait_stats.update(waits=0, elapsed=0.0, saved=0.0)
+
+
+def _record_bt_wait(elapsed, saved):
+    with _bt_wait_stats_lock:
+        _bt_wait_stats["waits"] += 1
+        _bt_wait_stats["elapsed"] += elapsed
+        _bt_wait_stats["saved"] += saved
+
+
+def wait_for_bt_condition(check_func, timeout=DEFAULT_TIMEOUT,
+                          replaced_sleep=0):
+    """Waits until check_func returns True.
+
+    The interval between two checks starts at BT_POLL_INTERVAL_MIN and
+    doubles up to BT_POLL_INTERVAL_MAX, so fast state changes are seen
+    quickly without hammering the device during slow ones.
+
+    Args:
+        check_func: A function returning True once the condition is met.
+        timeout: Number of seconds to wait for.
+        replaced_sleep: Number of seconds of the fixed sleep this wait
+            replaces, to account for the time saved. Waits not replacing any
+            sleep are not accounted for.
+
+    Returns:
+        True if the condition was met before time out, False otherwise.
+    """
+    begin_time = time.time()
+    deadline = begin_time + timeout
+    interval = BT_POLL_INTERVAL_MIN
+    while True:
+        if check_func():
+            if replaced_sleep:
+                elapsed = time.time() - begin_time
+                _record_bt_wait(elapsed, replaced_sleep - elapsed)
+            return True
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return False
+        time.sleep(min(interval, remaining))
+        interval = min(interval * 2, BT_POLL_INTERVAL_MAX)
+
+
+def set_bluetooth_state(ad, state, timeout=DEFAULT_TIMEOUT):
+    """Turns Bluetooth on or off and waits for the state change event.
+
+    Args:
+        ad: The Android device to set the Bluetooth state of.
+        state: True to turn Bluetooth on, False to turn it off.
+        timeout: Number of seconds to wait for the state change.
+
+    Returns:
+        True if Bluetooth is in the requested state.
+    """
+    if bool(ad.droid.bluetoothCheckState()) == state:
+        return True
+    event_name = bluetooth_on if state else bluetooth_off
+    # Events of earlier state changes must not satisfy this one.
+    ad.ed.clear_events(event_name)
+    ad.droid.bluetoothToggleState(state)
+    try:
+        ad.ed.pop_event(event_name, timeout)
+    except Empty:
+        log.info("Failed to toggle Bluetooth {} (no broadcast received).".format(
+            "on" if state else "off"))
+        # Try one more time to poke at the actual state.
+        actual_state = bool(ad.droid.bluetoothCheckState())
+        log.info(".. actual state is {}".format("ON" if actual_state else "OFF"))
+        return actual_state == state
+    return True
+
+
 def bluetooth_enabled_check(ad):
     """Checks if the Bluetooth state is enabled, if not it will attempt to
     enable it.
@@ -255,114 +700,123 @@ def bluetooth_enabled_check(ad):
     Returns:
         True if successful, false if unsuccessful.
     """
-    if not ad.droid.bluetoothCheckState():
-        ad.droid.bluetoothToggleState(True)
-        expected_bluetooth_on_event_name = bluetooth_on
-        try:
-            ad.ed.pop_event(expected_bluetooth_on_event_name, DEFAULT_TIMEOUT)
-        except Empty:
-            log.info("Failed to toggle Bluetooth on (no broadcast received).")
-            # Try one more time to poke at the actual state.
-            if ad.droid.bluetoothCheckState():
-                log.info(".. actual state is ON")
-                return True
-            log.error(".. actual state is OFF")
-            return False
+    return set_bluetooth_state(ad, True)
+
+
+def _reset_bluetooth_device(ad):
+    log.info("Reset state of bluetooth on device: {}".format(ad.serial))
+    begin_time = time.time()
+    if not set_bluetooth_state(ad, False):
+        log.error("Failed to toggle Bluetooth off.")
+        return False
+    # b/17723234: the off broadcast may come before the adapter is done
+    # turning off, and turning it back on then fails. This replaces the
+    # fixed sleep that used to work around it.
+    if not wait_for_bt_condition(lambda: not ad.droid.bluetoothCheckState()):
+        log.error("Bluetooth still on after the off broadcast.")
+        return False
+    if not set_bluetooth_state(ad, True):
+        return False
+    # The state change events were waited for along with the sleep, so only
+    # the sleep is saved.
+    _record_bt_wait(time.time() - begin_time, BT_RESET_REPLACED_SLEEP)
     return True
 
 
 def reset_bluetooth(android_devices):
     """Resets Bluetooth state of input Android device list.
 
+    The devices are reset in parallel, each one waiting for its Bluetooth
+    state change events.
+
     Args:
         android_devices: The Android device list to reset Bluetooth state on.
 
     Returns:
         True if successful, false if unsuccessful.
     """
-    for a in android_devices:
-        droid, ed = a.droid, a.ed
-        log.info("Reset state of bluetooth on device: {}".format(
-            droid.getBuildSerial()))
-        if droid.bluetoothCheckState() is True:
-            droid.bluetoothToggleState(False)
-            expected_bluetooth_off_event_name = bluetooth_off
-            try:
-                ed.pop_event(expected_bluetooth_off_event_name,
-                             DEFAULT_TIMEOUT)
-            except Exception:
-                log.error("Failed to toggle Bluetooth off.")
-                return False
-        # temp sleep for b/17723234
-        time.sleep(3)
-        if not bluetooth_enabled_check(a):
-            return False
-    return True
+    results = utils.concurrent_map(_reset_bluetooth_device,
+                                   [(a, ) for a in android_devices],
+                                   raise_on_error=False)
+    for a, result in zip(android_devices, results):
+        if isinstance(result, Exception):
+            log.error("Failed to reset Bluetooth on {}: {}".format(a.serial,
+                                                                   result))
+    return all(r is True for r in results)
 
 
 def determine_max_advertisements(android_device):
     """Determines programatically how many advertisements the Android device
     supports.
 
+    Advertisements are started ADVERTISE_PROBE_BATCH_SIZE at a time without
+    waiting for each other, until one of them fails. Failures are reported
+    by their failure event as soon as they happen.
+
     Args:
         android_device: The Android device to determine max advertisements of.
 
     Returns:
-        The maximum advertisement count.
+        The maximum advertisement count, -1 if Bluetooth could not be turned
+        on.
     """
     log.info("Determining number of maximum concurrent advertisements...")
-    advertisement_count = 0
-    bt_enabled = False
-    if not android_device.droid.bluetoothCheckState():
-        android_device.droid.bluetoothToggleState(True)
-    try:
-        android_device.ed.pop_event(expected_bluetooth_on_event_name,
-                                    DEFAULT_TIMEOUT)
-    except Exception:
-        log.info("Failed to toggle Bluetooth on (no broadcast received).")
-        # Try one more time to poke at the actual state.
-        if android_device.droid.bluetoothCheckState() is True:
-            log.info(".. actual state is ON")
-        else:
-            log.error(
-                "Failed to turn Bluetooth on. Setting default advertisements to 1")
-            advertisement_count = -1
-            return advertisement_count
+    if not bluetooth_enabled_check(android_device):
+        log.error(
+            "Failed to turn Bluetooth on. Setting default advertisements to 1")
+        return -1
+    droid = android_device.droid
     advertise_callback_list = []
-    advertise_data = android_device.droid.bleBuildAdvertiseData()
-    advertise_settings = android_device.droid.bleBuildAdvertiseSettings()
-    while (True):
-        advertise_callback = android_device.droid.bleGenBleAdvertiseCallback()
-        advertise_callback_list.append(advertise_callback)
-
-        android_device.droid.bleStartBleAdvertising(
-            advertise_callback, advertise_data, advertise_settings)
-        try:
-            android_device.ed.pop_event(
-                adv_succ.format(advertise_callback), DEFAULT_TIMEOUT)
-            log.info("Advertisement {} started.".format(advertisement_count +
-                                                        1))
-            advertisement_count += 1
-        except Exception as err:
+    advertise_data = droid.bleBuildAdvertiseData()
+    advertise_settings = droid.bleBuildAdvertiseSettings()
+    advertisement_count = 0
+    while True:
+        advertise_callbacks = _start_advertisements(
+            droid, ADVERTISE_PROBE_BATCH_SIZE, advertise_data,
+            advertise_settings)
+        advertise_callback_list.extend(advertise_callbacks)
+        results = wait_for_advertise_results(android_device.ed,
+                                             advertise_callbacks)
+        num_started = sum(t is not None for t in results.values())
+        advertisement_count += num_started
+        log.info("{} advertisements started.".format(advertisement_count))
+        if num_started < len(advertise_callbacks):
             log.info(
                 "Advertisement failed to start. Reached max advertisements at {}".
                 format(advertisement_count))
             break
     try:
         for adv in advertise_callback_list:
-            android_device.droid.bleStopBleAdvertising(adv)
+            droid.bleStopBleAdvertising(adv)
     except Exception:
         log.error("Failed to stop advertisingment, resetting Bluetooth.")
         reset_bluetooth([android_device])
     return advertisement_count
 
 
+def _probe_max_advertisements(android_device, max_tries=3):
+    """Determines max advertisements, retrying if Bluetooth could not be
+    turned on.
+    """
+    max_advertisements = determine_max_advertisements(android_device)
+    #Retry to calculate max advertisements
+    while max_advertisements == -1 and max_tries > 0:
+        log.info("Attempts left to determine max advertisements: {}".format(
+            max_tries))
+        max_advertisements = determine_max_advertisements(android_device)
+        max_tries -= 1
+    return max_advertisements
+
+
 def get_advanced_droid_list(android_devices):
     """Add max_advertisement and batch_scan_supported attributes to input
     Android devices
 
     This will programatically determine maximum LE advertisements of each
-    input Android device.
+    input Android device. The devices are probed in parallel, and only one
+    device per build fingerprint is probed. The results are kept per build
+    fingerprint in advertisements_to_devices, and per device in the
+    capability cache so later runs on the same build skip the probe.
 
     Args:
         android_devices: The Android devices to setup.
@@ -370,30 +824,48 @@ def get_advanced_droid_list(android_devices):
     Returns:
         List of Android devices with new attribtues.
     """
-    droid_list = []
+    cache = capability_cache.get_default_cache()
+    fingerprints = []
+    to_probe = {}
     for a in android_devices:
+        fingerprint = capability_cache.get_build_fingerprint(a)
+        if fingerprint is None:
+            # Don't share the result with other devices of unknown builds.
+            fingerprint = a.serial
+        fingerprints.append(fingerprint)
+        if fingerprint in advertisements_to_devices:
+            continue
+        cached = cache.get(a, CAPABILITY_MAX_ADVERTISEMENTS, fingerprint)
+        if cached is not None:
+            advertisements_to_devices[fingerprint] = cached
+        else:
+            to_probe.setdefault(fingerprint, a)
+    if to_probe:
+        results = utils.concurrent_map(_probe_max_advertisements,
+                                       [(a, ) for a in to_probe.values()],
+                                       raise_on_error=False)
+        for fingerprint, max_advertisements in zip(to_probe, results):
+            if isinstance(max_advertisements, Exception):
+                log.error("Failed to determine max advertisements of {}: "
+                          "{}".format(fingerprint, max_advertisements))
+                max_advertisements = -1
+            advertisements_to_devices[fingerprint] = max_advertisements
+        for a, fingerprint in zip(android_devices, fingerprints):
+            max_advertisements = advertisements_to_devices[fingerprint]
+            if (fingerprint in to_probe and fingerprint != a.serial and
+                    max_advertisements != -1):
+                cache.set(a, CAPABILITY_MAX_ADVERTISEMENTS,
+                          max_advertisements, fingerprint)
+    droid_list = []
+    for a, fingerprint in zip(android_devices, fingerprints):
         d, e = a.droid, a.ed
-        model = d.getBuildModel()
-        max_advertisements = 1
         batch_scan_supported = True
-        if model in advertisements_to_devices.keys():
-            max_advertisements = advertisements_to_devices[model]
-        else:
-            max_advertisements = determine_max_advertisements(a)
-            max_tries = 3
-            #Retry to calculate max advertisements
-            while max_advertisements == -1 and max_tries > 0:
-                log.info("Attempts left to determine max advertisements: {}".
-                         format(max_tries))
-                max_advertisements = determine_max_advertisements(a)
-                max_tries -= 1
-            advertisements_to_devices[model] = max_advertisements
-        if model in batch_scan_not_supported_list:
+        if d.getBuildModel() in batch_scan_not_supported_list:
             batch_scan_supported = False
         role = {
             'droid': d,
             'ed': e,
-            'max_advertisements': max_advertisements,
+            'max_advertisements': advertisements_to_devices[fingerprint],
             'batch_scan_supported': batch_scan_supported
         }
         droid_list.append(role)
@@ -560,11 +1032,10 @@ def set_device_name(droid, name):
         True if successful, false if unsuccessful.
     """
     droid.bluetoothSetLocalName(name)
-    time.sleep(2)
-    droid_name = droid.bluetoothGetLocalName()
-    if droid_name != name:
-        return False
-    return True
+    return wait_for_bt_condition(
+        lambda: droid.bluetoothGetLocalName() == name,
+        timeout=2,
+        replaced_sleep=2)
 
 
 def check_device_supported_profiles(droid):
@@ -628,16 +1099,15 @@ def pair_pri_to_sec(pri_droid, sec_droid):
     sec_droid.bluetoothStartPairingHelper()
     log.info("Primary device starting discovery and executing bond")
     result = pri_droid.bluetoothDiscoverAndBond(target_address)
-    # Loop until we have bonded successfully or timeout.
-    end_time = time.time() + DEFAULT_TIMEOUT
     log.info("Verifying devices are bonded")
-    while time.time() < end_time:
-        bonded_devices = pri_droid.bluetoothGetBondedDevices()
-        bonded = False
-        for d in bonded_devices:
-            if d['address'] == target_address:
-                log.info("Successfully bonded to device")
-                return True
+
+    def is_bonded():
+        return any(d['address'] == target_address
+                   for d in pri_droid.bluetoothGetBondedDevices())
+
+    if wait_for_bt_condition(is_bonded):
+        log.info("Successfully bonded to device")
+        return True
     # Timed out trying to bond.
     log.info("Failed to bond devices.")
     return False
@@ -705,16 +1175,152 @@ def connect_pri_to_sec(log, pri_droid, sec_droid, profiles_set):
     return True
 
 
+class BtSnoopLogCollector(object):
+    """Pulls the HCI snoop logs of Android devices incrementally.
+
+    The snoop log of a device keeps growing during a test run. The collector
+    remembers how far the log of each device was read, and only transfers the
+    records appended since. Every pulled segment gets the header of the log
+    prepended, so it is a valid btsnoop file on its own. The read position
+    starts over once the log is rotated or truncated.
+
+    Attributes:
+        log_path: The path of the snoop log on the devices.
+    """
+
+    def __init__(self, log_path=BTSNOOP_LOG_PATH):
+        self.log_path = log_path
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def _stat(self, ad):
+        """Returns the (size, inode) of the snoop log, None if missing."""
+        try:
+            # adb commands go through the host shell, the remote command is
+            # quoted so the device gets the format quoted too.
+            out = ad.adb.shell("\"stat -c '%s %i' {}\"".format(
+                self.log_path))
+            size, inode = out.decode("utf-8").split()
+            return int(size), inode
+        except (AdbError, ValueError):
+            return None
+
+    def _mark(self, ad):
+        stat = self._stat(ad)
+        state = {"inode": None, "offset": 0, "aligned": True, "header": None}
+        if stat is not None:
+            size, state["inode"] = stat
+            if size > btsnoop.BTSNOOP_HEADER_LEN:
+                # The log may be mid-record, pull resyncs on the next record.
+                state["offset"] = size
+                state["aligned"] = False
+        with self._lock:
+            self._states[str(ad.serial)] = state
+
+    def mark(self, android_devices):
+        """Skips the records logged so far, so the next pull only gets the
+        records logged from now on.
+
+        Args:
+            android_devices: The list of Android devices.
+        """
+        results = utils.concurrent_map(self._mark,
+                                       [(a, ) for a in android_devices],
+                                       raise_on_error=False)
+        for a, result in zip(android_devices, results):
+            if isinstance(result, Exception):
+                log.error("Failed to mark the btsnoop log of {}: {}".format(
+                    a.serial, result))
+
+    def pull(self, ad, out_path):
+        """Pulls the records logged since the last pull or mark.
+
+        A last record still being written is left for the next pull.
+
+        Args:
+            ad: The Android device.
+            out_path: The path of the btsnoop file to write.
+
+        Returns:
+            The number of bytes of records written, None if the device has no
+            valid snoop log.
+        """
+        stat = self._stat(ad)
+        if stat is None:
+            log.warning("No btsnoop log on {}.".format(ad.serial))
+            return None
+        size, inode = stat
+        with self._lock:
+            state = self._states.get(str(ad.serial))
+        if (state is None or state["inode"] != inode or
+                size < state["offset"]):
+            state = {"inode": inode,
+                     "offset": 0,
+                     "aligned": True,
+                     "header": None}
+        offset = state["offset"]
+        data = ad.adb.exec_out("tail -c +{} {}".format(offset + 1,
+                                                        self.log_path))
+        start = 0
+        header = state["header"]
+        if offset == 0:
+            header = data[:btsnoop.BTSNOOP_HEADER_LEN]
+            start = len(header)
+        elif header is None:
+            header = ad.adb.exec_out("head -c {} {}".format(
+                btsnoop.BTSNOOP_HEADER_LEN, self.log_path))
+        try:
+            btsnoop.parse_header(header)
+        except btsnoop.BtSnoopError as e:
+            log.error("Invalid btsnoop log on {}: {}".format(ad.serial, e))
+            return None
+        chunks = []
+        consumed, aligned = start, state["aligned"]
+        position = (start if aligned else
+                    btsnoop.find_record_boundary(data, start))
+        while position is not None:
+            end = btsnoop.end_of_complete_records(data, position)
+            chunks.append(data[position:end])
+            consumed, aligned = end, True
+            if (len(data) - end < btsnoop.BTSNOOP_RECORD_HEADER_LEN or
+                    btsnoop.is_record_header(data, end)):
+                break
+            log.warning("Skipping corrupted btsnoop records at {} on {}."
+                        .format(offset + end, ad.serial))
+            aligned = False
+            position = btsnoop.find_record_boundary(data, end + 1)
+        records = b"".join(chunks)
+        with open(out_path, "wb") as f:
+            f.write(header)
+            f.write(records)
+        state.update(offset=offset + consumed, aligned=aligned, header=header)
+        with self._lock:
+            self._states[str(ad.serial)] = state
+        return len(records)
+
+
+# The collector used by take_btsnoop_logs and BluetoothBaseTest.
+btsnoop_collector = BtSnoopLogCollector()
+
+
 def take_btsnoop_logs(android_devices, testcase, testname):
     """Pull btsnoop logs from an input list of android devices.
 
+    The logs of all the devices are pulled at the same time.
+
     Args:
         android_devices: the list of Android devices to pull btsnoop logs from.
         testcase: Name of the test calss that triggered this snoop log.
         testname: Name of the test case that triggered this bug report.
     """
-    for a in android_devices:
-        take_btsnoop_log(a, testcase, testname)
+    results = utils.concurrent_map(take_btsnoop_log,
+                                   [(a, testcase, testname)
+                                    for a in android_devices],
+                                   raise_on_error=False)
+    for a, result in zip(android_devices, results):
+        if isinstance(result, Exception):
+            log.error("Failed to take the btsnoop log of {}: {}".format(
+                a.serial, result))
 
 
 def take_btsnoop_log(ad, testcase, testname):
@@ -722,13 +1328,17 @@ def take_btsnoop_log(ad, testcase, testname):
     of the test class.
 
     If you want grab the btsnoop_hci log, call this function with android_device
-    objects in on_fail. Bug report takes a relative long time to take, so use
-    this cautiously.
+    objects in on_fail. Only the records logged since the last pull, or since
+    btsnoop_collector.mark was called, are transferred.
 
     Args:
         ad: The android_device instance to take bugreport on.
         testcase: Name of the test calss that triggered this snoop log.
         testname: Name of the test case that triggered this bug report.
+
+    Returns:
+        The number of bytes of records pulled, None if there is no valid
+        btsnoop log on the device.
     """
     testname = "".join(x for x in testname if x.isalnum())
     serial = ad.droid.getBuildSerial()
@@ -737,11 +1347,10 @@ def take_btsnoop_log(ad, testcase, testname):
     out_name = ','.join((testname, device_model, serial))
     snoop_path = ad.log_path + "/BluetoothSnoopLogs"
     utils.create_dir(snoop_path)
-    cmd = ''.join(("adb -s ", serial, " pull /sdcard/btsnoop_hci.log ",
-                   snoop_path + '/' + out_name, ".btsnoop_hci.log"))
     testcase.log.info("Test failed, grabbing the bt_snoop logs on {} {}."
                       .format(device_model, serial))
-    exe_cmd(cmd)
+    return btsnoop_collector.pull(
+        ad, os.path.join(snoop_path, out_name + ".btsnoop_hci.log"))
 
 
 def kill_bluetooth_process(ad):
@@ -773,20 +1382,12 @@ def orchestrate_rfcomm_connection(client_ad,
         RfcommUuid.DEFAULT_UUID.value, accept_timeout_ms)
     client_ad.droid.bluetoothRfcommBeginConnectThread(
         server_ad.droid.bluetoothGetLocalAddress())
-    end_time = time.time() + DEFAULT_TIMEOUT
-    result = False
-    test_result = True
-    while time.time() < end_time:
-        if len(client_ad.droid.bluetoothRfcommActiveConnections()) > 0:
-            test_result = True
-            log.info("RFCOMM Client Connection Active")
-            break
-        else:
-            test_result = False
-        time.sleep(1)
-    if not test_result:
+    if not wait_for_bt_condition(
+            lambda: client_ad.droid.bluetoothRfcommActiveConnections(),
+            replaced_sleep=RFCOMM_CONNECT_REPLACED_POLL_INTERVAL):
         log.error("Failed to establish an RFCOMM connection")
         return False
+    log.info("RFCOMM Client Connection Active")
     return True
 
 
@@ -828,6 +1429,223 @@ def write_read_verify_data(client_ad, server_ad, msg, binary=False):
     return True
 
 
+class RfcommThroughputBenchmark(object):
+    """Measures the data throughput of an established RFCOMM connection.
+
+    A writer thread on the client and a reader thread on the server run at
+    the same time, so the RPC round trips of both sides overlap instead of
+    adding up. The writer stays at most window messages ahead of the reader.
+    RFCOMM is a byte stream, a read returns whatever was received, so the
+    reader splits the data read into messages of message_size bytes. Every
+    message starts with its sequence number, checked by the reader, and a
+    crc32 of all the data is kept on both sides and compared at the end.
+
+    Attributes:
+        client_ad: The Android device writing the data.
+        server_ad: The Android device reading the data.
+        message_size: Number of bytes of each message.
+        window: Max number of messages written but not read yet.
+        binary: True to transfer random bytes with the binary RPCs, which
+            carry the data base64 encoded, instead of ascii text.
+        latencies: Seconds between the write and the read of each message.
+        errors: The errors which stopped the transfer.
+    """
+
+    def __init__(self,
+                 client_ad,
+                 server_ad,
+                 message_size=DEFAULT_RFCOMM_MESSAGE_SIZE,
+                 window=DEFAULT_RFCOMM_WINDOW,
+                 binary=False):
+        if message_size <= RFCOMM_SEQUENCE_LENGTH:
+            raise BtTestUtilsError(
+                "RFCOMM messages must be longer than {} characters.".format(
+                    RFCOMM_SEQUENCE_LENGTH))
+        self.client_ad = client_ad
+        self.server_ad = server_ad
+        self.message_size = message_size
+        self.window = window
+        self.binary = binary
+        self.latencies = []
+        self.errors = []
+        payload_size = message_size - RFCOMM_SEQUENCE_LENGTH
+        if binary:
+            self._payload = bytes(random.getrandbits(8)
+                                  for _ in range(payload_size))
+        else:
+            self._payload = "".join(
+                random.choice(string.ascii_letters + string.digits)
+                for _ in range(payload_size)).encode()
+        self._write_times = {}
+        self._write_crc = 0
+        self._read_crc = 0
+        self._num_written = 0
+        self._num_read = 0
+        self._window = threading.Semaphore(window)
+        self._written = threading.Semaphore(0)
+        self._stop = threading.Event()
+
+    def _message(self, seq):
+        sequence = "{:0{}d}".format(seq % 10**RFCOMM_SEQUENCE_LENGTH,
+                                    RFCOMM_SEQUENCE_LENGTH)
+        return sequence.encode() + self._payload
+
+    def _read_data(self, droid):
+        """Reads the bytes received so far, blocking until there are some."""
+        if self.binary:
+            return base64.b64decode(droid.bluetoothRfcommReadBinary())
+        return droid.bluetoothRfcommRead().encode()
+
+    def _write(self, num_messages, deadline):
+        droid = self.client_ad.droid
+        seq = 0
+        try:
+            while True:
+                if num_messages is not None and seq >= num_messages:
+                    break
+                if deadline is not None and time.time() >= deadline:
+                    break
+                if not self._window.acquire(timeout=DEFAULT_TIMEOUT):
+                    raise BtTestUtilsError(
+                        "No message read for {}s.".format(DEFAULT_TIMEOUT))
+                if self._stop.is_set():
+                    break
+                msg = self._message(seq)
+                self._write_times[seq] = time.time()
+                if self.binary:
+                    droid.bluetoothRfcommWriteBinary(
+                        base64.b64encode(msg).decode())
+                else:
+                    droid.bluetoothRfcommWrite(msg.decode())
+                self._write_crc = zlib.crc32(msg, self._write_crc)
+                seq += 1
+                self._num_written = seq
+                self._written.release()
+        except Exception as err:
+            self.errors.append("Failed to write data: {}".format(err))
+            self._stop.set()
+        finally:
+            # Wakes the reader up once all the messages are read.
+            self._written.release()
+
+    def _read(self):
+        droid = self.server_ad.droid
+        seq = 0
+        data = b""
+        try:
+            while True:
+                self._written.acquire()
+                if self._stop.is_set() or seq >= self._num_written:
+                    break
+                # Messages written back to back may be read at once, and a
+                # message may be split over several reads.
+                while len(data) < self.message_size:
+                    data += self._read_data(droid)
+                msg = data[:self.message_size]
+                data = data[self.message_size:]
+                self.latencies.append(time.time() -
+                                      self._write_times.pop(seq))
+                self._read_crc = zlib.crc32(msg, self._read_crc)
+                expected = self._message(seq)[:RFCOMM_SEQUENCE_LENGTH]
+                if msg[:RFCOMM_SEQUENCE_LENGTH] != expected:
+                    raise BtTestUtilsError(
+                        "Expected message {}, read {}.".format(
+                            expected, msg[:RFCOMM_SEQUENCE_LENGTH]))
+                seq += 1
+                self._num_read = seq
+                self._window.release()
+        except Exception as err:
+            self.errors.append("Failed to read data: {}".format(err))
+            self._stop.set()
+            # Wakes the writer up if it waits for the window.
+            self._window.release()
+
+    def _join_reader(self, reader):
+        """Waits for the reader as long as it keeps reading messages.
+
+        A read RPC blocks until data is received, so a reader stuck on a
+        dropped connection only returns once the sockets are stopped.
+        """
+        num_read = None
+        while reader.is_alive() and self._num_read != num_read:
+            num_read = self._num_read
+            reader.join(DEFAULT_TIMEOUT)
+        if not reader.is_alive():
+            return
+        self.errors.append("No message read for {}s.".format(DEFAULT_TIMEOUT))
+        self._stop.set()
+        for ad in (self.client_ad, self.server_ad):
+            try:
+                ad.droid.bluetoothRfcommStop()
+            except Exception as err:
+                log.error("Failed to stop RFCOMM on {}: {}".format(ad.serial,
+                                                                   err))
+        reader.join(DEFAULT_TIMEOUT)
+
+    def run(self, duration=None, num_messages=None):
+        """Transfers data until duration seconds passed or num_messages
+        messages were written, then waits for all of them to be read.
+
+        A benchmark object can only be run once.
+
+        Args:
+            duration: Number of seconds to write data for.
+            num_messages: Number of messages to write.
+
+        Returns:
+            A dict with the number of "bytes" and "messages" read, the
+            "duration" of the transfer in seconds, the throughput in
+            "mb_per_sec", and the "latency_ms" percentiles, a dict of
+            50, 90 and 99 to the latency in milliseconds. None if the
+            transfer failed, see errors. If no data was read for
+            DEFAULT_TIMEOUT seconds, the RFCOMM connection is stopped.
+
+        Raises:
+            BtTestUtilsError: Raised if neither duration nor num_messages is
+                set, or if no message was transferred.
+        """
+        if duration is None and num_messages is None:
+            raise BtTestUtilsError("Either duration or num_messages is needed.")
+        begin_time = time.time()
+        deadline = None if duration is None else begin_time + duration
+        writer = threading.Thread(target=self._write,
+                                  args=(num_messages, deadline))
+        reader = threading.Thread(target=self._read)
+        writer.daemon = True
+        reader.daemon = True
+        writer.start()
+        reader.start()
+        writer.join()
+        self._join_reader(reader)
+        elapsed = time.time() - begin_time
+        if not self.errors and self._write_crc != self._read_crc:
+            self.errors.append("Checksum mismatch: wrote {:08x}, read "
+                               "{:08x}.".format(self._write_crc,
+                                                self._read_crc))
+        for error in self.errors:
+            log.error(error)
+        if self.errors:
+            return None
+        if not self.latencies:
+            raise BtTestUtilsError("No RFCOMM message transferred.")
+        num_bytes = self._num_read * self.message_size
+        latencies = sorted(self.latencies)
+        result = {
+            "bytes": num_bytes,
+            "messages": self._num_read,
+            "duration": elapsed,
+            "mb_per_sec": num_bytes / elapsed / 1024 / 1024,
+            "latency_ms": {p: utils.percentile(latencies, p) * 1000
+                           for p in (50, 90, 99)}
+        }
+        log.info("RFCOMM throughput: {:.3f} MB/s over {:.1f}s, latency "
+                 "p50/p90/p99 {:.1f}/{:.1f}/{:.1f} ms.".format(
+                     result["mb_per_sec"], elapsed,
+                     result["latency_ms"][50], result["latency_ms"][90],
+                     result["latency_ms"][99]))
+        return result
+
+
 def clear_bonded_devices(ad):
     """Clear bonded devices from the input Android device.
 
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3.4
+#
+#   Copyright 2016 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Helpers for the btsnoop format of the Bluetooth HCI snoop logs.
+
+A btsnoop file is a 16 bytes header followed by records, each one a 24 bytes
+big endian header and the captured bytes of an HCI packet.
+
+BtSnoopIndex reads a log through a memory map and indexes every packet by
+time, HCI packet type, opcode or event code, connection handle and L2CAP
+channel, so the packets of a connection or a time window are found without
+parsing the log again.
+"""
+
+import array
+import bisect
+import collections
+import mmap
+import os
+import struct
+
+# Identification pattern starting every btsnoop file.
+BTSNOOP_MAGIC = b"btsnoop\0"
+BTSNOOP_HEADER_LEN = 16
+# Record header: original length, included length, flags, cumulative drops
+# and timestamp in microseconds since midnight, January 1st, 0 AD.
+BTSNOOP_RECORD_HEADER = struct.Struct(">IIIIq")
+BTSNOOP_RECORD_HEADER_LEN = BTSNOOP_RECORD_HEADER.size
+# Microseconds between the btsnoop timestamp origin and the unix epoch.
+BTSNOOP_EPOCH_DELTA = 0x00dcddb30f2f8000
+# Max bytes of a valid HCI packet, used to tell records from garbage.
+BTSNOOP_MAX_PACKET_LEN = 0x10000 + 4
+# Max flags value: bit 0 is the direction, bit 1 command/event or data.
+BTSNOOP_MAX_FLAGS = 3
+# Number of consecutive valid records needed to trust a record boundary
+# found by scanning.
+BTSNOOP_SYNC_RECORDS = 3
+# Datalink types: HCI packets without and with the UART packet type byte.
+DATALINK_HCI_UNENCAP = 1001
+DATALINK_HCI_UART = 1002
+# Bits of the record flags.
+FLAG_RECEIVED = 0x1
+FLAG_COMMAND_EVENT = 0x2
+# HCI packet types.
+HCI_COMMAND = 0x01
+HCI_ACL = 0x02
+HCI_SCO = 0x03
+HCI_EVENT = 0x04
+# HCI event codes and LE meta subevents.
+EVENT_CONNECTION_COMPLETE = 0x03
+EVENT_DISCONNECTION_COMPLETE = 0x05
+EVENT_ENCRYPTION_CHANGE = 0x08
+EVENT_LE_META = 0x3e
+SUBEVENT_LE_CONNECTION_COMPLETE = 0x01
+SUBEVENT_LE_CONNECTION_UPDATE_COMPLETE = 0x03
+SUBEVENT_LE_ENHANCED_CONNECTION_COMPLETE = 0x0a
+# Events whose first parameters are a status and a connection handle.
+EVENTS_WITH_HANDLE = (EVENT_CONNECTION_COMPLETE,
+                      EVENT_DISCONNECTION_COMPLETE, EVENT_ENCRYPTION_CHANGE)
+# LE meta subevents whose first parameters are a status and a handle.
+SUBEVENTS_WITH_HANDLE = (SUBEVENT_LE_CONNECTION_COMPLETE,
+                         SUBEVENT_LE_CONNECTION_UPDATE_COMPLETE,
+                         SUBEVENT_LE_ENHANCED_CONNECTION_COMPLETE)
+# Index value of a packet without opcode, event, handle or channel.
+NO_VALUE = 0xffff
+
+# A packet found in a log. code is the opcode of commands and the event code
+# of events. subevent is the LE meta subevent, 0 for other packets. code,
+# handle and cid are NO_VALUE when the packet has none.
+BtSnoopPacket = collections.namedtuple(
+    "BtSnoopPacket",
+    ["timestamp", "offset", "length", "flags", "packet_type", "code",
+     "subevent", "handle", "cid"])
+
+
+class BtSnoopError(Exception):
+    """Raised for invalid btsnoop data."""
+
+
+def parse_header(header):
+    """Parses a btsnoop file header.
+
+    Args:
+        header: The first BTSNOOP_HEADER_LEN bytes of a btsnoop file.
+
+    Returns:
+        A (version, datalink) tuple.
+
+    Raises:
+        BtSnoopError is raised if the header is not a btsnoop header.
+    """
+    if len(header) < BTSNOOP_HEADER_LEN or not header.startswith(
+            BTSNOOP_MAGIC):
+        raise BtSnoopError("Not a btsnoop file, header %r." % header[:16])
+    return struct.unpack_from(">II", header, len(BTSNOOP_MAGIC))
+
+
+def is_record_header(data, offset):
+    """Whether the bytes at offset look like a record header."""
+    if offset + BTSNOOP_RECORD_HEADER_LEN > len(data):
+        return False
+    orig_len, incl_len, flags, _, timestamp = (
+        BTSNOOP_RECORD_HEADER.unpack_from(data, offset))
+    return (incl_len <= orig_len <= BTSNOOP_MAX_PACKET_LEN and
+            flags <= BTSNOOP_MAX_FLAGS and timestamp >= BTSNOOP_EPOCH_DELTA)
+
+
+def find_record_boundary(data, start=0):
+    """Finds the first record boundary at or after start.
+
+    Used when data starts at an arbitrary offset of a btsnoop file. A
+    boundary is trusted once BTSNOOP_SYNC_RECORDS valid records follow it,
+    or all the valid records up to the end of data do.
+
+    Returns:
+        The offset of the first record, None if none was found.
+    """
+    for offset in range(start, len(data) - BTSNOOP_RECORD_HEADER_LEN + 1):
+        position = offset
+        num_records = 0
+        while (num_records < BTSNOOP_SYNC_RECORDS and
+               is_record_header(data, position)):
+            position += (BTSNOOP_RECORD_HEADER_LEN +
+                         BTSNOOP_RECORD_HEADER.unpack_from(data, position)[1])
+            num_records += 1
+        if num_records and (num_records == BTSNOOP_SYNC_RECORDS or
+                            position >= len(data)):
+            return offset
+    return None
+
+
+def end_of_complete_records(data, start=0):
+    """Finds the end of the complete records of data.
+
+    Scanning stops at the first record that is incomplete, like the last one
+    of a log being written, or that has an invalid header.
+
+    Args:
+        data: Bytes of a btsnoop file without its header.
+        start: The offset of a record boundary in data.
+
+    Returns:
+        The offset right after the last complete record, start if there is
+        none.
+    """
+    offset = start
+    while is_record_header(data, offset):
+        end = (offset + BTSNOOP_RECORD_HEADER_LEN +
+               BTSNOOP_RECORD_HEADER.unpack_from(data, offset)[1])
+        if end > len(data):
+            break
+        offset = end
+    return offset
+
+
+def parse_hci_packet(data, flags, datalink=DATALINK_HCI_UART):
+    """Gets the type and identifiers of an HCI packet.
+
+    Args:
+        data: The captured bytes of the packet.
+        flags: The flags of its btsnoop record.
+        datalink: The datalink type of the log.
+
+    Returns:
+        A (packet_type, code, subevent, handle, cid) tuple, as in
+        BtSnoopPacket. packet_type is 0 if unknown.
+    """
+    if datalink == DATALINK_HCI_UART:
+        if not data:
+            return 0, NO_VALUE, 0, NO_VALUE, NO_VALUE
+        packet_type = data[0]
+        start = 1
+    else:
+        # Without the type byte, only data and command or event are told
+        # apart, events being the received ones.
+        if flags & FLAG_COMMAND_EVENT:
+            packet_type = (HCI_EVENT if flags & FLAG_RECEIVED else
+                           HCI_COMMAND)
+        else:
+            packet_type = HCI_ACL
+        start = 0
+    code = NO_VALUE
+    subevent = 0
+    handle = NO_VALUE
+    cid = NO_VALUE
+    length = len(data) - start
+    if packet_type == HCI_COMMAND and length >= 2:
+        code = struct.unpack_from("<H", data, start)[0]
+    elif packet_type == HCI_EVENT and length >= 2:
+        code = data[start]
+        params = start + 2
+        if code == EVENT_LE_META and length >= 3:
+            subevent = data[params]
+            if subevent in SUBEVENTS_WITH_HANDLE and length >= 6:
+                handle = struct.unpack_from("<H", data, params + 2)[0]
+        elif code in EVENTS_WITH_HANDLE and length >= 5:
+            handle = struct.unpack_from("<H", data, params + 1)[0]
+    elif packet_type == HCI_ACL and length >= 2:
+        header = struct.unpack_from("<H", data, start)[0]
+        handle = header & 0x0fff
+        # Only the first fragment of an L2CAP frame has its basic header.
+        if (header >> 12) & 0x3 != 1 and length >= 8:
+            cid = struct.unpack_from("<H", data, start + 6)[0]
+    elif packet_type == HCI_SCO and length >= 2:
+        handle = struct.unpack_from("<H", data, start)[0] & 0x0fff
+    if handle != NO_VALUE:
+        handle &= 0x0fff
+    return packet_type, code, subevent, handle, cid
+
+
+class BtSnoopIndex(object):
+    """The index of the packets of a btsnoop log.
+
+    The log is read through a memory map, and only the fields of the packets
+    are kept, in arrays. A log still being written can be indexed again with
+    update, which only reads the records appended since.
+
+    Attributes:
+        path: The path of the log.
+        datalink: The datalink type of the log.
+        size: Number of bytes of the log indexed.
+        timestamps: Array of the timestamp of each packet, in epoch seconds
+            of the clock of the device.
+        offsets: Array of the offset in the log of each record.
+        lengths: Array of the number of captured bytes of each packet.
+        flags: Array of the record flags of each packet.
+        packet_types: Array of the HCI packet type of each packet.
+        codes: Array of the opcode or event code of each packet.
+        subevents: Array of the LE meta subevent of each packet.
+        handles: Array of the connection handle of each packet.
+        cids: Array of the L2CAP channel of each packet.
+        by_code: A dict mapping each (packet_type, code) to the array of the
+            indexes of its packets.
+        by_handle: A dict mapping each connection handle to the array of the
+            indexes of its packets.
+        connections: A dict mapping each connection handle to the list of
+            the (index, is_le) of its connection complete events.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.datalink = None
+        self.size = 0
+        self.timestamps = array.array("d")
+        self.offsets = array.array("Q")
+        self.lengths = array.array("I")
+        self.flags = array.array("B")
+        self.packet_types = array.array("B")
+        self.codes = array.array("H")
+        self.subevents = array.array("B")
+        self.handles = array.array("H")
+        self.cids = array.array("H")
+        self.by_code = {}
+        self.by_handle = {}
+        self.connections = {}
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def update(self):
+        """Indexes the complete records appended to the log since the last
+        update.
+
+        Returns:
+            The number of packets indexed.
+
+        Raises:
+            BtSnoopError is raised if the log is not a btsnoop log.
+        """
+        if os.path.getsize(self.path) <= max(self.size, BTSNOOP_HEADER_LEN):
+            if not self.size:
+                with open(self.path, "rb") as f:
+                    parse_header(f.read(BTSNOOP_HEADER_LEN))
+            return 0
+        with open(self.path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if not self.size:
+                    self.datalink = parse_header(data[:BTSNOOP_HEADER_LEN])[1]
+                    self.size = BTSNOOP_HEADER_LEN
+                return self._index_records(data)
+
+    def _index_records(self, data):
+        num_packets = len(self)
+        offset = self.size
+        end = len(data)
+        unpack_header = BTSNOOP_RECORD_HEADER.unpack_from
+        datalink = self.datalink
+        # Bound once, the loop runs for every packet of the log.
+        append_offset = self.offsets.append
+        append_length = self.lengths.append
+        append_flags = self.flags.append
+        append_packet_type = self.packet_types.append
+        append_code = self.codes.append
+        append_subevent = self.subevents.append
+        append_handle = self.handles.append
+        append_cid = self.cids.append
+        append_timestamp = self.timestamps.append
+        i = num_packets
+        while offset + BTSNOOP_RECORD_HEADER_LEN <= end:
+            _, incl_len, flags, _, timestamp = unpack_header(data, offset)
+            packet_start = offset + BTSNOOP_RECORD_HEADER_LEN
+            if packet_start + incl_len > end:
+                break
+            # Only the headers are needed, not the whole payload.
+            packet_type, code, subevent, handle, cid = parse_hci_packet(
+                data[packet_start:packet_start + min(incl_len, 16)], flags,
+                datalink)
+            append_offset(offset)
+            append_length(incl_len)
+            append_flags(flags)
+            append_packet_type(packet_type)
+            append_code(code)
+            append_subevent(subevent)
+            append_handle(handle)
+            append_cid(cid)
+            # Appended last, so concurrent lookups never see a partial
+            # packet.
+            append_timestamp((timestamp - BTSNOOP_EPOCH_DELTA) / 1e6)
+            if code != NO_VALUE:
+                self.by_code.setdefault((packet_type, code),
+                                        array.array("I")).append(i)
+            if handle != NO_VALUE:
+                self.by_handle.setdefault(handle, array.array("I")).append(i)
+                if code == EVENT_CONNECTION_COMPLETE or subevent in (
+                        SUBEVENT_LE_CONNECTION_COMPLETE,
+                        SUBEVENT_LE_ENHANCED_CONNECTION_COMPLETE):
+                    self.connections.setdefault(handle, []).append(
+                        (i, code == EVENT_LE_META))
+            offset = packet_start + incl_len
+            i += 1
+        self.size = offset
+        return len(self) - num_packets
+
+    def _packet(self, i):
+        return BtSnoopPacket(self.timestamps[i], self.offsets[i],
+                             self.lengths[i], self.flags[i],
+                             self.packet_types[i], self.codes[i],
+                             self.subevents[i], self.handles[i], self.cids[i])
+
+    def find(self,
+             begin_time=None,
+             end_time=None,
+             packet_type=None,
+             code=None,
+             subevents=None,
+             handle=None,
+             cid=None):
+        """Finds the packets matching all the given criteria.
+
+        Packets are expected in chronological order, like logs write them.
+
+        Args:
+            begin_time: Epoch seconds, packets before are excluded.
+            end_time: Epoch seconds, packets after are excluded.
+            packet_type: An HCI packet type, e.g. HCI_EVENT.
+            code: An opcode or event code, packet_type is required with it.
+            subevents: A collection of LE meta subevents.
+            handle: A connection handle.
+            cid: An L2CAP channel.
+
+        Returns:
+            A list of BtSnoopPacket objects.
+        """
+        first = 0 if begin_time is None else bisect.bisect_left(
+            self.timestamps, begin_time)
+        last = len(self) if end_time is None else bisect.bisect_right(
+            self.timestamps, end_time)
+        candidates = []
+        if code is not None:
+            candidates.append(self.by_code.get((packet_type, code), ()))
+        if handle is not None:
+            candidates.append(self.by_handle.get(handle, ()))
+        if candidates:
+            indexes = min(candidates, key=len)
+            indexes = indexes[bisect.bisect_left(indexes, first):
+                              bisect.bisect_left(indexes, last)]
+        else:
+            indexes = range(first, last)
+        packets = []
+        for i in indexes:
+            if ((packet_type is not None and
+                 self.packet_types[i] != packet_type) or
+                    (code is not None and self.codes[i] != code) or
+                    (subevents is not None and
+                     self.subevents[i] not in subevents) or
+                    (handle is not None and self.handles[i] != handle) or
+                    (cid is not None and self.cids[i] != cid)):
+                continue
+            packets.append(self._packet(i))
+        return packets
+
+    def find_le_connection_events(self, begin_time=None, end_time=None):
+        """Finds the LE connection complete, connection update complete and
+        disconnection complete events between two times.
+
+        Disconnections are only included if the LE connection of their
+        handle is in the log, as classic links are disconnected with the same
+        event.
+
+        Returns:
+            A list of BtSnoopPacket objects, in chronological order.
+        """
+        packets = self.find(begin_time, end_time, HCI_EVENT, EVENT_LE_META,
+                            SUBEVENTS_WITH_HANDLE)
+        for p in self.find(begin_time, end_time, HCI_EVENT,
+                           EVENT_DISCONNECTION_COMPLETE):
+            # Keep the handles last connected over LE.
+            connections = self.connections.get(p.handle, [])
+            i = bisect.bisect_left(self.offsets, p.offset)
+            last = bisect.bisect_left(connections, (i, ))
+            if last and connections[last - 1][1]:
+                packets.append(p)
+        return sorted(packets, key=lambda p: p.offset)
+
+    def read_packet(self, packet):
+        """Reads the captured bytes of a packet."""
+        with open(self.path, "rb") as f:
+            f.seek(packet.offset + BTSNOOP_RECORD_HEADER_LEN)
+            return f.read(packet.length)
+
+
+def index_btsnoop_file(path):
+    """Indexes the packets of a btsnoop log.
+
+    Returns:
+        A BtSnoopIndex of the log.
+    """
+    index = BtSnoopIndex(path)
+    index.update()
+    return index
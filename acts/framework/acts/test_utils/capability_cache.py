@@ -0,0 +1,197 @@
+#!/usr/bin/env python3.4
+#
+#   Copyright 2016 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""A persistent cache of static Android device capabilities.
+
+Probing some capabilities, like the max number of LE advertisements, takes
+seconds to minutes. The probed values are stored on disk per device serial,
+along with the build fingerprint of the device when they were probed. They
+are reused by later test classes and runs until the device gets a new build.
+"""
+
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import threading
+
+# Environment variable overriding the path of the cache file.
+ENV_CACHE_PATH = "ACTS_CAPABILITY_CACHE"
+# Path of the cache file if ENV_CACHE_PATH is not set.
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".acts", "capability_cache.json")
+
+
+def get_build_fingerprint(ad):
+    """Reads ro.build.fingerprint of an Android device.
+
+    Returns:
+        The build fingerprint, None if it could not be read.
+    """
+    try:
+        out = ad.adb.shell("getprop ro.build.fingerprint")
+    except Exception:
+        logging.exception("Failed to get the build fingerprint of %s.",
+                          ad.serial)
+        return None
+    return out.decode("utf-8").strip() or None
+
+
+class CapabilityCache(object):
+    """Capabilities of Android devices stored in a json file.
+
+    The file maps each device serial to the fingerprint of the build the
+    capabilities were probed on, and the capabilities themselves. The entry
+    of a device is dropped once its fingerprint changes. Values must be
+    serializable to json.
+
+    Writes hold an flock on a sidecar lock file from the reload to the
+    replacement of the file, so processes sharing the cache keep each
+    other's entries.
+
+    Attributes:
+        path: The path of the cache file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _write_lock(self):
+        """Holds the lock of this process and the lock file of the cache."""
+        with self._lock:
+            dir_name = os.path.dirname(self.path)
+            if dir_name:
+                os.makedirs(dir_name, exist_ok=True)
+            with open(self.path + ".lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            logging.warning("Ignoring unreadable capability cache %s.",
+                            self.path)
+            return {}
+
+    def _save(self, entries):
+        tmp_path = "{}.{}.tmp".format(self.path, os.getpid())
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f, indent=4, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def get(self, ad, name, fingerprint=None):
+        """Gets a capability of a device.
+
+        Args:
+            ad: The AndroidDevice object.
+            name: The name of the capability.
+            fingerprint: The build fingerprint of the device, read from the
+                device if None.
+
+        Returns:
+            The cached value, None if the capability is not cached for the
+            current build of the device.
+        """
+        fingerprint = fingerprint or get_build_fingerprint(ad)
+        if fingerprint is None:
+            return None
+        with self._lock:
+            entry = self._load().get(str(ad.serial))
+        if not entry or entry["fingerprint"] != fingerprint:
+            return None
+        return entry["capabilities"].get(name)
+
+    def set(self, ad, name, value, fingerprint=None):
+        """Stores a capability of a device.
+
+        The capabilities stored for other builds of the device are dropped.
+
+        Args:
+            ad: The AndroidDevice object.
+            name: The name of the capability.
+            value: The value of the capability, not None.
+            fingerprint: The build fingerprint of the device, read from the
+                device if None.
+        """
+        fingerprint = fingerprint or get_build_fingerprint(ad)
+        if fingerprint is None:
+            return
+        try:
+            with self._write_lock():
+                # Reload so the entries written by other processes are kept.
+                entries = self._load()
+                entry = entries.get(str(ad.serial))
+                if not entry or entry["fingerprint"] != fingerprint:
+                    entry = {"fingerprint": fingerprint, "capabilities": {}}
+                    entries[str(ad.serial)] = entry
+                entry["capabilities"][name] = value
+                self._save(entries)
+        except OSError:
+            logging.exception("Failed to write capability cache %s.",
+                              self.path)
+
+    def get_or_probe(self, ad, name, probe_func, *args):
+        """Gets a capability of a device, probing it if not cached.
+
+        Args:
+            ad: The AndroidDevice object.
+            name: The name of the capability.
+            probe_func: The function probing the capability, called with ad
+                and args. Its result is not cached if None.
+            *args: Additional args passed to probe_func.
+
+        Returns:
+            The value of the capability.
+        """
+        fingerprint = get_build_fingerprint(ad)
+        value = self.get(ad, name, fingerprint)
+        if value is None:
+            value = probe_func(ad, *args)
+            if value is not None:
+                self.set(ad, name, value, fingerprint)
+        return value
+
+    def invalidate(self, ad):
+        """Drops all the capabilities cached for a device."""
+        with self._write_lock():
+            entries = self._load()
+            if entries.pop(str(ad.serial), None) is not None:
+                self._save(entries)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """Returns the CapabilityCache shared by all test utils, stored at the
+    path set in ENV_CACHE_PATH or DEFAULT_CACHE_PATH.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            path = os.environ.get(ENV_CACHE_PATH, DEFAULT_CACHE_PATH)
+            _default_cache = CapabilityCache(path)
+        return _default_cache
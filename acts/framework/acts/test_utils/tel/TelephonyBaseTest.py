@@ -40,10 +40,14 @@ from acts.test_utils.tel.tel_subscription_utils import \
     set_subid_for_outgoing_call
 from acts.test_utils.tel.tel_test_utils import toggle_airplane_mode
 from acts.test_utils.tel.tel_test_utils import ensure_phones_default_state
+from acts.test_utils.tel.tel_test_utils import get_state_wait_stats
+from acts.test_utils.tel.tel_test_utils import reset_state_wait_stats
 from acts.test_utils.tel.tel_test_utils import \
     reset_preferred_network_type_to_allowable_range
 from acts.test_utils.tel.tel_test_utils import set_phone_screen_on
 from acts.test_utils.tel.tel_test_utils import set_phone_silent_mode
+from acts.test_utils.tel.tel_test_utils import setup_multithread_executor
+from acts.test_utils.tel.tel_test_utils import shutdown_multithread_executor
 from acts.test_utils.tel.tel_test_utils import setup_droid_properties
 from acts.test_utils.tel.tel_test_utils import refresh_droid_config
 from acts.test_utils.tel.tel_defines import PRECISE_CALL_STATE_LISTEN_LEVEL_FOREGROUND
@@ -192,9 +196,15 @@ class TelephonyBaseTest(BaseTestClass):
         # Sub ID setup
         for ad in self.android_devices:
             initial_set_up_for_subid_infomation(self.log, ad)
+        reset_state_wait_stats()
+        setup_multithread_executor(len(self.android_devices))
         return True
 
     def teardown_class(self):
+        stats = get_state_wait_stats()
+        self.log.info("{} droid state waits took {:.1f}s, saved {:.1f}s "
+                      "compared to 1s polling.".format(
+                          stats["waits"], stats["elapsed"], stats["saved"]))
         try:
             ensure_phones_default_state(self.log, self.android_devices)
 
@@ -209,16 +219,20 @@ class TelephonyBaseTest(BaseTestClass):
                     ad.droid.wifiEnableVerboseLogging(
                         WIFI_VERBOSE_LOGGING_DISABLED)
         finally:
-            for ad in self.android_devices:
-                try:
-                    toggle_airplane_mode(self.log, ad, True)
-                except BrokenPipeError:
-                    # Broken Pipe, can not call SL4A API to turn on Airplane Mode.
-                    # Use adb command to turn on Airplane Mode.
-                    if not force_airplane_mode(ad, True):
-                        self.log.error(
-                            "Can not turn on airplane mode on:{}".format(
-                                ad.serial))
+            try:
+                for ad in self.android_devices:
+                    try:
+                        toggle_airplane_mode(self.log, ad, True)
+                    except BrokenPipeError:
+                        # Broken Pipe, can not call SL4A API to turn on
+                        # Airplane Mode. Use adb command to turn on Airplane
+                        # Mode.
+                        if not force_airplane_mode(ad, True):
+                            self.log.error(
+                                "Can not turn on airplane mode on:{}".format(
+                                    ad.serial))
+            finally:
+                shutdown_multithread_executor()
         return True
 
     def setup_test(self):
@@ -270,7 +284,8 @@ class TelephonyBaseTest(BaseTestClass):
 
         # magical sleep to ensure the runtime restart or reboot begins
         time.sleep(1)
-        for ad in self.android_devices:
+
+        def take_br(ad):
             try:
                 ad.adb.wait_for_device()
                 ad.take_bug_report(test_name, begin_time)
@@ -283,6 +298,8 @@ class TelephonyBaseTest(BaseTestClass):
                 ad.log.error("Failed to take a bug report for {}, {}"
                              .format(ad.serial, test_name))
 
+        utils.concurrent_exec(take_br, [(ad, ) for ad in self.android_devices])
+
     def get_stress_test_number(self):
         """Gets the stress_test_number param from user params.
 
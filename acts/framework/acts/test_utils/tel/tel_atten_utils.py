@@ -14,8 +14,7 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-import time
-import math
+from acts.controllers import attenuator
 from acts.test_utils.tel.tel_defines import ATTEN_MAX_VALUE
 from acts.test_utils.tel.tel_defines import ATTEN_MIN_VALUE
 from acts.test_utils.tel.tel_defines import MAX_RSSI_RESERVED_VALUE
@@ -63,16 +62,15 @@ def set_atten(log, atten_obj, target_atten, step_size=0, time_per_step=0):
                                                             time_per_step)
     log.info(info)
     try:
-        delta = target_atten - current_atten
         if step_size > 0:
-            number_of_steps = int(abs(delta) / step_size)
-            while number_of_steps > 0:
-                number_of_steps -= 1
-                current_atten += math.copysign(step_size,
-                                               (target_atten - current_atten))
-                atten_obj.set_atten(current_atten)
-                time.sleep(time_per_step)
-        atten_obj.set_atten(target_atten)
+            # Steps are scheduled against the start time, so the latency of
+            # the attenuator commands does not add up over the ramp.
+            profile = attenuator.stepped_profile(current_atten, target_atten,
+                                                 step_size, time_per_step)
+            attenuator.AttenuatorSweep(
+                [(atten_obj, profile)], interval=time_per_step or 0.01).run()
+        else:
+            atten_obj.set_atten(target_atten)
     except Exception as e:
         log.error("set_atten error happened: {}".format(e))
         return False
@@ -145,6 +145,15 @@ WAIT_TIME_TETHERING_AFTER_REBOOT = 10
 # Time to wait after changing data sub id
 WAIT_TIME_CHANGE_DATA_SUB_ID = 30
 
+# Initial and max interval between two state checks while waiting for a
+# droid state. The interval doubles after every failed check.
+WAIT_TIME_STATE_POLL_MIN = 0.2
+WAIT_TIME_STATE_POLL_MAX = 1
+
+# Interval to peek at local event queues for a state change event while
+# waiting between two state checks. This does not involve any RPC.
+WAIT_TIME_STATE_EVENT_PEEK = 0.05
+
 # These are used in phone_number_formatter
 PHONE_NUMBER_STRING_FORMAT_7_DIGIT = 7
 PHONE_NUMBER_STRING_FORMAT_10_DIGIT = 10
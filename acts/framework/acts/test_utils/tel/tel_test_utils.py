@@ -19,6 +19,8 @@ standard_library.install_aliases()
 
 import concurrent.futures
 import logging
+import math
+import threading
 import urllib.parse
 import time
 
@@ -83,6 +85,9 @@ from acts.test_utils.tel.tel_defines import WAIT_TIME_CHANGE_DATA_SUB_ID
 from acts.test_utils.tel.tel_defines import WAIT_TIME_IN_CALL
 from acts.test_utils.tel.tel_defines import WAIT_TIME_LEAVE_VOICE_MAIL
 from acts.test_utils.tel.tel_defines import WAIT_TIME_REJECT_CALL
+from acts.test_utils.tel.tel_defines import WAIT_TIME_STATE_EVENT_PEEK
+from acts.test_utils.tel.tel_defines import WAIT_TIME_STATE_POLL_MAX
+from acts.test_utils.tel.tel_defines import WAIT_TIME_STATE_POLL_MIN
 from acts.test_utils.tel.tel_defines import WAIT_TIME_VOICE_MAIL_SERVER_RESPONSE
 from acts.test_utils.tel.tel_defines import WFC_MODE_DISABLED
 from acts.test_utils.tel.tel_defines import EventCallStateChanged
@@ -1486,9 +1491,10 @@ def wait_for_cell_data_connection_for_subscription(
         # The bug is tracked here: b/22612607
         # So we use _is_network_connected_state_match.
 
-        if _wait_for_droid_in_state(log, ad,
-                                    MAX_WAIT_TIME_CONNECTION_STATE_UPDATE,
-                                    _is_network_connected_state_match, state):
+        if _wait_for_droid_in_state_or_event(
+                log, ad, MAX_WAIT_TIME_CONNECTION_STATE_UPDATE,
+                EventConnectivityChanged, _is_network_connected_state_match,
+                state):
             return _wait_for_nw_data_connection(
                 log, ad, state, NETWORK_CONNECTION_TYPE_CELL, timeout_value)
         else:
@@ -1613,9 +1619,10 @@ def _wait_for_nw_data_connection(
         # data connection state.
         # Otherwise, the network state will not be correct.
         # The bug is tracked here: b/20921915
-        if _wait_for_droid_in_state(
+        if _wait_for_droid_in_state_or_event(
                 log, ad, MAX_WAIT_TIME_CONNECTION_STATE_UPDATE,
-                _is_network_connected_state_match, is_connected):
+                EventConnectivityChanged, _is_network_connected_state_match,
+                is_connected):
             current_type = get_internet_connection_type(log, ad)
             log.info(
                 "_wait_for_nw_data_connection: current connection type: {}".
@@ -1774,45 +1781,153 @@ def set_wfc_mode(log, ad, wfc_mode):
     return True
 
 
+# Accumulated statistics of droid state waits, see get_state_wait_stats().
+_state_wait_stats = {"waits": 0, "elapsed": 0.0, "saved": 0.0}
+_state_wait_stats_lock = threading.Lock()
+
+
+def get_state_wait_stats():
+    """Get the accumulated statistics of droid state waits.
+
+    "saved" is an estimate of the time saved compared to checking the state
+    once every second: a wait that succeeds after t seconds would have taken
+    ceil(t) seconds with a one second polling interval, or 0 seconds if the
+    first check succeeds.
+
+    Returns:
+        A dict with the number of waits, the total seconds spent waiting and
+        the total seconds saved.
+    """
+    with _state_wait_stats_lock:
+        return dict(_state_wait_stats)
+
+
+def reset_state_wait_stats():
+    """Reset the accumulated statistics of droid state waits."""
+    with _state_wait_stats_lock:
+        _state_wait_stats.update(waits=0, elapsed=0.0, saved=0.0)
+
+
+def _record_state_wait(elapsed, success, num_checks):
+    with _state_wait_stats_lock:
+        _state_wait_stats["waits"] += 1
+        _state_wait_stats["elapsed"] += elapsed
+        # Polling every second would have returned as early on a first check
+        # success.
+        if success and num_checks > 1:
+            _state_wait_stats["saved"] += math.ceil(elapsed) - elapsed
+
+
+def _wait_for_event_or_timeout(ads, event_name, timeout):
+    """Sleep for timeout seconds, or until a new event is queued on any of
+    the devices.
+
+    The event is left in its queue for the caller to consume.
+
+    Args:
+        ads: list of android devices.
+        event_name: name of the event to wake up on. If None, sleep for the
+            full timeout.
+        timeout: max time to sleep.
+
+    Returns:
+        True if woken up by an event, False otherwise.
+    """
+    if not event_name:
+        time.sleep(timeout)
+        return False
+    queues = [ad.ed.get_event_q(event_name) for ad in ads]
+    sizes = [q.qsize() for q in queues]
+    deadline = time.monotonic() + timeout
+    while True:
+        for q, size in zip(queues, sizes):
+            if q.qsize() > size:
+                return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(remaining, WAIT_TIME_STATE_EVENT_PEEK))
+
+
+def _wait_for_state(log, ads, max_time, check_func, event_name=None):
+    """Wait until check_func returns True for all devices at the same time.
+
+    The state is checked on all devices concurrently. The interval between two
+    checks starts at WAIT_TIME_STATE_POLL_MIN and doubles up to
+    WAIT_TIME_STATE_POLL_MAX. If event_name is specified, a new event of that
+    name on any device triggers the next check immediately and resets the
+    interval, so the related tracking (e.g. PhoneStateListener) should be
+    started by the caller.
+
+    Args:
+        log: log object.
+        ads: list of android devices.
+        max_time: maximal wait time.
+        check_func: function taking an android device and returning True if
+            the device is in the expected state.
+        event_name: name of the event that signals a possible state change.
+
+    Returns:
+        True if all devices are in the expected state within max_time.
+        False if timeout.
+    """
+    begin_time = time.monotonic()
+    deadline = begin_time + max_time
+    interval = WAIT_TIME_STATE_POLL_MIN
+    num_checks = 0
+    executor = None
+    if len(ads) > 1:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(ads))
+    try:
+        while True:
+            if executor:
+                result = all(executor.map(check_func, ads))
+            else:
+                result = check_func(ads[0])
+            num_checks += 1
+            if result or time.monotonic() >= deadline:
+                break
+            remaining = deadline - time.monotonic()
+            if _wait_for_event_or_timeout(ads, event_name,
+                                          min(interval, max(remaining, 0))):
+                interval = WAIT_TIME_STATE_POLL_MIN
+            else:
+                interval = min(interval * 2, WAIT_TIME_STATE_POLL_MAX)
+    finally:
+        if executor:
+            executor.shutdown(wait=False)
+    _record_state_wait(time.monotonic() - begin_time, result, num_checks)
+    return result
+
+
 def _wait_for_droid_in_state(log, ad, max_time, state_check_func, *args,
                              **kwargs):
-    while max_time > 0:
-        if state_check_func(log, ad, *args, **kwargs):
-            return True
+    return _wait_for_state(
+        log, [ad], max_time,
+        lambda ad: state_check_func(log, ad, *args, **kwargs))
 
-        time.sleep(1)
-        max_time -= 1
 
-    return False
+def _wait_for_droid_in_state_or_event(log, ad, max_time, event_name,
+                                      state_check_func, *args, **kwargs):
+    return _wait_for_state(
+        log, [ad],
+        max_time,
+        lambda ad: state_check_func(log, ad, *args, **kwargs),
+        event_name=event_name)
 
 
 def _wait_for_droid_in_state_for_subscription(
         log, ad, sub_id, max_time, state_check_func, *args, **kwargs):
-    while max_time > 0:
-        if state_check_func(log, ad, sub_id, *args, **kwargs):
-            return True
-
-        time.sleep(1)
-        max_time -= 1
-
-    return False
+    return _wait_for_state(
+        log, [ad], max_time,
+        lambda ad: state_check_func(log, ad, sub_id, *args, **kwargs))
 
 
 def _wait_for_droids_in_state(log, ads, max_time, state_check_func, *args,
                               **kwargs):
-    while max_time > 0:
-        success = True
-        for ad in ads:
-            if not state_check_func(log, ad, *args, **kwargs):
-                success = False
-                break
-        if success:
-            return True
-
-        time.sleep(1)
-        max_time -= 1
-
-    return False
+    return _wait_for_state(
+        log, ads, max_time,
+        lambda ad: state_check_func(log, ad, *args, **kwargs))
 
 
 def is_phone_in_call(log, ad):
@@ -3077,25 +3192,134 @@ def task_wrapper(task):
     return func(*params)
 
 
-def multithread_func(log, tasks):
+# Executor shared by multithread_func calls, see setup_multithread_executor.
+_multithread_executor = None
+
+
+def setup_multithread_executor(number_of_workers):
+    """Create the executor shared by all following multithread_func calls.
+
+    The executor is long-lived, so tasks don't pay for the thread creation on
+    every call. It should be sized to the number of devices under test, and
+    shut down with shutdown_multithread_executor.
+
+    Args:
+        number_of_workers: max number of tasks to run in parallel.
+    """
+    global _multithread_executor
+    shutdown_multithread_executor()
+    _multithread_executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=max(number_of_workers, 1))
+
+
+def shutdown_multithread_executor():
+    """Shut down the executor created by setup_multithread_executor.
+
+    Tasks still running after a failure in multithread_func are not waited
+    for.
+    """
+    global _multithread_executor
+    if _multithread_executor:
+        _multithread_executor.shutdown(wait=False)
+        _multithread_executor = None
+
+
+class _TimedTask(object):
+    """A multithread_func task recording its own start and end time."""
+
+    def __init__(self, task):
+        self.task = task
+        self.begin_time = None
+        self.end_time = None
+
+    def __call__(self):
+        self.begin_time = time.monotonic()
+        try:
+            return task_wrapper(self.task)
+        finally:
+            self.end_time = time.monotonic()
+
+    def __str__(self):
+        return getattr(self.task[0], "__name__", str(self.task[0]))
+
+    def elapsed(self):
+        if self.begin_time is None:
+            return 0
+        return (self.end_time or time.monotonic()) - self.begin_time
+
+
+def multithread_func(log, tasks, timeout=None, fail_fast=False):
     """Multi-thread function wrapper.
 
+    Tasks run on the executor created by setup_multithread_executor, or on a
+    temporary executor with one worker per task if there is none.
+
     Args:
         log: log object.
         tasks: tasks to be executed in parallel.
+        timeout: max number of seconds a task may run. A task running longer
+            is considered failed. Never times out if None.
+        fail_fast: if True, return as soon as one task fails, cancel the
+            tasks not started yet and stop waiting for the running ones.
+            The running tasks keep using their devices and a worker of the
+            executor, so only opt in where the caller gives up on the
+            devices after a failure, e.g. the setup of a test case.
 
     Returns:
         True if all tasks return True.
-        False if any task return False.
-    """
-    MAX_NUMBER_OF_WORKERS = 4
-    number_of_workers = min(MAX_NUMBER_OF_WORKERS, len(tasks))
-    executor = concurrent.futures.ThreadPoolExecutor(
-        max_workers=number_of_workers)
-    results = list(executor.map(task_wrapper, tasks))
-    executor.shutdown()
-    log.info("multithread_func result: {}".format(results))
-    for r in results:
+        False if any task return False or times out.
+
+    Raises:
+        The exception raised by a task, if any.
+    """
+    executor = _multithread_executor
+    if executor is None:
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(len(tasks), 1))
+    timed_tasks = [_TimedTask(task) for task in tasks]
+    future_to_task = {executor.submit(t): t for t in timed_tasks}
+    not_done = set(future_to_task)
+    results = {}
+    try:
+        while not_done:
+            wait_time = None
+            if timeout is not None:
+                # Tasks not started yet are checked again after timeout.
+                wait_time = timeout
+                now = time.monotonic()
+                for future in list(not_done):
+                    task = future_to_task[future]
+                    if task.begin_time is None:
+                        continue
+                    remaining = task.begin_time + timeout - now
+                    if remaining > 0:
+                        wait_time = min(wait_time, remaining)
+                        continue
+                    log.error("multithread_func task {} timed out after {}s".
+                              format(task, timeout))
+                    results[task] = False
+                    not_done.discard(future)
+                if not not_done or (fail_fast and not all(results.values())):
+                    break
+            done, not_done = concurrent.futures.wait(
+                not_done,
+                timeout=wait_time,
+                return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                results[future_to_task[future]] = future.result()
+            if fail_fast and not all(results.values()):
+                break
+    finally:
+        for future in future_to_task:
+            future.cancel()
+        if executor is not _multithread_executor:
+            executor.shutdown(wait=False)
+        log.info("multithread_func result: {}".format(", ".join(
+            "{}: {} ({:.2f}s)".format(t, results.get(t), t.elapsed())
+            for t in timed_tasks)))
+    if len(results) != len(timed_tasks):
+        return False
+    for r in results.values():
         if not r:
             return False
     return True
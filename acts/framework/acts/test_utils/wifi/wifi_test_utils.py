@@ -14,6 +14,7 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import functools
 import logging
 import time
 import pprint
@@ -46,6 +47,9 @@ SPEED_OF_LIGHT = 299792458
 
 DEFAULT_PING_ADDR = "http://www.google.com/robots.txt"
 
+# Extra time in ms to scan a DFS channel, which is scanned passively.
+DFS_CHANNEL_SCAN_TIME = 132
+
 
 class WifiEnums():
 
@@ -367,6 +371,10 @@ class WifiTestUtilsError(Exception):
     pass
 
 
+# Frozen set of all the US DFS frequencies, for constant time lookups.
+DFS_5G_FREQUENCY_SET = frozenset(WifiEnums.DFS_5G_FREQUENCIES)
+
+
 class WifiChannelBase:
     ALL_2G_FREQUENCIES = []
     DFS_5G_FREQUENCIES = []
@@ -374,54 +382,109 @@ class WifiChannelBase:
     ALL_5G_FREQUENCIES = DFS_5G_FREQUENCIES + NONE_DFS_5G_FREQUENCIES
     MIX_CHANNEL_SCAN = []
 
+    def _get_tables(self):
+        """Returns the lookup tables of the channels, built on first use.
+
+        The channel lists of an object must not change after the first lookup.
+        """
+        tables = self.__dict__.get("_tables")
+        if tables is None:
+            band_to_freq = {
+                WifiEnums.WIFI_BAND_24_GHZ: self.ALL_2G_FREQUENCIES,
+                WifiEnums.WIFI_BAND_5_GHZ: self.NONE_DFS_5G_FREQUENCIES,
+                WifiEnums.WIFI_BAND_5_GHZ_DFS_ONLY: self.DFS_5G_FREQUENCIES,
+                WifiEnums.WIFI_BAND_5_GHZ_WITH_DFS: self.ALL_5G_FREQUENCIES,
+                WifiEnums.WIFI_BAND_BOTH:
+                self.ALL_2G_FREQUENCIES + self.NONE_DFS_5G_FREQUENCIES,
+                WifiEnums.WIFI_BAND_BOTH_WITH_DFS:
+                self.ALL_5G_FREQUENCIES + self.ALL_2G_FREQUENCIES
+            }
+            freq_to_band = {}
+            for band in (WifiEnums.WIFI_BAND_24_GHZ, WifiEnums.WIFI_BAND_5_GHZ,
+                         WifiEnums.WIFI_BAND_5_GHZ_DFS_ONLY):
+                for freq in band_to_freq[band]:
+                    freq_to_band[freq] = band
+            tables = {
+                "band_to_freq": band_to_freq,
+                "freq_to_band": freq_to_band,
+                "dfs": frozenset(self.DFS_5G_FREQUENCIES),
+                "num_dfs_scans": {
+                    band: len(DFS_5G_FREQUENCY_SET.intersection(freqs))
+                    for band, freqs in band_to_freq.items()
+                }
+            }
+            self._tables = tables
+        return tables
+
     def band_to_freq(self, band):
-        _band_to_frequencies = {
-            WifiEnums.WIFI_BAND_24_GHZ: self.ALL_2G_FREQUENCIES,
-            WifiEnums.WIFI_BAND_5_GHZ: self.NONE_DFS_5G_FREQUENCIES,
-            WifiEnums.WIFI_BAND_5_GHZ_DFS_ONLY: self.DFS_5G_FREQUENCIES,
-            WifiEnums.WIFI_BAND_5_GHZ_WITH_DFS: self.ALL_5G_FREQUENCIES,
-            WifiEnums.WIFI_BAND_BOTH:
-            self.ALL_2G_FREQUENCIES + self.NONE_DFS_5G_FREQUENCIES,
-            WifiEnums.WIFI_BAND_BOTH_WITH_DFS:
-            self.ALL_5G_FREQUENCIES + self.ALL_2G_FREQUENCIES
-        }
-        return _band_to_frequencies[band]
+        return self._get_tables()["band_to_freq"][band]
+
+    def freq_to_band(self, freq):
+        """Returns the band of a supported frequency, one of
+        WIFI_BAND_24_GHZ, WIFI_BAND_5_GHZ and WIFI_BAND_5_GHZ_DFS_ONLY, or
+        None if the frequency is not supported.
+        """
+        return self._get_tables()["freq_to_band"].get(freq)
+
+    def is_dfs(self, freq):
+        """Returns True if the frequency is a supported DFS channel."""
+        return freq in self._get_tables()["dfs"]
+
+    def get_num_dfs_scans(self, band):
+        """Returns the number of channels of a band scanned passively as DFS
+        channels.
+        """
+        return self._get_tables()["num_dfs_scans"][band]
+
+
+# The US DFS frequencies and mixed channel scan of the models which don't
+# support the default ones, keyed by trimmed model name. None keeps the
+# default.
+_US_MODEL_CHANNELS = {}
+_US_MODEL_CHANNELS.update(
+    (m, ((), (2412, 2437, 2462, 5180, 5200, 5240, 5745, 5765)))
+    for m in K_DEVICES)
+_US_MODEL_CHANNELS.update(
+    (m, ((5260, 5280, 5300, 5320, 5500, 5520, 5540, 5560, 5580, 5660, 5680,
+          5700), None)) for m in L_DEVICES)
+_US_MODEL_CHANNELS.update(
+    (m, ((5260, 5280, 5300, 5320, 5500, 5520, 5540, 5560, 5580, 5660, 5680,
+          5700, 5720), None)) for m in L_TAP_DEVICES)
+_US_MODEL_CHANNELS.update(
+    (m, ((5260, 5280, 5300, 5320, 5500, 5520, 5540, 5560, 5580, 5600, 5620,
+          5640, 5660, 5680, 5700), None)) for m in M_DEVICES)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_us_model_channels(model):
+    """Returns the (DFS frequencies, mixed channel scan) tuple of a model,
+    (None, None) for the models supporting the default ones.
+    """
+    if not model:
+        return None, None
+    return _US_MODEL_CHANNELS.get(utils.trim_model_name(model), (None, None))
 
 
 class WifiChannelUS(WifiChannelBase):
     # US Wifi frequencies
     ALL_2G_FREQUENCIES = [2412, 2417, 2422, 2427, 2432, 2437, 2442, 2447, 2452,
                           2457, 2462]
+    DFS_5G_FREQUENCIES = [5260, 5280, 5300, 5320, 5500, 5520, 5540, 5560, 5580,
+                          5600, 5620, 5640, 5660, 5680, 5700, 5720]
     NONE_DFS_5G_FREQUENCIES = [5180, 5200, 5220, 5240, 5745, 5765, 5785, 5805,
                                5825]
+    ALL_5G_FREQUENCIES = DFS_5G_FREQUENCIES + NONE_DFS_5G_FREQUENCIES
     MIX_CHANNEL_SCAN = [2412, 2437, 2462, 5180, 5200, 5280, 5260, 5300, 5500,
                         5320, 5520, 5560, 5700, 5745, 5805]
 
     def __init__(self, model=None):
-        if model and utils.trim_model_name(model) in K_DEVICES:
-            self.DFS_5G_FREQUENCIES = []
-            self.ALL_5G_FREQUENCIES = self.NONE_DFS_5G_FREQUENCIES
-            self.MIX_CHANNEL_SCAN = [2412, 2437, 2462, 5180, 5200, 5240, 5745,
-                                     5765]
-        elif model and utils.trim_model_name(model) in L_DEVICES:
-            self.DFS_5G_FREQUENCIES = [5260, 5280, 5300, 5320, 5500, 5520,
-                                       5540, 5560, 5580, 5660, 5680, 5700]
-            self.ALL_5G_FREQUENCIES = self.DFS_5G_FREQUENCIES + self.NONE_DFS_5G_FREQUENCIES
-        elif model and utils.trim_model_name(model) in L_TAP_DEVICES:
-            self.DFS_5G_FREQUENCIES = [5260, 5280, 5300, 5320, 5500, 5520,
-                                       5540, 5560, 5580, 5660, 5680, 5700,
-                                       5720]
-            self.ALL_5G_FREQUENCIES = self.DFS_5G_FREQUENCIES + self.NONE_DFS_5G_FREQUENCIES
-        elif model and utils.trim_model_name(model) in M_DEVICES:
-            self.DFS_5G_FREQUENCIES = [5260, 5280, 5300, 5320, 5500, 5520,
-                                       5540, 5560, 5580, 5600, 5620, 5640,
-                                       5660, 5680, 5700]
-            self.ALL_5G_FREQUENCIES = self.DFS_5G_FREQUENCIES + self.NONE_DFS_5G_FREQUENCIES
-        else:
-            self.DFS_5G_FREQUENCIES = [5260, 5280, 5300, 5320, 5500, 5520,
-                                       5540, 5560, 5580, 5600, 5620, 5640,
-                                       5660, 5680, 5700, 5720]
-            self.ALL_5G_FREQUENCIES = self.DFS_5G_FREQUENCIES + self.NONE_DFS_5G_FREQUENCIES
+        dfs_frequencies, mix_channel_scan = _get_us_model_channels(model)
+        if dfs_frequencies is not None:
+            self.DFS_5G_FREQUENCIES = list(dfs_frequencies)
+            self.ALL_5G_FREQUENCIES = (self.DFS_5G_FREQUENCIES +
+                                       self.NONE_DFS_5G_FREQUENCIES)
+        if mix_channel_scan is not None:
+            self.MIX_CHANNEL_SCAN = list(mix_channel_scan)
 
 
 def _assert_on_fail_handler(func, assert_on_fail, *args, **kwargs):
@@ -951,19 +1014,177 @@ def get_scan_time_and_channels(wifi_chs, scan_setting, stime_channel):
         scan_time: time required for completing a scan
         scan_channels: channel used for scanning
     """
-    scan_time = 0
     scan_channels = []
+    num_dfs_scans = 0
     if "band" in scan_setting and "channels" not in scan_setting:
         scan_channels = wifi_chs.band_to_freq(scan_setting["band"])
+        num_dfs_scans = wifi_chs.get_num_dfs_scans(scan_setting["band"])
     elif "channels" in scan_setting and "band" not in scan_setting:
         scan_channels = scan_setting["channels"]
-    scan_time = len(scan_channels) * stime_channel
-    for channel in scan_channels:
-        if channel in WifiEnums.DFS_5G_FREQUENCIES:
-            scan_time += 132  #passive scan time on DFS
+        num_dfs_scans = sum(1 for channel in scan_channels
+                            if channel in DFS_5G_FREQUENCY_SET)
+    #passive scan time on DFS
+    scan_time = (len(scan_channels) * stime_channel +
+                 num_dfs_scans * DFS_CHANNEL_SCAN_TIME)
     return scan_time, scan_channels
 
 
+class WifiScanResultValidator(object):
+    """Validates WifiScanner results against a scan setting as the result
+    events arrive.
+
+    Each result is checked once when its event is received. In strict mode
+    the test fails on the first violation, otherwise violations are logged
+    and valid is set to False. Only counters and the timestamp of the last
+    batch are kept, not the events themselves.
+
+    Attributes:
+        scan_setting: Setting used to perform the scan.
+        scan_channels: The frozenset of the frequencies scanned.
+        num_events: Number of result events validated.
+        num_batches: Number of batches of scan results validated.
+        num_bssids: Number of BSSID results validated.
+        valid: False once a violation was found in non strict mode.
+    """
+
+    def __init__(self,
+                 scan_setting,
+                 scan_channels,
+                 scan_time=None,
+                 scan_rt=None,
+                 check_interval=False,
+                 check_num_bssids=False,
+                 strict=True):
+        """
+        Args:
+            scan_setting: Setting used to perform the scan.
+            scan_channels: The frequencies scanned.
+            scan_time: Max time in ms a batch of results may span. Not checked
+                if None.
+            scan_rt: Elapsed real time in ms when the scan was started. Results
+                older than it fail. Not checked if None.
+            check_interval: If True, the time gap between two consecutive
+                batches must match the scan period within 20 percent.
+            check_num_bssids: If True, a batch may not have more BSSIDs than
+                the numBssidsPerScan of the scan setting.
+            strict: If True, fail the test on the first violation. If False,
+                log the violations and set valid to False instead. A batch
+                without results fails the test in both modes.
+        """
+        self.scan_setting = scan_setting
+        self.scan_channels = frozenset(scan_channels)
+        self.scan_time = scan_time
+        self.scan_rt = scan_rt
+        self.check_interval = check_interval
+        self.check_num_bssids = check_num_bssids
+        self.num_events = 0
+        self.num_batches = 0
+        self.num_bssids = 0
+        self.valid = True
+        self.strict = strict
+        self._last_batch_timestamp = None
+
+    def _fail(self, msg):
+        if self.strict:
+            asserts.fail(msg)
+        log.error(msg)
+        self.valid = False
+
+    def _check_batch_interval(self, timestamp):
+        """Verifies the time gap between the previous batch and one starting
+        at timestamp is within 20 percent of the scan period.
+
+        Note the scan result timestamps are in microseconds, but "periodInMs"
+        in scan settings is in milliseconds.
+        """
+        previous = self._last_batch_timestamp
+        self._last_batch_timestamp = timestamp
+        if not self.check_interval or previous is None:
+            return
+        expected_interval = self.scan_setting["periodInMs"] * 1000
+        delta = abs(timestamp - previous - expected_interval)
+        margin = expected_interval * 0.20
+        if delta >= margin:
+            self._fail("The difference in time between scans at %s and %s is "
+                       "%dms, which is out of the expected range %sms" % (
+                           previous, timestamp, delta / 1000,
+                           self.scan_setting["periodInMs"]))
+
+    def validate_batch(self, batch, result_rt=None):
+        """Validates one batch of scan results, obtained during one scan.
+
+        Args:
+            batch: A dict whose "ScanResults" is a list of dicts, each one
+                representing the scan result of a BSSID.
+            result_rt: Elapsed real time in ms when the results were reported.
+                Results newer than it fail. Not checked if None.
+
+        Returns:
+            The number of BSSIDs in the batch.
+        """
+        scan_results = batch["ScanResults"]
+        asserts.assert_true(scan_results,
+                            "At least one scan result is required to validate")
+        if self.check_num_bssids:
+            max_bssids = self.scan_setting["numBssidsPerScan"]
+            if len(scan_results) > max_bssids:
+                self._fail("Expected no more than %d BSSIDs, got %d." %
+                           (max_bssids, len(scan_results)))
+        first_timestamp = scan_results[0]["timestamp"]
+        self._check_batch_interval(first_timestamp)
+        min_timestamp = None if self.scan_rt is None else self.scan_rt * 1000
+        max_timestamp = None if result_rt is None else result_rt * 1000
+        if self.scan_time is not None:
+            max_scan_timestamp = first_timestamp + self.scan_time * 1000
+            if max_timestamp is None or max_scan_timestamp < max_timestamp:
+                max_timestamp = max_scan_timestamp
+        for result in scan_results:
+            timestamp = result["timestamp"]
+            if (result["frequency"] not in self.scan_channels or
+                (min_timestamp is not None and timestamp < min_timestamp) or
+                (max_timestamp is not None and timestamp > max_timestamp)):
+                self._fail("Result didn't match requirement: %s, scan "
+                           "channels %s" % (result,
+                                            sorted(self.scan_channels)))
+        self.num_batches += 1
+        self.num_bssids += len(scan_results)
+        return len(scan_results)
+
+    def validate_results(self, batches, result_rt=None):
+        """Validates the batches of scan results reported by one event.
+
+        Args:
+            batches: The list of batches reported by the event.
+            result_rt: Elapsed real time in ms when the results were reported.
+
+        Returns:
+            The number of BSSIDs in the batches.
+        """
+        if not (self.scan_setting.get("reportEvents", 0) &
+                WifiEnums.REPORT_EVENT_AFTER_EACH_SCAN):
+            max_batches = self.scan_setting.get("maxScansToCache")
+            if max_batches:
+                if len(batches) > max_batches:
+                    self._fail("Expected to get at most %d batches in event "
+                               "No.%d, got %d." % (max_batches,
+                                                   self.num_events,
+                                                   len(batches)))
+        bssids = 0
+        for batch in batches:
+            bssids += self.validate_batch(batch, result_rt)
+        self.num_events += 1
+        return bssids
+
+    def validate_event(self, event):
+        """Validates an onResults event of the scan.
+
+        Returns:
+            The number of BSSIDs in the event.
+        """
+        return self.validate_results(event["data"]["Results"],
+                                     event["data"].get("ResultElapsedRealtime"))
+
+
 def start_wifi_track_bssid(ad, track_setting):
     """Start tracking Bssid for the given settings.
 
@@ -20,14 +20,15 @@ import datetime
 import json
 import functools
 import logging
+import math
 import os
 import random
 import re
 import signal
 import string
 import subprocess
+import threading
 import time
-import traceback
 
 # File name length is limited to 255 chars on some OS, so we need to make sure
 # the file names we output fits within the limit.
@@ -258,37 +259,270 @@ def rand_ascii_str(length):
     return ''.join(letters)
 
 
+def percentile(sorted_values, percent):
+    """Linearly interpolated percentile of a sorted list of values.
+
+    Args:
+        sorted_values: A list of numbers sorted in ascending order.
+        percent: The percentile to compute, between 0 and 100.
+
+    Returns:
+        The percentile, None if the list is empty.
+    """
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * percent / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return (sorted_values[low] +
+            (sorted_values[high] - sorted_values[low]) * (rank - low))
+
+
 # Thead/Process related functions.
-def concurrent_exec(func, param_list):
-    """Executes a function with different parameters pseudo-concurrently.
+# Max number of workers of each process-wide executor used by concurrent_map.
+MAX_CONCURRENT_EXEC_WORKERS = 30
+# Max number of seconds concurrent_map waits before checking its
+# cancel_event again.
+CONCURRENT_EXEC_CANCEL_CHECK_INTERVAL = 0.1
+
+# The executors of concurrent_map, by nesting depth of the calls.
+_concurrent_exec_executors = {}
+_concurrent_exec_state = threading.local()
+# Guards the executor creation and the resource usage below, and is notified
+# every time a task submitted by concurrent_map finishes.
+_concurrent_exec_cond = threading.Condition()
+_resource_limits = {}
+_resource_usage = {}
+
+
+class ConcurrentExecError(ActsUtilsError):
+    """Raised by concurrent_map if one or more executions failed.
+
+    Attributes:
+        results: A list of results in the order of the param_list, each being
+            a return value or the exception raised by the execution.
+        errors: A list of (params, exception) tuples for failed executions.
+    """
+
+    def __init__(self, results, errors):
+        msg = "{} of {} executions failed: {}".format(
+            len(errors), len(results), ", ".join("{}: {!r}".format(p, e)
+                                                 for p, e in errors))
+        super(ConcurrentExecError, self).__init__(msg)
+        self.results = results
+        self.errors = errors
+
+
+def set_resource_limit(resource, limit):
+    """Sets the max number of concurrent_map executions that may use a
+    resource, e.g. a device serial or an instrument address, at the same time.
+
+    Args:
+        resource: A hashable identifying the resource.
+        limit: The max number of concurrent executions. None removes the
+            limit.
+    """
+    with _concurrent_exec_cond:
+        if limit is None:
+            _resource_limits.pop(resource, None)
+        else:
+            _resource_limits[resource] = limit
+        _concurrent_exec_cond.notify_all()
+
+
+def _try_acquire_resource(resource):
+    limit = _resource_limits.get(resource)
+    usage = _resource_usage.get(resource, 0)
+    if limit is not None and usage >= limit:
+        return False
+    _resource_usage[resource] = usage + 1
+    return True
+
+
+def _release_resource(resource):
+    _resource_usage[resource] -= 1
+    if not _resource_usage[resource]:
+        del _resource_usage[resource]
+
+
+def _get_concurrent_exec_executor(depth):
+    with _concurrent_exec_cond:
+        if depth not in _concurrent_exec_executors:
+            _concurrent_exec_executors[depth] = (
+                concurrent.futures.ThreadPoolExecutor(
+                    max_workers=MAX_CONCURRENT_EXEC_WORKERS))
+        return _concurrent_exec_executors[depth]
+
+
+def _concurrent_exec_worker(func, params, depth, resources):
+    _concurrent_exec_state.depth = depth
+    _concurrent_exec_state.resources = resources
+    return func(*params)
+
+
+def concurrent_map(func,
+                   param_list,
+                   max_workers=None,
+                   resource_func=None,
+                   timeout=None,
+                   cancel_event=None,
+                   raise_on_error=True):
+    """Executes a function with different parameters concurrently.
 
     This is basically a map function. Each element (should be an iterable) in
     the param_list is unpacked and passed into the function. Due to Python's
     GIL, there's no true concurrency. This is suited for IO-bound tasks.
 
+    Executions run on an executor shared by the whole process. Calls made
+    from an execution of another concurrent_map use an executor of their
+    own, so a nested call never waits for a worker held by its caller. A
+    nested execution using a resource its caller already holds does not
+    count against the limit of the resource again.
+
+    Args:
+        func: The function that performs a task.
+        param_list: A list of iterables, each being a set of params to be
+            passed into the function.
+        max_workers: The max number of executions of this call running at the
+            same time. No limit other than the executor size if None.
+        resource_func: A function taking the same params as func and
+            returning the resource the execution uses, or None. Executions
+            respect the limits set by set_resource_limit for the resource.
+        timeout: The max number of seconds to wait for all executions. Never
+            times out if None.
+        cancel_event: A threading.Event. Executions not started yet are
+            cancelled once it is set.
+        raise_on_error: If True, raise ConcurrentExecError if any execution
+            failed, timed out or got cancelled.
+
+    Returns:
+        A list of return values in the order of the param_list. If an
+        execution raised an exception, the exception object will be the
+        corresponding result. Executions not finished after timeout have a
+        TimeoutError, and cancelled ones have a
+        concurrent.futures.CancelledError.
+
+    Raises:
+        ConcurrentExecError is raised if raise_on_error is True and any
+        execution did not return normally.
+    """
+    param_list = [tuple(p) for p in param_list]
+    results = [None] * len(param_list)
+    finished = [False] * len(param_list)
+    _run_concurrent_map(func, param_list, results, finished, max_workers,
+                        resource_func, timeout, cancel_event)
+    for i, done in enumerate(finished):
+        if done:
+            continue
+        if cancel_event and cancel_event.is_set():
+            results[i] = concurrent.futures.CancelledError(
+                "Execution cancelled.")
+        else:
+            results[i] = TimeoutError("Execution did not finish within "
+                                      "{}s.".format(timeout))
+    errors = [(param_list[i], r) for i, r in enumerate(results)
+              if isinstance(r, Exception)]
+    if errors and raise_on_error:
+        raise ConcurrentExecError(results, errors)
+    return results
+
+
+def _run_concurrent_map(func, param_list, results, finished, max_workers,
+                        resource_func, timeout, cancel_event):
+    """Schedules the executions of concurrent_map on the shared executor of
+    the nesting depth of the call.
+
+    Fills in results and finished in place.
+    """
+    depth = getattr(_concurrent_exec_state, "depth", 0)
+    held_resources = getattr(_concurrent_exec_state, "resources",
+                             frozenset())
+    executor = _get_concurrent_exec_executor(depth)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    pending = list(range(len(param_list)))
+    running = {}
+    completed = []
+
+    def on_done(future):
+        with _concurrent_exec_cond:
+            resource = running[future][1]
+            if resource is not None:
+                _release_resource(resource)
+            completed.append(future)
+            _concurrent_exec_cond.notify_all()
+
+    with _concurrent_exec_cond:
+        while True:
+            while completed:
+                future = completed.pop()
+                i = running.pop(future)[0]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    results[i] = e
+                finished[i] = True
+            cancelled = cancel_event and cancel_event.is_set()
+            # Start as many pending executions as the limits allow.
+            for i in list(pending):
+                if cancelled:
+                    break
+                if max_workers and len(running) >= max_workers:
+                    break
+                resource = None
+                if resource_func:
+                    resource = resource_func(*param_list[i])
+                    if resource in held_resources:
+                        # Already held by the calling execution.
+                        resource = None
+                    if (resource is not None and
+                            not _try_acquire_resource(resource)):
+                        continue
+                pending.remove(i)
+                resources = held_resources
+                if resource is not None:
+                    resources = held_resources | {resource}
+                future = executor.submit(_concurrent_exec_worker, func,
+                                         param_list[i], depth + 1, resources)
+                running[future] = (i, resource)
+                future.add_done_callback(on_done)
+            if not running and (cancelled or not pending):
+                return
+            wait_time = None
+            if deadline is not None:
+                wait_time = deadline - time.monotonic()
+                if wait_time <= 0:
+                    break
+            if cancel_event:
+                wait_time = min(wait_time or
+                                CONCURRENT_EXEC_CANCEL_CHECK_INTERVAL,
+                                CONCURRENT_EXEC_CANCEL_CHECK_INTERVAL)
+            _concurrent_exec_cond.wait(wait_time)
+        # Timed out, executions not started yet won't be.
+        for future in running:
+            future.cancel()
+
+
+def concurrent_exec(func, param_list):
+    """Executes a function with different parameters pseudo-concurrently.
+
+    This is a wrapper of concurrent_map which does not raise, kept for
+    backward compatibility.
+
     Args:
         func: The function that parforms a task.
         param_list: A list of iterables, each being a set of params to be
             passed into the function.
 
     Returns:
-        A list of return values from each function execution. If an execution
-        caused an exception, the exception object will be the corresponding
-        result.
-    """
-    with concurrent.futures.ThreadPoolExecutor(max_workers=30) as executor:
-        # Start the load operations and mark each future with its params
-        future_to_params = {executor.submit(func, *p): p for p in param_list}
-        return_vals = []
-        for future in concurrent.futures.as_completed(future_to_params):
-            params = future_to_params[future]
-            try:
-                return_vals.append(future.result())
-            except Exception as exc:
-                print("{} generated an exception: {}".format(
-                    params, traceback.format_exc()))
-                return_vals.append(exc)
-        return return_vals
+        A list of return values from each function execution, in the order of
+        the param_list. If an execution caused an exception, the exception
+        object will be the corresponding result.
+    """
+    return_vals = concurrent_map(func, param_list, raise_on_error=False)
+    for params, val in zip(param_list, return_vals):
+        if isinstance(val, Exception):
+            logging.error("%s generated an exception: %r", params, val)
+    return return_vals
 
 
 def exe_cmd(*cmds):
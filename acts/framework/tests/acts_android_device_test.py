@@ -22,6 +22,7 @@ import tempfile
 import unittest
 
 from acts import base_test
+from acts import logger
 from acts.controllers import android_device
 
 # Mock log path for a test run.
@@ -295,6 +296,30 @@ class ActsAndroidDeviceTest(unittest.TestCase):
                                      ad.serial, "BugReports")
         create_dir_mock.assert_called_with(expected_path)
 
+    @mock.patch('acts.controllers.adb.AdbProxy', return_value=MockAdbProxy(1))
+    @mock.patch('acts.controllers.fastboot.FastbootProxy',
+                return_value=MockFastbootProxy(1))
+    @mock.patch('acts.utils.create_dir')
+    @mock.patch('acts.utils.exe_cmd')
+    def test_AndroidDevice_take_bug_report_dedup(self, exe_mock,
+                                                 create_dir_mock,
+                                                 FastbootProxy, MockAdbProxy):
+        """Verifies AndroidDevice.take_bug_report skips a bugreport requested
+        right after another one on the same device, unless the test started
+        after the previous bugreport.
+        """
+        mock_serial = 1
+        ad = android_device.AndroidDevice(serial=mock_serial)
+        ad.take_bug_report("test_something",
+                           logger.get_log_line_timestamp(-20))
+        with mock.patch.object(ad, "wait_for_boot_completion") as wait_mock:
+            ad.take_bug_report("test_something_else",
+                               logger.get_log_line_timestamp(-10))
+            self.assertFalse(wait_mock.called)
+            ad.take_bug_report("test_something_later",
+                               logger.get_log_line_timestamp(10))
+            self.assertTrue(wait_mock.called)
+
     @mock.patch('acts.controllers.adb.AdbProxy', return_value=MockAdbProxy(1))
     @mock.patch('acts.controllers.fastboot.FastbootProxy',
                 return_value=MockFastbootProxy(1))
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3.4
+#
+#   Copyright 2016 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import logging
+import mock
+import queue
+import socket
+import threading
+import time
+import unittest
+
+from acts.controllers import attenuator
+from acts.controllers.attenuator_lib import _tnhelper
+from acts.controllers.attenuator_lib.minicircuits import telnet
+
+# Number of channels of the fake Mini-Circuits attenuator.
+FAKE_NUM_CHANNELS = 4
+# Delay before the fake attenuator sends each response, emulating the network
+# and instrument latency.
+FAKE_RESPONSE_DELAY = 0.05
+
+
+class FakeMiniCircuitsServer(object):
+    """A local telnet server emulating a Mini-Circuits RC4DAT attenuator.
+
+    Every response is sent FAKE_RESPONSE_DELAY seconds after its command was
+    received, and commands received back to back are processed in order, like
+    the real instrument does.
+
+    Attributes:
+        port: The port the server listens on.
+        prompt: The prompt sent on connection and after every response.
+        values: The attenuation of each channel, one-based.
+        cmds: The commands received so far.
+    """
+
+    def __init__(self, prompt=""):
+        self.prompt = prompt
+        self.values = {i + 1: 0.0 for i in range(FAKE_NUM_CHANNELS)}
+        self.cmds = []
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.bind(("localhost", 0))
+        self._sock.listen(1)
+        self.port = self._sock.getsockname()[1]
+        self._responses = queue.Queue()
+        self._conn = None
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def close(self):
+        self._sock.close()
+        if self._conn:
+            self._conn.close()
+
+    def _handle(self, cmd):
+        self.cmds.append(cmd)
+        if cmd == "MN?":
+            return "MN=RC4DAT-6G-95"
+        if cmd.startswith("SETATT="):
+            for chan in self.values:
+                self.values[chan] = float(cmd[len("SETATT="):])
+            return "1"
+        tokens = cmd.split(":")
+        if len(tokens) == 4 and tokens[2] == "SETATT":
+            self.values[int(tokens[1])] = float(tokens[3])
+            return "1"
+        if len(tokens) == 3 and tokens[2] == "ATT?":
+            return str(self.values[int(tokens[1])])
+        return "-99"
+
+    def _send_responses(self):
+        while True:
+            send_time, response = self._responses.get()
+            time.sleep(max(send_time - time.monotonic(), 0))
+            try:
+                self._conn.sendall((response + "\r\n" + self.prompt).encode(
+                    "ASCII"))
+            except OSError:
+                return
+
+    def _serve(self):
+        try:
+            self._conn, _ = self._sock.accept()
+        except OSError:
+            return
+        self._conn.sendall(self.prompt.encode("ASCII"))
+        threading.Thread(target=self._send_responses, daemon=True).start()
+        buf = b""
+        while True:
+            try:
+                data = self._conn.recv(4096)
+            except OSError:
+                return
+            if not data:
+                return
+            buf += data
+            while b"\r\n" in buf:
+                line, buf = buf.split(b"\r\n", 1)
+                response = self._handle(line.decode("ASCII"))
+                self._responses.put((time.monotonic() + FAKE_RESPONSE_DELAY,
+                                     response))
+
+
+class ActsAttenuatorTest(unittest.TestCase):
+    """This test class has unit tests for the implementation of everything
+    under acts.controllers.attenuator and its telnet drivers.
+    """
+
+    def setUp(self):
+        self.server = FakeMiniCircuitsServer()
+        self.instrument = telnet.AttenuatorInstrument(FAKE_NUM_CHANNELS)
+        self.instrument.open("localhost", self.server.port)
+
+    def tearDown(self):
+        self.instrument.close()
+        self.server.close()
+
+    def test_set_atten_multi_pipelined(self):
+        values = {0: 10.0, 1: 20.0, 2: 30.0}
+        begin_time = time.monotonic()
+        for idx, value in values.items():
+            self.instrument.set_atten(idx, value)
+        serial_time = time.monotonic() - begin_time
+        values = {0: 11.0, 1: 21.0, 2: 31.0}
+        begin_time = time.monotonic()
+        self.instrument.set_atten_multi(values)
+        pipelined_time = time.monotonic() - begin_time
+        logging.info("Setting %d channels took %.3fs serially, %.3fs "
+                     "pipelined.", len(values), serial_time, pipelined_time)
+        self.assertLess(pipelined_time, serial_time)
+        for idx, value in values.items():
+            self.assertEqual(self.instrument.get_atten(idx), value)
+
+    def test_group_set_atten_all_channels(self):
+        group = attenuator.AttenuatorGroup()
+        group.add_from_instrument(self.instrument, range(FAKE_NUM_CHANNELS))
+        group.set_atten(42)
+        self.assertEqual(self.server.cmds[-1], "SETATT=42.0")
+        self.assertTrue(group.is_synchronized())
+
+    def test_cache_skips_redundant_writes(self):
+        atten = attenuator.Attenuator(self.instrument, 0)
+        atten.set_atten(10)
+        num_cmds = len(self.server.cmds)
+        atten.set_atten(10)
+        self.assertEqual(atten.get_atten(), 10)
+        self.assertEqual(len(self.server.cmds), num_cmds)
+        self.assertEqual(self.instrument.get_cache_stats(),
+                         {"hits": 2, "misses": 1})
+        # A change made outside of the cache is only seen after a resync.
+        self.server.values[1] = 20.0
+        self.assertEqual(atten.get_atten(), 10)
+        self.instrument.resync()
+        self.assertEqual(atten.get_atten(), 20)
+        atten.set_atten(10)
+        self.assertEqual(self.server.cmds[-1], "CHAN:1:SETATT:10")
+
+    def test_cache_cleared_on_reconnect(self):
+        atten = attenuator.Attenuator(self.instrument, 0)
+        atten.set_atten(10)
+        self.instrument.close()
+        self.server.close()
+        # The instrument was power cycled while disconnected.
+        self.server = FakeMiniCircuitsServer()
+        self.instrument.open("localhost", self.server.port)
+        self.assertEqual(atten.get_atten(), 0)
+        atten.set_atten(10)
+        self.assertEqual(self.server.cmds[-1], "CHAN:1:SETATT:10")
+
+    def test_sweep_lockstep(self):
+        atten_a = attenuator.Attenuator(self.instrument, 0)
+        atten_b = attenuator.Attenuator(self.instrument, 1)
+        sweep = attenuator.AttenuatorSweep(
+            [(atten_a, attenuator.linear_profile(0, 10, 1)),
+             (atten_b, attenuator.stepped_profile(20, 10, 2, 0.2))],
+            interval=0.1, resolution=0.5)
+        begin_time = time.monotonic()
+        sweep.run()
+        elapsed = time.monotonic() - begin_time
+        self.assertLess(elapsed, 1.5)
+        self.assertEqual(self.server.values[1], 10.0)
+        self.assertEqual(self.server.values[2], 10.0)
+        # Ticks are scheduled against the start time, so set commands late
+        # because of the instrument latency do not delay the later ones.
+        for scheduled_time, set_time, _, _ in sweep.trace:
+            self.assertLess(set_time - scheduled_time, 0.5)
+
+    def test_sweep_resolution_decimals(self):
+        values = []
+        target = mock.Mock()
+        target.set_atten.side_effect = values.append
+        sweep = attenuator.AttenuatorSweep(
+            [(target, attenuator.linear_profile(0, 1, 0.1))],
+            interval=0.01, resolution=0.1)
+        with self.assertRaises(attenuator.InvalidOperationError):
+            sweep.wait()
+        sweep.run()
+        self.assertIn(0.3, values)
+        self.assertEqual(values, [round(v, 1) for v in values])
+
+    def test_pipelined_cmds_with_prompt(self):
+        server = FakeMiniCircuitsServer(prompt=">")
+        helper = _tnhelper._TNHelper(tx_cmd_separator="\r\n",
+                                     rx_cmd_separator="\r\n",
+                                     prompt=">")
+        helper.open("localhost", server.port)
+        try:
+            self.assertEqual(helper.cmds(["CHAN:1:SETATT:5", "CHAN:1:ATT?"]),
+                             ["1", "5.0"])
+            # The prompts read with the responses must not be waited for
+            # again by the next command.
+            begin_time = time.monotonic()
+            self.assertEqual(helper.cmd("MN?"), "MN=RC4DAT-6G-95")
+            self.assertLess(time.monotonic() - begin_time, 1)
+        finally:
+            helper.close()
+            server.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -880,5 +880,37 @@ class ActsBaseClassTest(unittest.TestCase):
         self.assertEqual(fail_record.details, MSG_EXPECTED_EXCEPTION)
         self.assertEqual(fail_record.extras, MOCK_EXTRA)
 
+    def test_run_generated_testcases_on_device_pool(self):
+        itrs = ["pass", "fail", "skip", "pass2"]
+        device_pool = ["ad0", "ad1"]
+        used_devices = []
+        class MockBaseTest(base_test.BaseTestClass):
+            def logic(self, setting, ad=None):
+                used_devices.append(ad)
+                asserts.assert_true(ad in device_pool,
+                                    "Unexpected device %s" % ad)
+                if setting == "fail":
+                    asserts.fail(MSG_EXPECTED_EXCEPTION)
+                elif setting == "skip":
+                    asserts.skip(MSG_EXPECTED_EXCEPTION)
+            @signals.generated_test
+            def test_func(self):
+                self.failed_settings = self.run_generated_testcases(
+                    test_func=self.logic,
+                    settings=itrs,
+                    name_func=lambda setting, ad=None: "test_%s" % setting,
+                    device_pool=device_pool
+                )
+        bt_cls = MockBaseTest(self.mock_test_cls_configs)
+        bt_cls.run(test_names=["test_func"])
+        self.assertEqual(bt_cls.results.requested,
+                         ["test_%s" % s for s in itrs])
+        self.assertEqual([r.test_name for r in bt_cls.results.executed],
+                         ["test_%s" % s for s in itrs])
+        self.assertEqual([r.test_name for r in bt_cls.results.passed],
+                         ["test_pass", "test_pass2"])
+        self.assertEqual(bt_cls.failed_settings, ["fail", "skip"])
+        self.assertEqual(len(used_devices), len(itrs))
+
 if __name__ == "__main__":
    unittest.main()
\ No newline at end of file
@@ -0,0 +1,714 @@
+#!/usr/bin/env python3.4
+#
+#   Copyright 2016 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import base64
+import itertools
+import json
+import mock
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from acts.controllers.adb import AdbError
+from acts.controllers.event_dispatcher import EventDispatcher
+from acts.test_utils import capability_cache
+from acts.test_utils.bt import BluetoothBaseTest
+from acts.test_utils.bt import bt_energy_utils
+from acts.test_utils.bt import bt_gatt_utils
+from acts.test_utils.bt import bt_test_utils
+from acts.test_utils.bt import btsnoop
+
+MOCK_SCAN_CALLBACK = 7
+
+
+class MockDroid(object):
+    """A fake sl4a client, whose events are posted by the test."""
+
+    def __init__(self):
+        self.uid = 1
+        self.events = queue.Queue()
+
+    def post_event(self, name, data):
+        self.events.put({"name": name, "data": data, "time": time.time()})
+
+    def eventWait(self, timeout):
+        try:
+            return self.events.get(timeout=0.1)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        pass
+
+
+class MockAdvertiserDroid(MockDroid):
+    """A fake sl4a client of a device supporting max_advertisements
+    advertisements, each succeeding after ADVERTISE_DELAY seconds.
+    """
+    ADVERTISE_DELAY = 0.2
+
+    def __init__(self, max_advertisements, fingerprint="fingerprint"):
+        super(MockAdvertiserDroid, self).__init__()
+        self.max_advertisements = max_advertisements
+        self.fingerprint = fingerprint
+        self.advertising = set()
+        self.num_starts = 0
+        self._callback_ids = itertools.count()
+
+    def bleGenBleAdvertiseCallback(self):
+        return next(self._callback_ids)
+
+    def bleStartBleAdvertising(self, callback, data, settings):
+        self.num_starts += 1
+        if len(self.advertising) < self.max_advertisements:
+            self.advertising.add(callback)
+            name = bt_test_utils.adv_succ.format(callback)
+        else:
+            name = bt_test_utils.adv_fail.format(callback)
+        threading.Timer(self.ADVERTISE_DELAY, self.post_event,
+                        (name, {})).start()
+
+    def bleStopBleAdvertising(self, callback):
+        self.advertising.discard(callback)
+
+    def bluetoothCheckState(self):
+        return True
+
+    def bluetoothGetLocalName(self):
+        return "beacon{}".format(self.max_advertisements)
+
+    def __getattr__(self, name):
+        return lambda *args: None
+
+
+class MockRfcommLink(object):
+    """The byte stream of a fake RFCOMM connection. A read returns what was
+    written so far, up to READ_SIZE bytes, so messages are coalesced and
+    split like on a real connection.
+    """
+    READ_SIZE = 256
+
+    def __init__(self):
+        self.data = b""
+        self.stopped = False
+        self.condition = threading.Condition()
+
+    def write(self, data):
+        with self.condition:
+            self.data += data
+            self.condition.notify_all()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+    def read(self, timeout=5):
+        with self.condition:
+            if not self.condition.wait_for(
+                    lambda: self.data or self.stopped, timeout):
+                raise queue.Empty()
+            if self.stopped:
+                raise IOError("Connection stopped.")
+            data = self.data[:self.READ_SIZE]
+            self.data = self.data[self.READ_SIZE:]
+            return data
+
+
+class MockRfcommDroid(object):
+    """Fake sl4a clients of an RFCOMM connection, each read and write RPC
+    taking RPC_DELAY seconds.
+    """
+    RPC_DELAY = 0.01
+
+    def __init__(self, link, corrupt_at=None, drop_at=None):
+        self.link = link
+        self.corrupt_at = corrupt_at
+        self.drop_at = drop_at
+        self.num_writes = 0
+
+    def _write(self, data):
+        time.sleep(self.RPC_DELAY)
+        if self.num_writes == self.corrupt_at:
+            data = data[:-1] + bytes([data[-1] ^ 1])
+        if self.num_writes == self.drop_at:
+            # The connection drops in the middle of this write.
+            data = data[:len(data) // 2]
+        elif self.drop_at is not None and self.num_writes > self.drop_at:
+            data = b""
+        self.num_writes += 1
+        self.link.write(data)
+
+    def bluetoothRfcommStop(self):
+        self.link.stop()
+
+    def bluetoothRfcommWrite(self, msg):
+        self._write(msg.encode())
+
+    def bluetoothRfcommWriteBinary(self, msg):
+        self._write(base64.b64decode(msg))
+
+    def bluetoothRfcommRead(self):
+        time.sleep(self.RPC_DELAY)
+        return self.link.read().decode()
+
+    def bluetoothRfcommReadBinary(self):
+        time.sleep(self.RPC_DELAY)
+        # Like the base64 encoder of Android, with a line break at the end.
+        return base64.b64encode(self.link.read()).decode() + "\n"
+
+
+class MockGattDroids(object):
+    """Fake sl4a clients of a GATT client and server, with three services of
+    two characteristics having one descriptor each. The client stack takes
+    up to max_outstanding writes at once.
+    """
+
+    def __init__(self, max_outstanding=1, fail_every=None):
+        self.client = MockDroid()
+        self.server = MockDroid()
+        self.max_outstanding = max_outstanding
+        # Every fail_every-th descriptor value set raises, if set.
+        self.fail_every = fail_every
+        self.num_set_values = 0
+        self.outstanding = 0
+        self.values = {}
+        self.written = []
+        self.num_discovery_calls = 0
+        self._request_ids = itertools.count()
+        for name in ("gattClientGetDiscoveredServicesCount",
+                     "gattClientGetDiscoveredCharacteristicUuids",
+                     "gattClientGetDiscoveredDescriptorUuids",
+                     "gattClientDescriptorSetValue",
+                     "gattClientWriteDescriptor"):
+            setattr(self.client, name, getattr(self, name))
+        self.server.gattServerSendResponse = self.gattServerSendResponse
+
+    def gattClientGetDiscoveredServicesCount(self, index):
+        self.num_discovery_calls += 1
+        return 3
+
+    def gattClientGetDiscoveredCharacteristicUuids(self, index, i):
+        self.num_discovery_calls += 1
+        return ["char{}a".format(i), "char{}b".format(i)]
+
+    def gattClientGetDiscoveredDescriptorUuids(self, index, i, char):
+        self.num_discovery_calls += 1
+        return ["desc-" + char]
+
+    def gattClientDescriptorSetValue(self, gatt, index, i, char, desc, value):
+        self.num_set_values += 1
+        if self.fail_every and not self.num_set_values % self.fail_every:
+            raise Exception("Failed to set value.")
+        self.values[desc] = value
+
+    def gattClientWriteDescriptor(self, gatt, index, i, char, desc):
+        if self.outstanding >= self.max_outstanding:
+            return False
+        self.outstanding += 1
+        self.written.append(desc)
+        self.server.post_event(
+            bt_gatt_utils.GattCbStrings.DESC_WRITE_REQ.value.format("server"),
+            {"requestId": next(self._request_ids),
+             "value": self.values[desc]})
+        return True
+
+    def gattServerSendResponse(self, *args):
+        self.outstanding -= 1
+        self.client.post_event(
+            bt_gatt_utils.GattCbStrings.DESC_WRITE.value.format("gatt"), {})
+
+
+class MockBluetoothDroid(MockDroid):
+    """A fake sl4a client whose Bluetooth state changes TOGGLE_DELAY seconds
+    after being toggled.
+
+    With an off_delay, the off broadcast is posted off_delay seconds before
+    the state actually turns off.
+    """
+    TOGGLE_DELAY = 0.2
+
+    def __init__(self, off_delay=0):
+        super(MockBluetoothDroid, self).__init__()
+        self.state = True
+        self.off_delay = off_delay
+
+    def bluetoothCheckState(self):
+        return self.state
+
+    def bluetoothToggleState(self, state):
+        threading.Timer(self.TOGGLE_DELAY, self._set_state, (state, )).start()
+
+    def _set_state(self, state):
+        if state or not self.off_delay:
+            self.state = state
+        else:
+            threading.Timer(self.off_delay, setattr,
+                            (self, "state", False)).start()
+        self.post_event(bt_test_utils.bluetooth_on
+                        if state else bt_test_utils.bluetooth_off, {})
+
+
+class MockAdb(object):
+    def __init__(self, droid):
+        self.droid = droid
+
+    def shell(self, cmd):
+        if cmd == "getprop ro.build.fingerprint":
+            return self.droid.fingerprint.encode("utf-8")
+        return b""
+
+
+class MockAndroidDevice(object):
+    def __init__(self, serial, droid):
+        self.serial = serial
+        self.droid = droid
+        self.ed = EventDispatcher(droid)
+        self.adb = MockAdb(droid)
+
+
+class MockEnergyDroid(object):
+    """Reports energy info counters increasing on every call, the controller
+    resetting after reset_after calls.
+    """
+
+    def __init__(self, reset_after=None):
+        self.num_calls = 0
+        self.reset_after = reset_after
+
+    def bluetoothGetControllerActivityEnergyInfo(self, value):
+        self.num_calls += 1
+        n = self.num_calls
+        if self.reset_after and n > self.reset_after:
+            n -= self.reset_after
+        return ("BluetoothActivityEnergyInfo{ mTimestamp=%d "
+                "mBluetoothStackState=1 mControllerTxTimeMs=%d "
+                "mControllerRxTimeMs=%d mControllerIdleTimeMs=%d "
+                "mControllerEnergyUsed=%d mUidTraffic=null }" %
+                (n, n, 2 * n, 3 * n, 10 * n))
+
+
+class MockEnergyAndroidDevice(MockAndroidDevice):
+    """A device reporting its energy info to a new sl4a session only, the
+    droid of the test not having the RPC.
+    """
+
+    def __init__(self, serial, droid):
+        MockAndroidDevice.__init__(self, serial, MockDroid())
+        self.session_droid = droid
+        self.session_droid.uid = 2
+        self.terminated_sessions = []
+
+    def get_droid(self, handle_event=True):
+        return self.session_droid
+
+    def terminate_session(self, session_id):
+        self.terminated_sessions.append(session_id)
+
+
+class MockSnoopAdb(object):
+    """Serves a local file as the btsnoop log of a device."""
+
+    def __init__(self, path):
+        self.path = path
+        self.bytes_transferred = 0
+
+    def shell(self, cmd):
+        if cmd != "\"stat -c '%s %i' {}\"".format(
+                bt_test_utils.BTSNOOP_LOG_PATH):
+            raise AdbError(cmd=cmd, stdout=b"", stderr=b"Bad command",
+                           ret_code=1)
+        if not os.path.exists(self.path):
+            raise AdbError(cmd=cmd, stdout=b"", stderr=b"", ret_code=1)
+        stat = os.stat(self.path)
+        return "{} {}\n".format(stat.st_size, stat.st_ino).encode("utf-8")
+
+    def exec_out(self, cmd):
+        command, _, count, _ = cmd.split()
+        with open(self.path, "rb") as f:
+            if command == "tail":
+                f.seek(int(count) - 1)
+                data = f.read()
+            else:
+                data = f.read(int(count))
+        self.bytes_transferred += len(data)
+        return data
+
+
+def mock_snoop_record(i, size=10):
+    payload = bytes([i % 256]) * size
+    return btsnoop.BTSNOOP_RECORD_HEADER.pack(
+        size, size, i % 4, 0, btsnoop.BTSNOOP_EPOCH_DELTA + i) + payload
+
+
+def mock_scan_result(i, rssi=-60):
+    return {"deviceInfo": {"address": "00:00:00:00:00:{:02x}".format(i),
+                           "name": "beacon{}".format(i % 2)},
+            "rssi": rssi,
+            "timestampNanos": i}
+
+
+class ActsBtTestUtilsTest(unittest.TestCase):
+    """This test class has unit tests for the implementation of everything
+    under acts.test_utils.bt.bt_test_utils.
+    """
+
+    def setUp(self):
+        self.droid = MockDroid()
+        self.ed = EventDispatcher(self.droid)
+        self.ed.start()
+        self.tmp_dir = tempfile.mkdtemp()
+        capability_cache._default_cache = capability_cache.CapabilityCache(
+            os.path.join(self.tmp_dir, "capability_cache.json"))
+
+    def tearDown(self):
+        self.ed.clean_up()
+        capability_cache._default_cache = None
+        bt_test_utils.advertisements_to_devices.clear()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_scan_aggregator_dedup(self):
+        name = bt_test_utils.batch_scan_result.format(MOCK_SCAN_CALLBACK)
+        for i in range(100):
+            results = [mock_scan_result(j, rssi=-40 - j % 3)
+                       for j in range(i % 10)]
+            self.droid.post_event(name, {"Results": results})
+        while self.droid.events.qsize():
+            time.sleep(0.01)
+        aggregator = bt_test_utils.BleScanAggregator(
+            self.ed, [MOCK_SCAN_CALLBACK], batch=True)
+        self.assertTrue(aggregator.wait_for_devices(9, timeout=5))
+        self.assertEqual(aggregator.num_events, 100)
+        self.assertEqual(aggregator.num_results, 450)
+        self.assertEqual(aggregator.num_devices, 9)
+        self.assertEqual(len(aggregator.addresses_by_name["beacon0"]), 5)
+        self.assertEqual(len(aggregator.get_addresses_with_rssi(-41)), 6)
+        device = aggregator.devices["00:00:00:00:00:01"]
+        self.assertEqual(device["count"], 80)
+        self.assertEqual(device["first_seen"], 1)
+        self.assertFalse(aggregator.wait_for_devices(10, timeout=0.5))
+        other = bt_test_utils.BleScanAggregator(self.ed, [MOCK_SCAN_CALLBACK])
+        with self.assertRaises(queue.Empty):
+            other.wait_for_devices(1, timeout=0.5)
+
+    def test_advertiser_swarm_starts_in_parallel(self):
+        ads = [MockAndroidDevice(i, MockAdvertiserDroid(4)) for i in range(3)]
+        for ad in ads:
+            ad.ed.start()
+        try:
+            swarm = bt_test_utils.BleAdvertiserSwarm(ads)
+            self.assertTrue(swarm.start(4, timeout=5))
+            self.assertEqual(swarm.num_advertising, 12)
+            self.assertEqual(swarm.device_names, {"beacon4"})
+            # Starting every advertisement in turn would take
+            # 12 * ADVERTISE_DELAY.
+            self.assertLess(swarm.time_to_full_swarm,
+                            4 * MockAdvertiserDroid.ADVERTISE_DELAY)
+            swarm.stop()
+            self.assertFalse(swarm.start(5, timeout=5))
+            self.assertEqual(swarm.num_advertising, 12)
+            self.assertIsNone(swarm.time_to_full_swarm)
+        finally:
+            for ad in ads:
+                ad.ed.clean_up()
+
+    def test_get_advanced_droid_list_probes_once_per_build(self):
+        ads = [MockAndroidDevice(0, MockAdvertiserDroid(6, "build_a")),
+               MockAndroidDevice(1, MockAdvertiserDroid(6, "build_a")),
+               MockAndroidDevice(2, MockAdvertiserDroid(3, "build_b"))]
+        for ad in ads:
+            ad.ed.start()
+        try:
+            begin_time = time.time()
+            droid_list = bt_test_utils.get_advanced_droid_list(ads)
+            elapsed = time.time() - begin_time
+            self.assertEqual([d["max_advertisements"] for d in droid_list],
+                             [6, 6, 3])
+            self.assertEqual(ads[1].droid.num_starts, 0)
+            # Two batches of advertisements on the devices probed at once.
+            self.assertLess(elapsed, 4 * MockAdvertiserDroid.ADVERTISE_DELAY)
+            self.assertEqual([len(ad.droid.advertising) for ad in ads],
+                             [0, 0, 0])
+            bt_test_utils.get_advanced_droid_list(ads)
+            self.assertEqual(ads[0].droid.num_starts, 8)
+            # A new run on the same builds gets them from the capability
+            # cache.
+            bt_test_utils.advertisements_to_devices.clear()
+            droid_list = bt_test_utils.get_advanced_droid_list(ads)
+            self.assertEqual([d["max_advertisements"] for d in droid_list],
+                             [6, 6, 3])
+            self.assertEqual(ads[0].droid.num_starts, 8)
+        finally:
+            for ad in ads:
+                ad.ed.clean_up()
+
+    def test_rfcomm_throughput(self):
+        link = MockRfcommLink()
+        client_ad = MockAndroidDevice(0, MockRfcommDroid(link))
+        server_ad = MockAndroidDevice(1, MockRfcommDroid(link))
+        benchmark = bt_test_utils.RfcommThroughputBenchmark(
+            client_ad, server_ad, message_size=100, window=4)
+        result = benchmark.run(num_messages=50)
+        self.assertEqual(result["messages"], 50)
+        self.assertEqual(result["bytes"], 5000)
+        # Writes and reads overlap, a serial write then read would take
+        # 2 * RPC_DELAY per message.
+        self.assertLess(result["duration"],
+                        50 * 1.5 * MockRfcommDroid.RPC_DELAY)
+        self.assertGreater(result["latency_ms"][99], 0)
+        client_ad.droid.corrupt_at = 60
+        benchmark = bt_test_utils.RfcommThroughputBenchmark(
+            client_ad, server_ad, message_size=100, window=4)
+        self.assertIsNone(benchmark.run(num_messages=20))
+        self.assertIn("Checksum mismatch", benchmark.errors[0])
+
+    def test_rfcomm_throughput_dropped_connection(self):
+        link = MockRfcommLink()
+        client_ad = MockAndroidDevice(0, MockRfcommDroid(link, drop_at=10))
+        server_ad = MockAndroidDevice(1, MockRfcommDroid(link))
+        benchmark = bt_test_utils.RfcommThroughputBenchmark(
+            client_ad, server_ad, message_size=100, window=4)
+        with mock.patch.object(bt_test_utils, "DEFAULT_TIMEOUT", 0.3):
+            begin_time = time.time()
+            self.assertIsNone(benchmark.run(num_messages=50))
+            self.assertLess(time.time() - begin_time, 3)
+        self.assertIn("No message read for 0.3s.", benchmark.errors)
+        self.assertTrue(link.stopped)
+
+    def test_rfcomm_throughput_binary(self):
+        link = MockRfcommLink()
+        client_ad = MockAndroidDevice(0, MockRfcommDroid(link))
+        server_ad = MockAndroidDevice(1, MockRfcommDroid(link))
+        benchmark = bt_test_utils.RfcommThroughputBenchmark(
+            client_ad, server_ad, message_size=100, window=4, binary=True)
+        # The payload is random bytes, line breaks included.
+        benchmark._payload = b"\r\n" * 46
+        result = benchmark.run(num_messages=50)
+        self.assertEqual(result["messages"], 50)
+        self.assertEqual(benchmark.errors, [])
+        self.assertEqual(link.data, b"")
+
+    def test_gatt_descriptor_write_stress(self):
+        droids = MockGattDroids(max_outstanding=2)
+        cen_ed = EventDispatcher(droids.client)
+        per_ed = EventDispatcher(droids.server)
+        cen_ed.start()
+        per_ed.start()
+        try:
+            stress = bt_gatt_utils.GattDescriptorWriteStress(
+                droids.client, cen_ed, droids.server, per_ed, "server_id",
+                "server", "gatt", 0, window=4)
+            self.assertEqual(len(stress.descriptors), 6)
+            num_discovery_calls = droids.num_discovery_calls
+            self.assertGreater(stress.run(60), 0)
+            self.assertEqual(stress.errors, [])
+            self.assertEqual(stress.num_writes, 60)
+            self.assertEqual(stress.num_mismatches, 0)
+            self.assertEqual(droids.written[:6],
+                             [d[2] for d in stress.descriptors])
+            self.assertEqual(droids.num_discovery_calls, num_discovery_calls)
+        finally:
+            cen_ed.clean_up()
+            per_ed.clean_up()
+
+    def test_gatt_descriptor_write_stress_continue_on_error(self):
+        droids = MockGattDroids(max_outstanding=2, fail_every=10)
+        cen_ed = EventDispatcher(droids.client)
+        per_ed = EventDispatcher(droids.server)
+        cen_ed.start()
+        per_ed.start()
+        try:
+            stress = bt_gatt_utils.GattDescriptorWriteStress(
+                droids.client, cen_ed, droids.server, per_ed, "server_id",
+                "server", "gatt", 0, window=4)
+            self.assertGreater(stress.run(60, continue_on_error=True), 0)
+            self.assertEqual(stress.errors, [])
+            self.assertGreater(stress.num_skipped, 0)
+            self.assertEqual(stress.num_writes + stress.num_skipped, 60)
+            # Without continue_on_error, the first failure stops the writes.
+            self.assertIsNone(stress.run(60))
+            self.assertEqual(len(stress.errors), 1)
+        finally:
+            cen_ed.clean_up()
+            per_ed.clean_up()
+
+    def test_reset_bluetooth_waits_for_events_in_parallel(self):
+        ads = [MockAndroidDevice(i, MockBluetoothDroid()) for i in range(4)]
+        for ad in ads:
+            ad.ed.start()
+        try:
+            # A stale event of an earlier state change.
+            ads[0].droid.post_event(bt_test_utils.bluetooth_on, {})
+            while ads[0].droid.events.qsize():
+                time.sleep(0.01)
+            bt_test_utils.reset_bt_wait_stats()
+            begin_time = time.time()
+            self.assertTrue(bt_test_utils.reset_bluetooth(ads))
+            elapsed = time.time() - begin_time
+            self.assertTrue(all(ad.droid.state for ad in ads))
+            # Off then on, on all the devices at once.
+            self.assertLess(elapsed, 4 * MockBluetoothDroid.TOGGLE_DELAY)
+            stats = bt_test_utils.get_bt_wait_stats()
+            self.assertEqual(stats["waits"], len(ads))
+            self.assertGreater(stats["elapsed"], 0)
+            # Only the sleep between off and on is saved, however long the
+            # state changes take.
+            self.assertEqual(stats["saved"],
+                             len(ads) * bt_test_utils.BT_RESET_REPLACED_SLEEP)
+        finally:
+            for ad in ads:
+                ad.ed.clean_up()
+
+    def test_reset_bluetooth_waits_for_state_off(self):
+        ad = MockAndroidDevice(0, MockBluetoothDroid(off_delay=0.3))
+        ad.ed.start()
+        try:
+            self.assertTrue(bt_test_utils.reset_bluetooth([ad]))
+            # Bluetooth was turned on once actually off, so it stays on.
+            time.sleep(0.4)
+            self.assertTrue(ad.droid.state)
+        finally:
+            ad.ed.clean_up()
+
+    def test_wait_for_bt_condition_stats(self):
+        bt_test_utils.reset_bt_wait_stats()
+        self.assertTrue(bt_test_utils.wait_for_bt_condition(lambda: True))
+        # Nothing was replaced, so nothing is accounted for.
+        self.assertEqual(bt_test_utils.get_bt_wait_stats()["waits"], 0)
+        self.assertTrue(bt_test_utils.wait_for_bt_condition(
+            lambda: True, replaced_sleep=1))
+        stats = bt_test_utils.get_bt_wait_stats()
+        self.assertEqual(stats["waits"], 1)
+        self.assertGreater(stats["saved"], 0.9)
+        self.assertFalse(bt_test_utils.wait_for_bt_condition(
+            lambda: False, timeout=0.2, replaced_sleep=1))
+        self.assertEqual(bt_test_utils.get_bt_wait_stats()["waits"], 1)
+
+    def test_btsnoop_collector_pulls_new_records_only(self):
+        log_path = os.path.join(self.tmp_dir, "btsnoop_hci.log")
+        out_path = os.path.join(self.tmp_dir, "out.log")
+        header = btsnoop.BTSNOOP_MAGIC + b"\x00\x00\x00\x01\x00\x00\x03\xea"
+        records = [mock_snoop_record(i) for i in range(12)]
+        ad = MockAndroidDevice("serial", MockDroid())
+        ad.adb = MockSnoopAdb(log_path)
+        collector = bt_test_utils.BtSnoopLogCollector()
+        self.assertIsNone(collector.pull(ad, out_path))
+        # The last record is still being written.
+        with open(log_path, "wb") as f:
+            f.write(header + b"".join(records[:3]) + records[3][:20])
+        collector.pull(ad, out_path)
+        with open(out_path, "rb") as f:
+            self.assertEqual(f.read(), header + b"".join(records[:3]))
+        with open(log_path, "ab") as f:
+            f.write(records[3][20:] + b"".join(records[4:6]))
+        ad.adb.bytes_transferred = 0
+        collector.pull(ad, out_path)
+        with open(out_path, "rb") as f:
+            self.assertEqual(f.read(), header + b"".join(records[3:6]))
+        # Neither the header nor the records pulled before are transferred.
+        self.assertEqual(ad.adb.bytes_transferred,
+                         len(b"".join(records[3:6])))
+        # Marking in the middle of a record skips to the next one.
+        with open(log_path, "ab") as f:
+            f.write(records[6][:30])
+        collector.mark([ad])
+        with open(log_path, "ab") as f:
+            f.write(records[6][30:] + b"".join(records[7:10]))
+        collector.pull(ad, out_path)
+        with open(out_path, "rb") as f:
+            self.assertEqual(f.read(), header + b"".join(records[7:10]))
+        # A new log starts over.
+        with open(out_path + ".new", "wb") as f:
+            f.write(header + records[10])
+        os.replace(out_path + ".new", log_path)
+        self.assertEqual(collector.pull(ad, out_path), len(records[10]))
+        with open(out_path, "rb") as f:
+            self.assertEqual(f.read(), header + records[10])
+
+    def test_energy_info_sampler(self):
+        self.assertEqual(bt_energy_utils.parse_energy_info(
+            MockEnergyDroid().bluetoothGetControllerActivityEnergyInfo(1)),
+                         (1, 2, 3, 10))
+        self.assertIsNone(bt_energy_utils.parse_energy_info(None))
+        ads = [MockEnergyAndroidDevice("a", MockEnergyDroid()),
+               MockEnergyAndroidDevice("b", MockEnergyDroid(reset_after=5))]
+        sampler = bt_energy_utils.EnergyInfoSampler(ads, interval=0.05)
+        sampler.start()
+        sampler.begin_phase("test")
+        time.sleep(0.5)
+        deltas = sampler.end_phase("test")
+        sampler.stop()
+        # Only the sessions of the sampler were used, and they are closed.
+        self.assertEqual(sampler.num_errors, 0)
+        for ad in ads:
+            self.assertGreater(ad.session_droid.num_calls, 5)
+            self.assertEqual(ad.terminated_sessions, [2])
+        begin_time, end_time = sampler.phases["test"]
+        samples = len([t for t in sampler.series["a"].times
+                       if begin_time <= t <= end_time])
+        self.assertEqual(deltas["a"]["samples"], samples)
+        self.assertEqual(deltas["a"]["energy_used"], 10 * (samples - 1))
+        # The counters of b count from 0 again after the reset.
+        self.assertEqual(deltas["b"]["energy_used"], 10 * (samples - 1))
+        self.assertEqual(deltas["b"]["tx_time_ms"], samples - 1)
+        paths = sampler.export(self.tmp_dir)
+        with open(paths[0], "r") as f:
+            self.assertEqual(len(f.read().splitlines()),
+                             len(sampler.series["a"]) + 2)
+        with open(paths[-1], "r") as f:
+            self.assertEqual(json.load(f)["test"]["deltas"], deltas)
+
+    def test_energy_sampler_of_base_test(self):
+        class MockBtTest(BluetoothBaseTest.BluetoothBaseTest):
+            # Does not call the teardown_class of BluetoothBaseTest.
+            def teardown_class(self):
+                pass
+
+            def test_something(self):
+                pass
+
+        events = []
+        sampler = mock.Mock()
+        sampler.start.side_effect = lambda: events.append("start")
+
+        def mock_setup(ads):
+            events.append("reset")
+            return True
+
+        configs = {"android_devices": [], "user_params": {
+            "energy_sample_interval": "1"}, "log": mock.MagicMock(),
+                   "log_path": self.tmp_dir, "cli_args": None}
+        with mock.patch.object(BluetoothBaseTest,
+                               "setup_multiple_devices_for_bt_test",
+                               side_effect=mock_setup):
+            with mock.patch.object(BluetoothBaseTest, "EnergyInfoSampler",
+                                   return_value=sampler):
+                test = MockBtTest(configs)
+                test.run(["test_something"])
+        # The sampler only started once Bluetooth was reset, and stopped
+        # despite the teardown_class override.
+        self.assertEqual(events, ["reset", "start"])
+        sampler.stop.assert_called_once_with()
+        sampler.export.assert_called_once_with(self.tmp_dir)
+        self.assertIsNone(test.energy_sampler)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3.4
+#
+#   Copyright 2016 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import logging
+import os
+import shutil
+import struct
+import tempfile
+import time
+import unittest
+
+from acts.test_utils.bt import btsnoop
+
+# Epoch time of the first fake packet, the next ones are one millisecond
+# apart.
+MOCK_BEGIN_TIME = 1467000000
+MOCK_PACKET_COUNT = 1000
+# Number of packets of the benchmark log, 10M makes a log of about 500MB.
+BENCHMARK_PACKET_COUNT = int(
+    os.environ.get("ACTS_BTSNOOP_BENCHMARK_PACKETS", 200000))
+MOCK_ATT_CID = 0x0004
+MOCK_DYNAMIC_CID = 0x0040
+
+
+def mock_hci_packet(i):
+    """A fake H4 HCI packet. Every 100 packets, an LE link and a classic link
+    are connected then disconnected, with ACL data in between.
+    """
+    le_handle = 1 + (i // 100) % 4
+    classic_handle = 0x80 + (i // 100) % 4
+    step = i % 100
+    if step == 0:
+        params = struct.pack("<BBHBB6sHHHB", 1, 0, le_handle, 0, 0, bytes(6),
+                             24, 0, 400, 0)
+        return struct.pack("<BBB", 4, btsnoop.EVENT_LE_META,
+                           len(params)) + params
+    if step == 25:
+        params = struct.pack("<BH6sBB", 0, classic_handle, bytes(6), 1, 0)
+        return struct.pack("<BBB", 4, btsnoop.EVENT_CONNECTION_COMPLETE,
+                           len(params)) + params
+    if step in (50, 75):
+        handle = le_handle if step == 50 else classic_handle
+        return struct.pack("<BBBBHB", 4, btsnoop.EVENT_DISCONNECTION_COMPLETE,
+                           4, 0, handle, 0x13)
+    if step % 10 == 1:
+        return struct.pack("<BHBBB", 1, 0x200c, 2, 1, 0)
+    if step % 10 == 2:
+        return struct.pack("<BBBBHH", 4, 0x13, 5, 1, le_handle, 1)
+    cid = MOCK_ATT_CID if i % 2 else MOCK_DYNAMIC_CID
+    payload = b"payload %08d" % i
+    return struct.pack("<BHHHH", 2, 0x2000 | le_handle, len(payload) + 4,
+                       len(payload), cid) + payload
+
+
+def write_mock_btsnoop(path, count=MOCK_PACKET_COUNT, first=0):
+    """Writes fake packets, with the btsnoop header if first is 0."""
+    with open(path, "ab") as f:
+        if not first:
+            f.write(btsnoop.BTSNOOP_MAGIC +
+                    struct.pack(">II", 1, btsnoop.DATALINK_HCI_UART))
+        records = []
+        for i in range(first, first + count):
+            data = mock_hci_packet(i)
+            flags = 0 if data[0] in (1, 2) and i % 2 else 1
+            if data[0] in (1, 4):
+                flags |= btsnoop.FLAG_COMMAND_EVENT
+            timestamp = (btsnoop.BTSNOOP_EPOCH_DELTA + MOCK_BEGIN_TIME * 10**6
+                         + i * 1000)
+            records.append(btsnoop.BTSNOOP_RECORD_HEADER.pack(
+                len(data), len(data), flags, 0, timestamp))
+            records.append(data)
+        f.write(b"".join(records))
+
+
+class ActsBtSnoopTest(unittest.TestCase):
+    """This test class has unit tests for the implementation of everything
+    under acts.test_utils.bt.btsnoop.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "btsnoop_hci.log")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_index_btsnoop_file(self):
+        write_mock_btsnoop(self.path)
+        index = btsnoop.index_btsnoop_file(self.path)
+        self.assertEqual(len(index), MOCK_PACKET_COUNT)
+        self.assertEqual(index.datalink, btsnoop.DATALINK_HCI_UART)
+        self.assertAlmostEqual(index.timestamps[1] - index.timestamps[0],
+                               0.001, places=6)
+        commands = index.find(packet_type=btsnoop.HCI_COMMAND, code=0x200c)
+        self.assertEqual(len(commands), MOCK_PACKET_COUNT // 10)
+        # ACL data of one LE link on the ATT channel.
+        packets = index.find(handle=1, cid=MOCK_ATT_CID)
+        self.assertEqual(len(packets), 38 * 3)
+        self.assertTrue(all(p.packet_type == btsnoop.HCI_ACL
+                            for p in packets))
+        self.assertEqual(index.read_packet(packets[0])[9:],
+                         b"payload %08d" % 3)
+        # The packets of the second hundred millisecond.
+        packets = index.find(MOCK_BEGIN_TIME + 0.0995,
+                             MOCK_BEGIN_TIME + 0.1995)
+        self.assertEqual(len(packets), 100)
+        self.assertEqual(packets[0].offset, index.offsets[100])
+
+    def test_find_le_connection_events(self):
+        write_mock_btsnoop(self.path)
+        index = btsnoop.index_btsnoop_file(self.path)
+        events = index.find_le_connection_events()
+        self.assertEqual(len(events), 2 * MOCK_PACKET_COUNT // 100)
+        self.assertEqual(
+            [(e.code, e.handle) for e in events[:2]],
+            [(btsnoop.EVENT_LE_META, 1),
+             (btsnoop.EVENT_DISCONNECTION_COMPLETE, 1)])
+        events = index.find_le_connection_events(MOCK_BEGIN_TIME + 0.1495,
+                                                 MOCK_BEGIN_TIME + 0.2005)
+        self.assertEqual([e.handle for e in events], [2, 3])
+
+    def test_update_indexes_appended_records(self):
+        write_mock_btsnoop(self.path, 10)
+        # A record still being written.
+        with open(self.path, "ab") as f:
+            f.write(btsnoop.BTSNOOP_RECORD_HEADER.pack(
+                100, 100, 0, 0, btsnoop.BTSNOOP_EPOCH_DELTA))
+        index = btsnoop.index_btsnoop_file(self.path)
+        self.assertEqual(len(index), 10)
+        self.assertEqual(index.update(), 0)
+        with open(self.path, "ab") as f:
+            f.write(bytes([2]) + bytes(99))
+        write_mock_btsnoop(self.path, 10, first=10)
+        self.assertEqual(index.update(), 11)
+        self.assertEqual(index.find(handle=0)[0].length, 100)
+
+    def test_parse_unencapsulated_hci_packet(self):
+        data = mock_hci_packet(0)[1:]
+        self.assertEqual(
+            btsnoop.parse_hci_packet(data, 3, btsnoop.DATALINK_HCI_UNENCAP),
+            (btsnoop.HCI_EVENT, btsnoop.EVENT_LE_META,
+             btsnoop.SUBEVENT_LE_CONNECTION_COMPLETE, 1, btsnoop.NO_VALUE))
+        data = mock_hci_packet(3)[1:]
+        self.assertEqual(
+            btsnoop.parse_hci_packet(data, 0, btsnoop.DATALINK_HCI_UNENCAP),
+            (btsnoop.HCI_ACL, btsnoop.NO_VALUE, 0, 1, MOCK_ATT_CID))
+
+    def test_benchmark_synthetic_log(self):
+        """Indexes a synthetic log and times queries on it.
+
+        Set ACTS_BTSNOOP_BENCHMARK_PACKETS to benchmark bigger logs.
+        """
+        for first in range(0, BENCHMARK_PACKET_COUNT, 100000):
+            write_mock_btsnoop(self.path,
+                               min(100000, BENCHMARK_PACKET_COUNT - first),
+                               first)
+        begin_time = time.time()
+        index = btsnoop.index_btsnoop_file(self.path)
+        index_time = time.time() - begin_time
+        self.assertEqual(len(index), BENCHMARK_PACKET_COUNT)
+        middle = MOCK_BEGIN_TIME + BENCHMARK_PACKET_COUNT / 2000 - 0.0005
+        begin_time = time.time()
+        events = index.find_le_connection_events(middle, middle + 9.9995)
+        query_time = time.time() - begin_time
+        self.assertEqual(len(events), 200)
+        logging.info("Indexed %d packets, %d bytes, in %.2fs. Found LE "
+                     "connection events of 10s in %.2fms.", len(index),
+                     index.size, index_time, query_time * 1000)
+        self.assertLess(query_time, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
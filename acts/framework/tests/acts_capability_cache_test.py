@@ -0,0 +1,100 @@
+#!/usr/bin/env python3.4
+#
+#   Copyright 2016 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import mock
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+
+from acts.test_utils import capability_cache
+
+MOCK_SERIAL = "1234"
+
+
+def get_mock_ad(fingerprint):
+    ad = mock.MagicMock()
+    ad.serial = MOCK_SERIAL
+    ad.adb.shell.return_value = fingerprint.encode("utf-8") + b"\n"
+    return ad
+
+
+def set_capabilities(path, names):
+    cache = capability_cache.CapabilityCache(path)
+    ad = get_mock_ad("build/1")
+    for name in names:
+        cache.set(ad, name, name)
+
+
+class ActsCapabilityCacheTest(unittest.TestCase):
+    """This test class has unit tests for the implementation of everything
+    under acts.test_utils.capability_cache.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "cache", "capabilities.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_probe_once_per_build(self):
+        probe = mock.Mock(return_value=5)
+        ad = get_mock_ad("build/1")
+        cache = capability_cache.CapabilityCache(self.path)
+        self.assertEqual(cache.get_or_probe(ad, "cap", probe, "arg"), 5)
+        probe.assert_called_once_with(ad, "arg")
+        # Another cache object reads the file written by the first one.
+        cache = capability_cache.CapabilityCache(self.path)
+        self.assertEqual(cache.get_or_probe(ad, "cap", probe, "arg"), 5)
+        self.assertEqual(probe.call_count, 1)
+        ad = get_mock_ad("build/2")
+        self.assertIsNone(cache.get(ad, "cap"))
+        probe.return_value = 6
+        self.assertEqual(cache.get_or_probe(ad, "cap", probe, "arg"), 6)
+        self.assertEqual(probe.call_count, 2)
+        cache.invalidate(ad)
+        self.assertIsNone(cache.get(ad, "cap"))
+
+    def test_unreadable_cache_is_ignored(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as f:
+            f.write("{not json")
+        ad = get_mock_ad("build/1")
+        cache = capability_cache.CapabilityCache(self.path)
+        self.assertIsNone(cache.get(ad, "cap"))
+        cache.set(ad, "cap", [1, 2])
+        self.assertEqual(cache.get(ad, "cap"), [1, 2])
+
+    def test_parallel_processes_keep_each_other_entries(self):
+        names = [["p{}_{}".format(p, i) for i in range(20)] for p in range(4)]
+        processes = [multiprocessing.Process(target=set_capabilities,
+                                             args=(self.path, n))
+                     for n in names]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join(30)
+            self.assertEqual(p.exitcode, 0)
+        cache = capability_cache.CapabilityCache(self.path)
+        ad = get_mock_ad("build/1")
+        for name in sum(names, []):
+            self.assertEqual(cache.get(ad, name), name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3.4
+#
+#   Copyright 2016 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import json
+import math
+import mock
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+
+from acts.controllers import iperf_server
+
+
+def json_stream_interval(start, bps, jitter=None, lost=None):
+    total = {"start": start, "end": start + 1, "seconds": 1,
+             "bytes": bps / 8, "bits_per_second": bps, "omitted": False}
+    if jitter is not None:
+        total.update({"jitter_ms": jitter, "lost_percent": lost})
+    return {"streams": [], "sum": total}
+
+
+class ActsIPerfServerTest(unittest.TestCase):
+    """This test class has unit tests for the implementation of everything
+    under acts.controllers.iperf_server.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.tmp_dir, "iperf.log")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write(self, text):
+        with open(self.log_path, "a") as f:
+            f.write(text)
+
+    def test_stream_parser_json_stream(self):
+        parser = iperf_server.IPerfStreamParser(self.log_path)
+        self.assertEqual(parser.poll(), [])
+        self.write(json.dumps({"event": "start", "data": {}}) + "\n")
+        line = json.dumps({"event": "interval",
+                           "data": json_stream_interval(0, 8e6, 0.5, 1)})
+        # Partial lines are only parsed once complete.
+        self.write(line[:10])
+        self.assertEqual(parser.poll(), [])
+        self.write(line[10:] + "\n")
+        intervals = parser.poll()
+        self.assertEqual(len(intervals), 1)
+        self.assertEqual(intervals[0]["bits_per_second"], 8e6)
+        self.assertEqual(intervals[0]["jitter_ms"], 0.5)
+        for i in range(1, 10):
+            self.write(json.dumps({
+                "event": "interval",
+                "data": json_stream_interval(i, (i + 1) * 8e6, 0.5, 0)
+            }) + "\n")
+        self.write(json.dumps({"event": "end", "data": {}}) + "\n")
+        self.assertEqual(len(parser.poll()), 9)
+        self.assertTrue(parser.ended)
+        self.assertEqual(len(parser), 10)
+        self.assertEqual(parser.percentiles("bits_per_second", (50, 100)),
+                         {50: 44e6, 100: 80e6})
+        summary = parser.summary()
+        self.assertEqual(summary["lost_percent"]["max"], 1)
+        self.assertAlmostEqual(parser.avg_rate, 5.5e6 / 1024 / 1024)
+
+    def test_stream_parser_text_parallel_streams(self):
+        self.write("[ ID] Interval           Transfer     Bandwidth\n"
+                   "[  5]   0.00-1.00   sec  1.00 MBytes  8.00 Mbits/sec\n"
+                   "[  7]   0.00-1.00   sec  2.00 MBytes  16.0 Mbits/sec\n"
+                   "[SUM]   0.00-1.00   sec  3.00 MBytes  25.0 Mbits/sec\n"
+                   "[  5]   1.00-2.00   sec  1.00 MBytes  8.00 Mbits/sec\n"
+                   "[  7]   1.00-2.00   sec  1.00 MBytes  8.00 Mbits/sec\n")
+        parser = iperf_server.IPerfStreamParser(self.log_path)
+        intervals = parser.poll()
+        self.assertEqual(len(intervals), 1)
+        self.assertEqual(intervals[0]["bits_per_second"], 25e6)
+        self.assertTrue(math.isnan(intervals[0]["jitter_ms"]))
+        self.write("[SUM]   0.00-2.00   sec  5.00 MBytes  20.0 Mbits/sec"
+                   "  sender\n")
+        intervals = parser.finish()
+        self.assertEqual(len(intervals), 1)
+        self.assertEqual(intervals[0]["bits_per_second"], 16e6)
+        self.assertEqual(intervals[0]["bytes"], 2 * 1024**2)
+
+    def test_stream_parser_text_unit_prefixes(self):
+        self.write("[  5]   0.00-1.00   sec   512 Bytes  4096 bits/sec\n"
+                   "[  5]   1.00-2.00   sec  2.00 KBytes  16.0 Kbits/sec\n"
+                   "[  5]   2.00-3.00   sec  1.00 MBytes  8.00 Mbits/sec\n")
+        parser = iperf_server.IPerfStreamParser(self.log_path)
+        intervals = parser.finish()
+        self.assertEqual([i["bytes"] for i in intervals],
+                         [512, 2 * 1024, 1024**2])
+        self.assertEqual([i["bits_per_second"] for i in intervals],
+                         [4096, 16e3, 8e6])
+
+    def test_stream_parser_json_document(self):
+        result = {"start": {},
+                  "intervals": [json_stream_interval(0, 8e6),
+                                json_stream_interval(1, 16e6)],
+                  "end": {}}
+        self.write("interrupted\n" + json.dumps(result, indent=4))
+        parser = iperf_server.IPerfStreamParser(self.log_path)
+        self.assertEqual(parser.poll(), [])
+        self.assertEqual(len(parser.finish()), 2)
+        self.assertTrue(parser.ended)
+        csv_path = os.path.join(self.tmp_dir, "intervals.csv")
+        parser.export_csv(csv_path)
+        with open(csv_path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], ",".join(iperf_server.INTERVAL_COLUMNS))
+        self.assertEqual(len(lines), 3)
+
+    @mock.patch("acts.utils.start_standing_subprocess")
+    def test_server_wait_for_listening(self, start_proc):
+        start_proc.return_value.poll.return_value = None
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        # Like a server, so the port only counts as used once listening.
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("", 0))
+        server = iperf_server.IPerfServer(sock.getsockname()[1],
+                                          self.tmp_dir)
+        server.start()
+        self.assertFalse(server.wait_for_listening(timeout=0.1))
+        threading.Timer(0.2, sock.listen).start()
+        try:
+            self.assertTrue(server.wait_for_listening())
+        finally:
+            sock.close()
+        # A server which exited never listens.
+        start_proc.return_value.poll.return_value = 1
+        self.assertFalse(server.wait_for_listening())
+
+    @mock.patch("acts.controllers.iperf_server._is_port_listening")
+    @mock.patch("acts.utils.stop_standing_subprocess")
+    @mock.patch("acts.utils.start_standing_subprocess")
+    def test_server_pool_run_clients(self, start_proc, stop_proc,
+                                     is_port_listening):
+        start_proc.return_value.poll.return_value = None
+        is_port_listening.return_value = True
+        pool = iperf_server.IPerfServerPool(range(5201, 5204), self.tmp_dir)
+        servers_by_port = {s.port: s for s in pool.servers}
+        test = self
+
+        class FakeClient(object):
+            def __init__(self, mbps):
+                self.mbps = mbps
+
+            def run_iperf_client(self, server_host, extra_args):
+                port = int(extra_args.split()[1])
+                # Every server listens before the clients start.
+                test.assertEqual(is_port_listening.call_count, 2)
+                result = {"end": {"sum": {"bits_per_second": self.mbps * 1e6}}}
+                with open(servers_by_port[port].log_files[-1], "w") as f:
+                    json.dump(result, f)
+                return True, []
+
+        clients = [FakeClient(8), FakeClient(16)]
+        result = pool.run_clients(clients, "localhost", "-t 1", tag="test")
+        self.assertEqual(start_proc.call_count, 2)
+        self.assertTrue(result.all_succeeded)
+        self.assertAlmostEqual(result.total_rate, 24e6 / 8 / 1024 / 1024)
+        self.assertFalse(any(s.started for s in pool.servers))
+        with self.assertRaises(ValueError):
+            pool.assign(clients * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
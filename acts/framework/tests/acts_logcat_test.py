@@ -0,0 +1,82 @@
+#!/usr/bin/env python3.4
+#
+#   Copyright 2016 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from acts.controllers.utils_lib import logcat
+
+# Number of fake logcat lines, one per second starting at 02-29 14:00:00.
+MOCK_LOGCAT_LINE_COUNT = 100
+
+
+def mock_logcat_cmd():
+    """A command printing MOCK_LOGCAT_LINE_COUNT lines in logcat format."""
+    lines = ["02-29 14:%02d:%02d.000  4454  4454 I Tag: line %d" %
+             (i // 60, i % 60, i) for i in range(MOCK_LOGCAT_LINE_COUNT)]
+    return "printf '%s\\n'" % "\\n".join(lines)
+
+
+class ActsLogcatTest(unittest.TestCase):
+    """This test class has unit tests for the implementation of everything
+    under acts.controllers.utils_lib.logcat.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def start_and_wait(self, rotator):
+        rotator.start()
+        rotator.proc.wait()
+        rotator._reader.join()
+        rotator._compressor.shutdown(wait=True)
+
+    def test_rotation_and_bounded_segments(self):
+        rotator = logcat.RotatingLogcat(mock_logcat_cmd(), self.tmp_dir,
+                                        "adblog", segment_size=500,
+                                        max_segments=3)
+        self.start_and_wait(rotator)
+        self.assertEqual(len(rotator.segments), 3)
+        for segment in rotator.segments[:-1]:
+            self.assertTrue(segment.path.endswith(".txt.gz"))
+        self.assertTrue(rotator.segments[-1].path.endswith(".txt"))
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)),
+                         sorted(os.path.basename(s.path)
+                                for s in rotator.segments))
+        last_times = [s.end_time for s in rotator.segments if s.end_time]
+        self.assertEqual(last_times[-1], "02-29 14:01:39.000")
+
+    def test_cat_reads_overlapping_segments(self):
+        rotator = logcat.RotatingLogcat(mock_logcat_cmd(), self.tmp_dir,
+                                        "adblog", segment_size=500,
+                                        max_segments=100)
+        self.start_and_wait(rotator)
+        out = io.StringIO()
+        rotator.cat("02-29 14:00:58.000", "02-29 14:01:02.000", out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertTrue(lines[0].endswith("line 58"))
+        self.assertTrue(lines[-1].endswith("line 62"))
+
+
+if __name__ == "__main__":
+    unittest.main()
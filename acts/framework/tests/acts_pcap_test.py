@@ -0,0 +1,140 @@
+#!/usr/bin/env python3.4
+#
+#   Copyright 2016 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+from acts.controllers.sniffer_lib import pcap
+
+# Epoch time of the first fake packet, the next ones are one second apart.
+MOCK_BEGIN_TIME = 1467000000
+MOCK_PACKET_COUNT = 60
+MOCK_AP_MAC = "00:11:22:33:44:55"
+MOCK_STA_MACS = ["aa:bb:cc:dd:ee:00", "aa:bb:cc:dd:ee:01"]
+
+
+def mock_frame(i):
+    """A radiotap 802.11 frame: data frames from a station to the AP, with
+    a beacon every 10 packets.
+    """
+    radiotap = struct.pack("<BBHI", 0, 0, 8, 0)
+    if i % 10 == 0:
+        frame_control = 0x80  # Beacon.
+        addr1, addr2 = "ff:ff:ff:ff:ff:ff", MOCK_AP_MAC
+    else:
+        frame_control = 0x08  # Data.
+        addr1, addr2 = MOCK_AP_MAC, MOCK_STA_MACS[i % 2]
+    macs = b"".join(bytes.fromhex(a.replace(":", "")) for a in (addr1, addr2))
+    return (radiotap + struct.pack("<BBH", frame_control, 0, 0) + macs +
+            bytes(10) + b"payload %d" % i)
+
+
+def write_mock_pcap(path):
+    with open(path, "wb") as f:
+        f.write(struct.pack("<IHHiIII", pcap.PCAP_MAGIC_US, 2, 4, 0, 0, 65535,
+                            pcap.LINKTYPE_IEEE802_11_RADIOTAP))
+        for i in range(MOCK_PACKET_COUNT):
+            data = mock_frame(i)
+            f.write(struct.pack("<IIII", MOCK_BEGIN_TIME + i, 500000,
+                                len(data), len(data)))
+            f.write(data)
+
+
+class ActsPcapTest(unittest.TestCase):
+    """This test class has unit tests for the implementation of everything
+    under acts.controllers.sniffer_lib.pcap.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.pcap_path = os.path.join(self.tmp_dir, "mock.pcap")
+        write_mock_pcap(self.pcap_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_index_pcap_file(self):
+        segment = pcap.index_pcap_file(self.pcap_path)
+        self.assertEqual(len(segment), MOCK_PACKET_COUNT)
+        self.assertEqual(segment.size, os.path.getsize(self.pcap_path))
+        packets = segment.find(MOCK_BEGIN_TIME + 10, MOCK_BEGIN_TIME + 20.9,
+                               mac=MOCK_STA_MACS[1])
+        self.assertEqual([p.timestamp for p in packets],
+                         [MOCK_BEGIN_TIME + i + 0.5 for i in (11, 13, 15, 17,
+                                                              19)])
+        self.assertTrue(pcap.read_packet(packets[0]).endswith(b"payload 11"))
+        beacons = segment.find(frame_type=pcap.FRAME_TYPE_MANAGEMENT)
+        self.assertEqual(len(beacons), MOCK_PACKET_COUNT // 10)
+        self.assertEqual(beacons[0].subtype, 8)
+
+    def test_indexed_capture_rotation(self):
+        capture_dir = os.path.join(self.tmp_dir, "capture")
+        capture = pcap.IndexedPcapCapture("cat %s" % self.pcap_path,
+                                          capture_dir, "capture",
+                                          segment_size=1000, max_segments=3)
+        capture.start()
+        capture.proc.wait()
+        capture.join()
+        self.assertEqual(len(capture.segments), 3)
+        self.assertEqual(sorted(os.listdir(capture_dir)),
+                         sorted(os.path.basename(s.path)
+                                for s in capture.segments))
+        for segment in capture.segments:
+            self.assertLessEqual(segment.size, 1000)
+            # Every segment is a valid pcap file.
+            self.assertEqual(len(pcap.index_pcap_file(segment.path)),
+                             len(segment))
+        packets = capture.find_packets(mac=MOCK_AP_MAC)
+        self.assertEqual(packets[-1].timestamp,
+                         MOCK_BEGIN_TIME + MOCK_PACKET_COUNT - 0.5)
+        self.assertEqual(capture.find_packets(end_time=MOCK_BEGIN_TIME), [])
+
+    def test_indexed_capture_invalid_output(self):
+        capture = pcap.IndexedPcapCapture(
+            "head -c 1000000 /dev/zero", os.path.join(self.tmp_dir,
+                                                      "capture"), "capture")
+        capture.start()
+        # The output is drained, so the command is not blocked on the pipe.
+        self.assertEqual(capture.proc.wait(10), 0)
+        with self.assertRaises(pcap.PcapError):
+            capture.join()
+        self.assertEqual(capture.segments, [])
+
+    def test_write_excerpt_across_segments(self):
+        capture_dir = os.path.join(self.tmp_dir, "capture")
+        capture = pcap.IndexedPcapCapture("cat %s" % self.pcap_path,
+                                          capture_dir, "capture",
+                                          segment_size=1000)
+        capture.start()
+        capture.proc.wait()
+        capture.join()
+        self.assertGreater(len(capture.segments), 2)
+        excerpt_path = os.path.join(self.tmp_dir, "excerpt.pcap")
+        with open(excerpt_path, "wb") as out:
+            num_packets = capture.write_excerpt(out, MOCK_BEGIN_TIME + 5,
+                                                MOCK_BEGIN_TIME + 44.9)
+        self.assertEqual(num_packets, 40)
+        excerpt = pcap.index_pcap_file(excerpt_path)
+        self.assertEqual(list(excerpt.timestamps),
+                         [MOCK_BEGIN_TIME + i + 0.5 for i in range(5, 45)])
+        self.assertEqual(excerpt.size, os.path.getsize(excerpt_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3.4
+#
+#   Copyright 2016 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import logging
+import threading
+import time
+import unittest
+
+from acts.test_utils.tel import tel_test_utils
+
+
+def mock_task(result, delay=0, done=None):
+    """A fake device task returning result after delay seconds, and setting
+    the done event if any once finished.
+    """
+    time.sleep(delay)
+    if done is not None:
+        done.set()
+    return result
+
+
+def mock_failing_task():
+    raise ValueError("Task failed.")
+
+
+class ActsTelTestUtilsTest(unittest.TestCase):
+    """This test class has unit tests for the implementation of everything
+    under acts.test_utils.tel.tel_test_utils.
+    """
+
+    def setUp(self):
+        self.log = logging.getLogger()
+
+    def tearDown(self):
+        tel_test_utils.shutdown_multithread_executor()
+
+    def test_timed_task(self):
+        task = tel_test_utils._TimedTask((mock_task, (True, 0.1)))
+        self.assertEqual(str(task), "mock_task")
+        self.assertEqual(task.elapsed(), 0)
+        self.assertTrue(task())
+        self.assertGreaterEqual(task.elapsed(), 0.1)
+        self.assertLess(task.elapsed(), 1)
+
+    def test_multithread_func_runs_tasks_in_parallel(self):
+        tasks = [(mock_task, (True, 0.2)) for _ in range(4)]
+        begin_time = time.time()
+        self.assertTrue(tel_test_utils.multithread_func(self.log, tasks))
+        self.assertLess(time.time() - begin_time, 0.6)
+
+    def test_multithread_func_waits_for_all_tasks_by_default(self):
+        done = threading.Event()
+        tasks = [(mock_task, (False, )), (mock_task, (True, 0.3, done))]
+        self.assertFalse(tel_test_utils.multithread_func(self.log, tasks))
+        self.assertTrue(done.is_set())
+
+    def test_multithread_func_fail_fast(self):
+        tel_test_utils.setup_multithread_executor(2)
+        done = threading.Event()
+        started = threading.Event()
+        tasks = [(mock_task, (False, 0.1)), (mock_task, (True, 0.5, done)),
+                 (mock_task, (True, 0.5)), (mock_task, (True, 0, started))]
+        begin_time = time.time()
+        self.assertFalse(tel_test_utils.multithread_func(self.log, tasks,
+                                                         fail_fast=True))
+        # The running tasks are not waited for, and the last one, not
+        # started yet when the first one failed, is cancelled.
+        self.assertLess(time.time() - begin_time, 0.4)
+        self.assertFalse(done.is_set())
+        time.sleep(0.6)
+        self.assertTrue(done.is_set())
+        self.assertFalse(started.is_set())
+
+    def test_multithread_func_timeout(self):
+        tasks = [(mock_task, (True, )), (mock_task, (True, 1))]
+        begin_time = time.time()
+        self.assertFalse(tel_test_utils.multithread_func(self.log, tasks,
+                                                         timeout=0.2))
+        self.assertLess(time.time() - begin_time, 0.8)
+
+    def test_multithread_func_timeout_queued_tasks(self):
+        # Tasks waiting for a worker of the shared executor time out once
+        # they ran for timeout seconds, not while queued.
+        tel_test_utils.setup_multithread_executor(1)
+        tasks = [(mock_task, (True, 0.2)) for _ in range(3)]
+        self.assertTrue(tel_test_utils.multithread_func(self.log, tasks,
+                                                        timeout=0.4))
+
+    def test_multithread_func_raises_task_exception(self):
+        tasks = [(mock_task, (True, )), (mock_failing_task, ())]
+        with self.assertRaises(ValueError):
+            tel_test_utils.multithread_func(self.log, tasks)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -20,25 +20,43 @@ import unittest
 import acts_adb_test
 import acts_android_device_test
 import acts_asserts_test
+import acts_attenuator_test
 import acts_base_class_test
+import acts_bt_test_utils_test
+import acts_btsnoop_test
+import acts_capability_cache_test
+import acts_iperf_server_test
+import acts_logcat_test
 import acts_logger_test
+import acts_pcap_test
 import acts_records_test
 import acts_sl4a_client_test
+import acts_tel_test_utils_test
 import acts_test_runner_test
 import acts_utils_test
+import acts_wifi_test_utils_test
 
 
 def compile_suite():
     test_classes_to_run = [
         acts_adb_test.ActsAdbTest,
         acts_asserts_test.ActsAssertsTest,
+        acts_attenuator_test.ActsAttenuatorTest,
         acts_base_class_test.ActsBaseClassTest,
+        acts_bt_test_utils_test.ActsBtTestUtilsTest,
+        acts_btsnoop_test.ActsBtSnoopTest,
+        acts_capability_cache_test.ActsCapabilityCacheTest,
+        acts_iperf_server_test.ActsIPerfServerTest,
         acts_test_runner_test.ActsTestRunnerTest,
         acts_android_device_test.ActsAndroidDeviceTest,
         acts_records_test.ActsRecordsTest,
         acts_sl4a_client_test.ActsSl4aClientTest,
+        acts_tel_test_utils_test.ActsTelTestUtilsTest,
         acts_utils_test.ActsUtilsTest,
-        acts_logger_test.ActsLoggerTest
+        acts_wifi_test_utils_test.ActsWifiTestUtilsTest,
+        acts_logger_test.ActsLoggerTest,
+        acts_logcat_test.ActsLogcatTest,
+        acts_pcap_test.ActsPcapTest
     ]
 
     loader = unittest.TestLoader()
@@ -16,6 +16,7 @@
 
 __author__ = "angli@google.com (Ang Li)"
 
+import threading
 import time
 import unittest
 
@@ -38,6 +39,102 @@ class ActsUtilsTest(unittest.TestCase):
                                      "Process .* has terminated"):
             utils.stop_standing_subprocess(p)
 
+    def test_concurrent_map_ordered_results(self):
+        def delayed_echo(value, delay):
+            time.sleep(delay)
+            return value
+
+        params = [(i, 0.05 * (5 - i)) for i in range(5)]
+        self.assertEqual(utils.concurrent_map(delayed_echo, params),
+                         list(range(5)))
+
+    def test_concurrent_map_aggregated_errors(self):
+        def fail_on_odd(value):
+            if value % 2:
+                raise ValueError(value)
+            return value
+
+        with self.assertRaises(utils.ConcurrentExecError) as cm:
+            utils.concurrent_map(fail_on_odd, [(i, ) for i in range(4)])
+        self.assertEqual(len(cm.exception.errors), 2)
+        self.assertEqual(cm.exception.results[0], 0)
+        self.assertIsInstance(cm.exception.results[1], ValueError)
+        results = utils.concurrent_exec(fail_on_odd, [(i, ) for i in range(4)])
+        self.assertEqual(results[2], 2)
+        self.assertIsInstance(results[3], ValueError)
+
+    def test_concurrent_map_resource_limit(self):
+        lock = threading.Lock()
+        usage = {"current": 0, "max": 0}
+
+        def use_resource(resource):
+            with lock:
+                usage["current"] += 1
+                usage["max"] = max(usage["max"], usage["current"])
+            time.sleep(0.05)
+            with lock:
+                usage["current"] -= 1
+
+        utils.set_resource_limit("instrument", 1)
+        try:
+            utils.concurrent_map(use_resource, [("instrument", )] * 4,
+                                 resource_func=lambda r: r)
+        finally:
+            utils.set_resource_limit("instrument", None)
+        self.assertEqual(usage["max"], 1)
+
+    def test_concurrent_map_timeout(self):
+        results = utils.concurrent_map(time.sleep, [(0, ), (1, )],
+                                       timeout=0.2,
+                                       raise_on_error=False)
+        self.assertIsNone(results[0])
+        self.assertIsInstance(results[1], utils.TimeoutError)
+
+    def test_concurrent_map_cancel(self):
+        cancel_event = threading.Event()
+
+        def cancel_after(delay):
+            time.sleep(delay)
+            cancel_event.set()
+
+        results = utils.concurrent_map(cancel_after, [(0.05, )] * 3,
+                                       max_workers=1,
+                                       cancel_event=cancel_event,
+                                       raise_on_error=False)
+        self.assertIsNone(results[0])
+        self.assertIsInstance(results[2],
+                              utils.concurrent.futures.CancelledError)
+
+    def test_concurrent_map_nested(self):
+        def nested_sleep(delay):
+            begin_time = time.time()
+            results = utils.concurrent_map(time.sleep,
+                                           [(delay, ), (delay, ), (1, )],
+                                           timeout=0.3,
+                                           raise_on_error=False)
+            return time.time() - begin_time, results
+
+        results = utils.concurrent_map(nested_sleep, [(0.1, )] * 2)
+        for elapsed, nested_results in results:
+            # The nested executions run in parallel and time out.
+            self.assertLess(elapsed, 0.6)
+            self.assertEqual(nested_results[:2], [None, None])
+            self.assertIsInstance(nested_results[2], utils.TimeoutError)
+
+    def test_concurrent_map_nested_held_resource(self):
+        def nested_use(resource):
+            return utils.concurrent_map(lambda r: r, [(resource, )] * 2,
+                                        resource_func=lambda r: r,
+                                        timeout=1)
+
+        utils.set_resource_limit("device", 1)
+        try:
+            results = utils.concurrent_map(nested_use, [("device", )],
+                                           resource_func=lambda r: r)
+        finally:
+            utils.set_resource_limit("device", None)
+        self.assertEqual(results, [["device", "device"]])
+
 
 if __name__ == "__main__":
    unittest.main()
\ No newline at end of file
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3.4
+#
+#   Copyright 2016 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import unittest
+
+from acts import signals
+from acts.test_utils.wifi import wifi_test_utils as wutils
+
+MOCK_SCAN_CHANNELS = (2412, 2437, 2462)
+MOCK_SCAN_SETTING = {
+    "channels": MOCK_SCAN_CHANNELS,
+    "periodInMs": 10000,
+    "numBssidsPerScan": 2,
+    "maxScansToCache": 2,
+    "reportEvents": wutils.WifiEnums.REPORT_EVENT_AFTER_BUFFER_FULL
+}
+
+
+def mock_batch(timestamp_ms, frequencies):
+    """A batch of scan results, timestamps being in microseconds."""
+    return {"ScanResults": [{"frequency": f,
+                             "timestamp": (timestamp_ms + i) * 1000}
+                            for i, f in enumerate(frequencies)]}
+
+
+class ActsWifiTestUtilsTest(unittest.TestCase):
+    """This test class has unit tests for the implementation of everything
+    under acts.test_utils.wifi.wifi_test_utils.
+    """
+
+    def make_validator(self, **kwargs):
+        return wutils.WifiScanResultValidator(
+            MOCK_SCAN_SETTING, MOCK_SCAN_CHANNELS, scan_time=100,
+            scan_rt=1000, **kwargs)
+
+    def test_scan_result_validator_valid_results(self):
+        validator = self.make_validator(check_interval=True,
+                                        check_num_bssids=True)
+        batches = [mock_batch(1000, (2412, 2437)),
+                   mock_batch(11000, (2462, ))]
+        self.assertEqual(validator.validate_results(batches, 20000), 3)
+        self.assertEqual(validator.num_batches, 2)
+        self.assertEqual(validator.num_events, 1)
+        self.assertTrue(validator.valid)
+
+    def test_scan_result_validator_strict(self):
+        validator = self.make_validator()
+        # A frequency not scanned.
+        with self.assertRaises(signals.TestFailure):
+            validator.validate_batch(mock_batch(1000, (5180, )))
+        # A result older than the start of the scan.
+        with self.assertRaises(signals.TestFailure):
+            validator.validate_batch(mock_batch(900, (2412, )))
+        # A result later than the scan time after the first of its batch.
+        batch = mock_batch(1000, (2412, ))
+        batch["ScanResults"].append({"frequency": 2437,
+                                     "timestamp": 1200 * 1000})
+        with self.assertRaises(signals.TestFailure):
+            validator.validate_batch(batch)
+        with self.assertRaises(signals.TestFailure):
+            self.make_validator(check_num_bssids=True).validate_batch(
+                mock_batch(1000, MOCK_SCAN_CHANNELS))
+        with self.assertRaises(signals.TestFailure):
+            validator.validate_results([mock_batch(1000, (2412, ))] * 3)
+
+    def test_scan_result_validator_not_strict(self):
+        validator = self.make_validator(strict=False)
+        self.assertEqual(validator.validate_batch(
+            mock_batch(1000, (2412, 5180))), 2)
+        self.assertFalse(validator.valid)
+        self.assertEqual(validator.num_bssids, 2)
+        # Batches without results fail in both modes.
+        with self.assertRaises(signals.TestFailure):
+            validator.validate_batch({"ScanResults": []})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,12 +23,9 @@ Shield box one: Android Device as DUT. 7x Sprout devices acting as 192 beacons
 import threading
 
 from acts.test_utils.bt.BluetoothBaseTest import BluetoothBaseTest
-from acts.test_utils.bt.BleEnum import AdvertiseSettingsAdvertiseMode
 from acts.test_utils.bt.BleEnum import ScanSettingsScanMode
-from acts.test_utils.bt.bt_test_utils import adv_succ
-from acts.test_utils.bt.bt_test_utils import batch_scan_result
-from acts.test_utils.bt.bt_test_utils import scan_result
-from acts.test_utils.bt.bt_test_utils import generate_ble_advertise_objects
+from acts.test_utils.bt.bt_test_utils import BleAdvertiserSwarm
+from acts.test_utils.bt.bt_test_utils import BleScanAggregator
 from acts.test_utils.bt.bt_test_utils import generate_ble_scan_objects
 from acts.test_utils.bt.bt_test_utils import log_energy_info
 from acts.test_utils.bt.bt_test_utils import reset_bluetooth
@@ -38,9 +35,9 @@ from acts.test_utils.bt.bt_test_utils import take_btsnoop_logs
 
 class BeaconSwarmTest(BluetoothBaseTest):
     default_timeout = 10
-    beacon_swarm_count = 0
+    beacon_count = 0
+    beacon_swarm = None
     advertising_device_name_list = []
-    discovered_mac_address_list = []
 
     def __init__(self, controllers):
         BluetoothBaseTest.__init__(self, controllers)
@@ -48,7 +45,6 @@ class BeaconSwarmTest(BluetoothBaseTest):
 
     def setup_test(self):
         self.log.debug(log_energy_info(self.android_devices, "Start"))
-        self.discovered_mac_address_list = []
         for a in self.android_devices:
             a.ed.clear_all_events()
         return True
@@ -70,95 +66,39 @@ class BeaconSwarmTest(BluetoothBaseTest):
         take_btsnoop_logs(self.android_devices, self, test_name)
         reset_bluetooth([self.scn_ad])
 
-    def _start_advertisements_thread(self, ad, beacon_count, restart=False):
-        d, e = ad.droid, ad.ed
-        if restart:
-            try:
-                reset_bluetooth([ad])
-            except Exception:
-                self.log.debug("Failed resetting Bluetooth, continuing...")
-                return
-        try:
-            for _ in range(beacon_count):
-                d.bleSetAdvertiseDataIncludeDeviceName(True)
-                d.bleSetAdvertiseSettingsAdvertiseMode(
-                    AdvertiseSettingsAdvertiseMode.ADVERTISE_MODE_LOW_LATENCY.
-                    value)
-                advertise_callback, advertise_data, advertise_settings = (
-                    generate_ble_advertise_objects(d))
-                d.bleStartBleAdvertising(advertise_callback, advertise_data,
-                                         advertise_settings)
-                try:
-                    e.pop_event(
-                        adv_succ.format(advertise_callback),
-                        self.default_timeout)
-                    self.beacon_swarm_count += 1
-                    local_bt_name = d.bluetoothGetLocalName()
-                    if local_bt_name not in self.advertising_device_name_list:
-                        self.advertising_device_name_list.append(
-                            d.bluetoothGetLocalName())
-                except Exception as e:
-                    self.log.info("Advertising failed due to " + str(e))
-                self.log.info("Beacons active: {}".format(
-                    self.beacon_swarm_count))
-        except Exception:
-            self.log.debug(
-                "Something went wrong in starting advertisements, continuing.")
-        return
-
-    def _start_special_advertisements(self):
-        self.log.info("Setting up advertisements.")
+    def _get_beacon_devices(self):
         beacon_serials = []
-        beacon_count = 0
         try:
             beacon_serials = self.user_params['beacon_devices']
-            beacon_count = self.user_params['beacon_count']
+            self.beacon_count = self.user_params['beacon_count']
         except AttributeError:
             self.log.info(
                 "No controllable devices connected to create beacons with."
                 " Continuing...")
-        threads = []
-        for a in self.android_devices:
-            d, e = a.droid, a.ed
-            serial_no = d.getBuildSerial()
-            if serial_no not in beacon_serials:
-                continue
-            thread = threading.Thread(target=self._start_advertisements_thread,
-                                      args=(d, e, beacon_count))
-            threads.append(thread)
-            thread.start()
-        for t in threads:
-            t.join()
-        if self.beacon_swarm_count < (beacon_count * len(beacon_serials)):
+        return [a for a in self.android_devices
+                if a.droid.getBuildSerial() in beacon_serials]
+
+    def _start_special_advertisements(self):
+        self.log.info("Setting up advertisements.")
+        self.beacon_swarm = BleAdvertiserSwarm(self._get_beacon_devices())
+        self.beacon_swarm.start(self.beacon_count, timeout=self.default_timeout)
+        self.advertising_device_name_list = list(
+            self.beacon_swarm.device_names)
+        if self.beacon_swarm.time_to_full_swarm is None:
             self.log.error("Not enough beacons advertising: {}".format(
-                self.beacon_swarm_count))
+                self.beacon_swarm.num_advertising))
             return False
+        self.log.info("Beacon swarm of {} advertisements up in {:.2f}s.".format(
+            self.beacon_swarm.num_advertising,
+            self.beacon_swarm.time_to_full_swarm))
         return True
 
     def _restart_special_advertisements_thread(self):
-        beacon_serials = []
-        beacon_count = 0
-        try:
-            beacon_serials = self.user_params['beacon_devices']
-            beacon_count = self.user_params['beacon_count']
-        except AttributeError:
-            self.log.info("No controllable devices connected to create beacons"
-                          " with. Continuing...")
-        threads = []
+        swarm = BleAdvertiserSwarm(self._get_beacon_devices())
         while True:
             self.log.info("Restarting advertisements.")
-            for a in self.android_devices:
-                d, e = a.droid, a.ed
-                serial_no = d.getBuildSerial()
-                if serial_no not in beacon_serials:
-                    continue
-                thread = threading.Thread(
-                    target=self._start_advertisements_thread,
-                    args=(d, e, beacon_count, True))
-                threads.append(thread)
-                thread.start()
-            for t in threads:
-                t.join()
+            swarm.start(self.beacon_count, restart=True,
+                        timeout=self.default_timeout)
         return True
 
     def test_swarm_1000_on_scan_result(self):
@@ -189,16 +129,13 @@ class BeaconSwarmTest(BluetoothBaseTest):
             self.scn_ad.droid)
         self.scn_ad.droid.bleStartBleScan(filter_list, scan_settings,
                                           scan_callback)
-        for _ in range(1000000):
-            event_info = self.scn_ad.ed.pop_event(
-                scan_result.format(scan_callback), self.default_timeout)
-            mac_address = event_info['data']['Result']['deviceInfo']['address']
-            if mac_address not in self.discovered_mac_address_list:
-                self.discovered_mac_address_list.append(mac_address)
-                self.log.info("Discovered {} different devices.".format(len(
-                    self.discovered_mac_address_list)))
-        self.log.debug("Discovered {} different devices.".format(len(
-            self.discovered_mac_address_list)))
+        aggregator = BleScanAggregator(self.scn_ad.ed, [scan_callback])
+        while aggregator.num_results < 1000000:
+            if aggregator.drain(self.default_timeout):
+                self.log.info("Discovered {} different devices.".format(
+                    aggregator.num_devices))
+        self.log.debug("Discovered {} different devices.".format(
+            aggregator.num_devices))
         self.scn_ad.droid.bleStopBleScan(scan_callback)
         return True
 
@@ -232,15 +169,12 @@ class BeaconSwarmTest(BluetoothBaseTest):
             self.scn_ad.droid)
         self.scn_ad.droid.bleStartBleScan(filter_list, scan_settings,
                                           scan_callback)
-        for _ in range(10000):
-            event_info = self.scn_ad.ed.pop_event(
-                batch_scan_result.format(scan_callback), self.default_timeout)
-            for result in event_info['data']['Results']:
-                mac_address = result['deviceInfo']['address']
-                if mac_address not in self.discovered_mac_address_list:
-                    self.discovered_mac_address_list.append(mac_address)
-        self.log.info("Discovered {} different devices.".format(len(
-            self.discovered_mac_address_list)))
+        aggregator = BleScanAggregator(self.scn_ad.ed, [scan_callback],
+                                       batch=True)
+        while aggregator.num_events < 10000:
+            aggregator.drain(self.default_timeout)
+        self.log.info("Discovered {} different devices.".format(
+            aggregator.num_devices))
         self.scn_ad.droid.bleStopBleScan(scan_callback)
         return True
 
@@ -281,8 +215,10 @@ class BeaconSwarmTest(BluetoothBaseTest):
                 self.scn_ad.droid.bleBuildScanFilter(filter_list)
                 self.scn_ad.droid.bleStartBleScan(filter_list, scan_settings,
                                                   scan_callback)
-                self.log.debug(self.scn_ad.ed.pop_event(
-                    scan_result.format(scan_callback), self.default_timeout))
+                aggregator = BleScanAggregator(self.scn_ad.ed,
+                                               [scan_callback])
+                aggregator.drain(self.default_timeout)
+                self.log.debug(aggregator.devices)
             except Exception:
                 self.log.info("Couldn't find advertiser name {}.".format(
                     filter_name))
@@ -331,17 +267,10 @@ class BeaconSwarmTest(BluetoothBaseTest):
             target=self._restart_special_advertisements_thread,
             args=())
         thread.start()
-        n = 0
-        while n < 10000:
-            for cb in scan_callback_list:
-                event_info = self.scn_ad.ed.pop_event(
-                    scan_result.format(cb), self.default_timeout)
-                mac_address = event_info['data']['Result']['deviceInfo'][
-                    'address']
-                if mac_address not in self.discovered_mac_address_list:
-                    self.discovered_mac_address_list.append(mac_address)
-                self.log.info("Discovered {} different devices.".format(len(
-                    self.discovered_mac_address_list)))
-                n += 1
+        aggregator = BleScanAggregator(self.scn_ad.ed, scan_callback_list)
+        while aggregator.num_events < 10000:
+            aggregator.drain(self.default_timeout)
+            self.log.info("Discovered {} different devices.".format(
+                aggregator.num_devices))
         self.scn_ad.droid.bleStopBleScan(scan_callback)
         return True
@@ -28,6 +28,7 @@ from acts.test_utils.bt.bt_test_utils import log_energy_info
 from acts.test_utils.bt.bt_test_utils import kill_bluetooth_process
 from acts.test_utils.bt.bt_test_utils import orchestrate_rfcomm_connection
 from acts.test_utils.bt.bt_test_utils import reset_bluetooth
+from acts.test_utils.bt.bt_test_utils import RfcommThroughputBenchmark
 from acts.test_utils.bt.bt_test_utils import setup_multiple_devices_for_bt_test
 from acts.test_utils.bt.bt_test_utils import take_btsnoop_logs
 from acts.test_utils.bt.bt_test_utils import write_read_verify_data
@@ -40,6 +41,7 @@ class RfcommTest(BluetoothBaseTest):
     default_timeout = 10
     rf_client_th = 0
     scan_discovery_time = 5
+    throughput_duration = 30
     message = (
         "Space: the final frontier. These are the voyages of "
         "the starship Enterprise. Its continuing mission: to explore "
@@ -185,6 +187,46 @@ class RfcommTest(BluetoothBaseTest):
         self.server_ad.droid.bluetoothRfcommStop()
         return True
 
+    @BluetoothBaseTest.bt_test_wrap
+    def test_rfcomm_throughput(self):
+        """Test bluetooth RFCOMM data throughput
+
+        Measure the throughput of an RFCOMM connection with a writer and a
+        reader running at the same time.
+
+        Steps:
+        1. Get the mac address of the server device.
+        2. Establish an RFCOMM connection from the client to the server AD.
+        3. Write data from the client and read it from the server for
+        throughput_duration seconds.
+        4. Verify the sequence and checksum of the data read.
+        5. Disconnect the RFCOMM connection.
+
+        Expected Result:
+        All the data written is read back in order. The throughput and
+        latency percentiles are logged.
+
+        Returns:
+          Pass if True
+          Fail if False
+
+        TAGS: Classic, RFCOMM, Performance
+        Priority: 2
+        """
+        if not orchestrate_rfcomm_connection(self.client_ad, self.server_ad):
+            return False
+        try:
+            benchmark = RfcommThroughputBenchmark(self.client_ad,
+                                                  self.server_ad)
+            result = benchmark.run(duration=self.throughput_duration)
+        finally:
+            self.client_ad.droid.bluetoothRfcommStop()
+            self.server_ad.droid.bluetoothRfcommStop()
+        if result is None:
+            return False
+        self.log.info("RFCOMM throughput result: {}".format(result))
+        return True
+
     @BluetoothBaseTest.bt_test_wrap
     def test_rfcomm_accept_timeout(self):
         """Test bluetooth RFCOMM accept socket timeout
@@ -19,7 +19,6 @@ This test was designed to be run in a shield box.
 """
 
 import threading
-import time
 from random import randint
 
 from queue import Empty
@@ -29,6 +28,7 @@ from acts.test_utils.bt.BluetoothBaseTest import BluetoothBaseTest
 from acts.test_utils.bt.bt_test_utils import rfcomm_accept
 from acts.test_utils.bt.bt_test_utils import rfcomm_connect
 from acts.test_utils.bt.bt_test_utils import take_btsnoop_logs
+from acts.test_utils.bt.bt_test_utils import wait_for_bt_condition
 from acts.test_utils.bt.bt_test_utils import write_read_verify_data
 
 class RfcommLongevityTest(BluetoothBaseTest):
@@ -65,7 +65,14 @@ class RfcommLongevityTest(BluetoothBaseTest):
                 break
             else:
                 self.log.info("Failed to reset bluetooth state, retrying...")
-        time.sleep(20) #safeguard in case of connId errors
+        # Safeguard in case of connId errors: wait for the connections to be
+        # torn down instead of sleeping.
+        if not wait_for_bt_condition(
+                lambda: not any(a.droid.bluetoothRfcommActiveConnections()
+                                for a in self.android_devices),
+                timeout=20,
+                replaced_sleep=20):
+            self.log.error("RFCOMM connections still active after reset.")
 
     def orchestrate_rfcomm_connect(self, server_mac):
         accept_thread = threading.Thread(target=rfcomm_accept,
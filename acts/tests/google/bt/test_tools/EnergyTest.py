@@ -14,24 +14,56 @@
 # License for the specific language governing permissions and limitations under
 # the License.
 """
-Continuously poll for energy info for a single Android Device
+Continuously sample the energy info of a single Android Device
 """
 
-from queue import Empty
+import time
+
 from acts.test_utils.bt.BluetoothBaseTest import BluetoothBaseTest
+from acts.test_utils.bt.bt_energy_utils import DEFAULT_ENERGY_SAMPLE_INTERVAL
+from acts.test_utils.bt.bt_energy_utils import EnergyInfoSampler
 
 
 class EnergyTest(BluetoothBaseTest):
+    # Default seconds the energy info is sampled for.
+    DEFAULT_REPORT_DURATION = 3600
+
     def __init__(self, controllers):
         BluetoothBaseTest.__init__(self, controllers)
         self.tests = ("test_continuous_energy_report", )
 
     @BluetoothBaseTest.bt_test_wrap
     def test_continuous_energy_report(self):
-        while (True):
-            try:
-                self.log.info(self.android_devices[
-                    0].droid.bluetoothGetControllerActivityEnergyInfo(1))
-            except Exception:
-                self.log.error("Failed to log energy info... continuing.")
+        """Samples the energy info of the first device at a fixed cadence.
+
+        The samples are exported to the log directory, next to the Monsoon
+        data if any, and the energy info deltas are logged every minute.
+        The energy_report_duration and energy_sample_interval user params
+        set the duration and cadence of the sampling. The sampler of the
+        test class is used if energy_sample_interval is set.
+        """
+        duration = float(self.user_params.get("energy_report_duration",
+                                              self.DEFAULT_REPORT_DURATION))
+        sampler = self.energy_sampler
+        if sampler is None:
+            sampler = EnergyInfoSampler(self.android_devices[:1],
+                                        DEFAULT_ENERGY_SAMPLE_INTERVAL)
+            sampler.start()
+        try:
+            end_time = time.time() + duration
+            minute = 0
+            while time.time() < end_time:
+                name = "minute_{}".format(minute)
+                sampler.begin_phase(name)
+                time.sleep(min(60, max(0, end_time - time.time())))
+                self.log.info("Energy info deltas of {}: {}".format(
+                    name, sampler.end_phase(name)))
+                minute += 1
+        finally:
+            if sampler is not self.energy_sampler:
+                sampler.stop()
+                sampler.export(self.log_path)
+        if sampler.num_errors:
+            self.log.error("Failed to sample the energy info {} times."
+                           .format(sampler.num_errors))
         return True
@@ -111,7 +111,8 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
             for ad, setup_func in zip(ads, phone_setups):
                 if setup_func is not None:
                     tasks.append((setup_func, (self.log, ad)))
-            if tasks != [] and not multithread_func(self.log, tasks):
+            if tasks != [] and not multithread_func(
+                    self.log, tasks, fail_fast=True):
                 self.log.error("Phone Failed to Set Up Properly.")
                 raise _CallException("Setup failed.")
             for ad in ads:
@@ -181,7 +182,8 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
             for ad, setup_func in zip(ads, phone_setups):
                 if setup_func is not None:
                     tasks.append((setup_func, (self.log, ad)))
-            if tasks != [] and not multithread_func(self.log, tasks):
+            if tasks != [] and not multithread_func(
+                    self.log, tasks, fail_fast=True):
                 self.log.error("Phone Failed to Set Up Properly.")
                 raise _CallException("Setup failed.")
             for ad in ads:
@@ -295,7 +297,8 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
             for ad, setup_func in zip(ads, phone_setups):
                 if setup_func is not None:
                     tasks.append((setup_func, (self.log, ad)))
-            if tasks != [] and not multithread_func(self.log, tasks):
+            if tasks != [] and not multithread_func(
+                    self.log, tasks, fail_fast=True):
                 self.log.error("Phone Failed to Set Up Properly.")
                 raise _CallException("Setup failed.")
             for ad in ads:
@@ -7051,7 +7054,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_ONLY,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7085,7 +7088,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7119,7 +7122,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_ONLY,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7153,7 +7156,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7187,7 +7190,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_ONLY,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7221,7 +7224,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7251,7 +7254,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_volte, (self.log, ads[1])), (phone_setup_volte,
                                                            (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7281,7 +7284,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_volte, (self.log, ads[1])), (phone_setup_volte,
                                                            (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7311,7 +7314,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_volte, (self.log, ads[1])), (phone_setup_volte,
                                                            (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7341,7 +7344,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_volte, (self.log, ads[1])), (phone_setup_volte,
                                                            (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7371,7 +7374,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])),
                  (phone_setup_voice_3g, (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7401,7 +7404,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])),
                  (phone_setup_voice_3g, (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7431,7 +7434,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])),
                  (phone_setup_voice_3g, (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7461,7 +7464,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])),
                  (phone_setup_voice_3g, (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7491,7 +7494,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])),
                  (phone_setup_voice_3g, (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7521,7 +7524,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])), (phone_setup_voice_3g,
                                                         (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7551,7 +7554,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])), (phone_setup_voice_3g,
                                                         (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7581,7 +7584,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])), (phone_setup_voice_3g,
                                                         (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7614,7 +7617,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_ONLY,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7647,7 +7650,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7681,7 +7684,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_ONLY,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7716,7 +7719,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7749,7 +7752,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_ONLY,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7782,7 +7785,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7816,7 +7819,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_ONLY,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7851,7 +7854,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7880,7 +7883,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_volte, (self.log, ads[1])), (phone_setup_volte,
                                                            (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7910,7 +7913,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_volte, (self.log, ads[1])), (phone_setup_volte,
                                                            (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7940,7 +7943,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_volte, (self.log, ads[1])), (phone_setup_volte,
                                                            (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -7971,7 +7974,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_volte, (self.log, ads[1])), (phone_setup_volte,
                                                            (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8000,7 +8003,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_volte, (self.log, ads[1])), (phone_setup_volte,
                                                            (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8030,7 +8033,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_volte, (self.log, ads[1])), (phone_setup_volte,
                                                            (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8060,7 +8063,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_volte, (self.log, ads[1])), (phone_setup_volte,
                                                            (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8091,7 +8094,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_volte, (self.log, ads[1])), (phone_setup_volte,
                                                            (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8120,7 +8123,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])), (phone_setup_voice_3g,
                                                         (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8150,7 +8153,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])), (phone_setup_voice_3g,
                                                         (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8180,7 +8183,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])), (phone_setup_voice_3g,
                                                         (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8211,7 +8214,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])), (phone_setup_voice_3g,
                                                         (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8240,7 +8243,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])), (phone_setup_voice_3g,
                                                         (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8270,7 +8273,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])), (phone_setup_voice_3g,
                                                         (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8300,7 +8303,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])), (phone_setup_voice_3g,
                                                         (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8331,7 +8334,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])), (phone_setup_voice_3g,
                                                         (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8360,7 +8363,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])), (phone_setup_voice_3g,
                                                         (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8389,7 +8392,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])), (phone_setup_voice_3g,
                                                         (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8419,7 +8422,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])), (phone_setup_voice_3g,
                                                         (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8449,7 +8452,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])), (phone_setup_voice_3g,
                                                         (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8478,7 +8481,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])), (phone_setup_voice_3g,
                                                         (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8507,7 +8510,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])), (phone_setup_voice_3g,
                                                         (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8537,7 +8540,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])), (phone_setup_voice_3g,
                                                         (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8567,7 +8570,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_3g, (self.log, ads[1])), (phone_setup_voice_3g,
                                                         (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8599,7 +8602,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_ONLY,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8636,7 +8639,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8673,7 +8676,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_ONLY,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8711,7 +8714,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8749,7 +8752,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8786,7 +8789,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_ONLY,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8823,7 +8826,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8860,7 +8863,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_ONLY,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8898,7 +8901,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8934,7 +8937,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_ONLY,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -8970,7 +8973,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -9006,7 +9009,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_ONLY,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -9043,7 +9046,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -9080,7 +9083,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -9116,7 +9119,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_ONLY,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -9151,7 +9154,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -9186,7 +9189,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -9221,7 +9224,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_ONLY,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -9258,7 +9261,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], False, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -9536,7 +9539,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -9581,7 +9584,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -9626,7 +9629,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -9671,7 +9674,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -9716,7 +9719,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -9761,7 +9764,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -9806,7 +9809,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -9851,7 +9854,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -9896,7 +9899,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -9941,7 +9944,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -9986,7 +9989,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -10031,7 +10034,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -10076,7 +10079,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -10121,7 +10124,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -10166,7 +10169,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -10213,7 +10216,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -10260,7 +10263,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -10307,7 +10310,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                  (phone_setup_iwlan,
                   (self.log, ads[2], True, WFC_MODE_WIFI_PREFERRED,
                    self.wifi_network_ssid, self.wifi_network_pass))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -10325,7 +10328,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
         tasks = [(phone_setup_3g, (self.log, ads[0])),
                  (phone_setup_voice_general, (self.log, ads[1])),
                  (phone_setup_voice_general, (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -10341,7 +10344,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
         tasks = [(phone_setup_3g, (self.log, ads[0])),
                  (phone_setup_voice_general, (self.log, ads[1])),
                  (phone_setup_voice_general, (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -10357,7 +10360,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
         tasks = [(phone_setup_3g, (self.log, ads[0])),
                  (phone_setup_voice_general, (self.log, ads[1])),
                  (phone_setup_voice_general, (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -10373,7 +10376,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
         tasks = [(phone_setup_3g, (self.log, ads[0])),
                  (phone_setup_voice_general, (self.log, ads[1])),
                  (phone_setup_voice_general, (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -10389,7 +10392,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
         tasks = [(phone_setup_volte, (self.log, ads[0])),
                  (phone_setup_voice_general, (self.log, ads[1])),
                  (phone_setup_voice_general, (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -10405,7 +10408,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
         tasks = [(phone_setup_volte, (self.log, ads[0])),
                  (phone_setup_voice_general, (self.log, ads[1])),
                  (phone_setup_voice_general, (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -10423,7 +10426,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_general, (self.log, ads[1])),
                  (phone_setup_voice_general, (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -10441,7 +10444,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_general, (self.log, ads[1])),
                  (phone_setup_voice_general, (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -10459,7 +10462,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_general, (self.log, ads[1])),
                  (phone_setup_voice_general, (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -10477,7 +10480,7 @@ class TelLiveVoiceConfTest(TelephonyBaseTest):
                    self.wifi_network_ssid, self.wifi_network_pass)),
                  (phone_setup_voice_general, (self.log, ads[1])),
                  (phone_setup_voice_general, (self.log, ads[2]))]
-        if not multithread_func(self.log, tasks):
+        if not multithread_func(self.log, tasks, fail_fast=True):
             self.log.error("Phone Failed to Set Up Properly.")
             return False
 
@@ -29,141 +29,56 @@ SCAN_EVENT_TAG = "WifiScannerScan"
 
 class WifiScanResultEvents():
     """This class stores the setting of a scan, parameters generated
-    from starting the scan, and events reported later from the scan
-    for validation.
+    from starting the scan, and validates the events reported later from the
+    scan as they arrive.
 
     Attributes:
         scan_setting: Setting used to perform the scan.
         scan_channels: Channels used for scanning.
-        events: A list to store the scan result events.
+        validator: The WifiScanResultValidator checking the result events.
     """
 
     def __init__(self, scan_setting, scan_channels):
         self.scan_setting = scan_setting
         self.scan_channels = scan_channels
-        self.results_events = []
+        self.validator = wutils.WifiScanResultValidator(
+            scan_setting,
+            scan_channels,
+            check_interval=True,
+            check_num_bssids=True)
 
     def add_results_event(self, event):
-        self.results_events.append(event)
+        """Validates a result event as soon as it is received.
 
-    def check_interval(self, scan_result, scan_result_next):
-        """Verifies that the time gap between two consecutive results is within
-        expected range.
-
-        Right now it is hard coded to be 20 percent of the interval specified
-        by scan settings. This threshold can be imported from the configuration
-        file in the future if necessary later.
-
-        Note the scan result timestamps are in microseconds, but "periodInMs"
-        in scan settings is in milliseconds.
-
-        Args:
-            scan_result: A dictionary representing a scan result for a BSSID.
-            scan_result_next: A dictionary representing a scan result for a
-                BSSID, whose scan happened after scan_result.
-        """
-        actual_interval = scan_result_next["timestamp"] - scan_result[
-            "timestamp"]
-        expected_interval = self.scan_setting['periodInMs'] * 1000
-        delta = abs(actual_interval - expected_interval)
-        margin = expected_interval * 0.20  # 20% of the expected_interval
-        asserts.assert_true(
-            delta < margin, "The difference in time between scan %s and "
-            "%s is %dms, which is out of the expected range %sms" % (
-                scan_result, scan_result_next, delta / 1000,
-                self.scan_setting['periodInMs']))
-
-    def verify_one_scan_result(self, scan_result):
-        """Verifies the scan result of a single BSSID.
-
-        1. Verifies the frequency of the network is within the range requested
-        in the scan.
-
-        Args:
-            scan_result: A dictionary representing the scan result of a single
-                BSSID.
-        """
-        freq = scan_result["frequency"]
-        asserts.assert_true(
-            freq in self.scan_channels,
-            "Frequency %d of result entry %s is out of the expected range %s."
-            % (freq, scan_result, self.scan_channels))
-        # TODO(angli): add RSSI check.
-
-    def verify_one_scan_result_group(self, batch):
-        """Verifies a group of scan results obtained during one scan.
-
-        1. Verifies the number of BSSIDs in the batch is less than the
-        threshold set by scan settings.
-        2. Verifies each scan result for individual BSSID.
-
-        Args:
-            batch: A list of dictionaries, each dictionary represents a scan
-                result.
+        1. For batch scan, the number of buffered results in the event should
+           be no more than what the scan setting specified.
+        2. Each scan result should contain no more BBSIDs than what scan
+           setting specified.
+        3. The frequency reported by each scan result should comply with its
+           scan setting.
+        4. The time gap between two consecutive scan results, within the event
+           or with the last result of the previous event, should be
+           approximately equal to the scan interval specified by the scan
+           setting.
         """
-        scan_results = batch["ScanResults"]
-        actual_num_of_results = len(scan_results)
-        expected_num_of_results = self.scan_setting['numBssidsPerScan']
-        asserts.assert_true(actual_num_of_results <= expected_num_of_results,
-                            "Expected no more than %d BSSIDs, got %d." %
-                            (expected_num_of_results, actual_num_of_results))
-        for scan_result in scan_results:
-            self.verify_one_scan_result(scan_result)
+        self.validator.validate_results(event["data"]["Results"])
 
     def have_enough_events(self):
         """Check if there are enough events to properly validate the scan"""
-        return len(self.results_events) >= 2
+        return self.validator.num_events >= 2
 
     def check_scan_results(self):
         """Validate the reported scan results against the scan settings.
         Assert if any error detected in the results.
 
-        1. For each scan setting there should be no less than 2 events received.
-        2. For batch scan, the number of buffered results in each event should
-           be exactly what the scan setting specified.
-        3. Each scan result should contain no more BBSIDs than what scan
-           setting specified.
-        4. The frequency reported by each scan result should comply with its
-           scan setting.
-        5. The time gap between two consecutive scan results should be
-           approximately equal to the scan interval specified by the scan
-           setting.
+        The results themselves are validated as the events arrive, this checks
+        that no less than 2 events were received for the scan setting.
         """
-        num_of_events = len(self.results_events)
+        num_of_events = self.validator.num_events
         asserts.assert_true(
             num_of_events >= 2,
             "Expected more than one scan result events, got %d." %
             num_of_events)
-        for event_idx in range(num_of_events):
-            batches = self.results_events[event_idx]["data"]["Results"]
-            actual_num_of_batches = len(batches)
-            # For batch scan results.
-            report_type = self.scan_setting['reportEvents']
-            if not (report_type & WifiEnums.REPORT_EVENT_AFTER_EACH_SCAN):
-                # Verifies that the number of buffered results matches the
-                # number defined in scan settings.
-                expected_num_of_batches = self.scan_setting['maxScansToCache']
-                asserts.assert_true(
-                    actual_num_of_batches <= expected_num_of_batches,
-                    "Expected to get at most %d batches in event No.%d, got %d."
-                    % (expected_num_of_batches, event_idx,
-                       actual_num_of_batches))
-                # Check the results within each event of batch scan
-                for batch_idx in range(1, actual_num_of_batches):
-                    self.check_interval(
-                        batches[batch_idx - 1]["ScanResults"][0],
-                        batches[batch_idx]["ScanResults"][0])
-            for batch in batches:
-                self.verify_one_scan_result_group(batch)
-
-            # Check the time gap between the first result of an event and
-            # the last result of its previous event
-            # Skip the very first event.
-            if event_idx >= 1:
-                previous_batches = self.results_events[event_idx - 1]["data"][
-                    "Results"]
-                self.check_interval(previous_batches[-1]["ScanResults"][0],
-                                    batches[0]["ScanResults"][0])
 
 
 class WifiScannerMultiScanTest(base_test.BaseTestClass):
@@ -179,6 +179,7 @@ class WifiScannerScanTest(base_test.BaseTestClass):
         wifi networks in results are of the correct frequencies set by scan setting
         params. Then it checks that the delta between the batch of scan results less
         than the time required for scanning channel set by scan setting params.
+        Invalid results are logged, callers check the returned validity.
 
         Args:
             scan_results: scan results reported.
@@ -190,32 +191,15 @@ class WifiScannerScanTest(base_test.BaseTestClass):
             bssids: total number of bssids scan result have
             validity: True if the all scan result are valid.
         """
-        bssids = 0
-        validity = True
-        scan_time_mic = 0
-        scan_channels = []
         scan_time, scan_channels = wutils.get_scan_time_and_channels(
             self.wifi_chs, scan_setting, self.stime_channel)
-        scan_time_mic = scan_time * 1000
+        validator = wutils.WifiScanResultValidator(
+            scan_setting, scan_channels, scan_time=scan_time, scan_rt=scan_rt,
+            strict=False)
         for i, batch in enumerate(scan_resutls, start=1):
-            asserts.assert_true(
-                batch["ScanResults"],
-                "At least one scan result is required to validate")
-            max_scan_interval = batch["ScanResults"][0][
-                "timestamp"] + scan_time_mic
-            self.log.debug("max_scan_interval: %s", max_scan_interval)
-            for result in batch["ScanResults"]:
-                if (result["frequency"] not in scan_channels or
-                        result["timestamp"] > max_scan_interval or
-                        result["timestamp"] < scan_rt * 1000 or
-                        result["timestamp"] > result_rt * 1000):
-                    self.log.error("Result didn't match requirement: %s",
-                                   result)
-                    validity = False
-            self.log.info("Number of scan result in batch %s: %s", i,
-                          len(batch["ScanResults"]))
-            bssids += len(batch["ScanResults"])
-        return bssids, validity
+            bssids = validator.validate_batch(batch, result_rt)
+            self.log.info("Number of scan result in batch %s: %s", i, bssids)
+        return validator.num_bssids, validator.valid
 
     def pop_scan_result_events(self, event_name):
         """Function to pop all the scan result events.
@@ -435,6 +419,7 @@ class WifiScannerScanTest(base_test.BaseTestClass):
                 self.log.info("Waiting for event: %s for time %s", event_name,
                               wait_time)
                 event = self.dut.ed.pop_event(event_name, wait_time)
+                event_time = time.monotonic()
                 self.log.debug("Event received: %s", event)
                 results = event["data"]["Results"]
                 bssids, validity = (self.proces_and_valid_batch_scan_result(
@@ -448,7 +433,11 @@ class WifiScannerScanTest(base_test.BaseTestClass):
                 asserts.assert_true(validity, INVALID_RESULT)
                 if snumber % 2 == 1 and check_get_result:
                     self.log.info("Get Scan result using GetScanResult API")
-                    time.sleep(wait_time / number_bucket)
+                    # Wait for at least one scan to be cached since the buffer
+                    # was reported.
+                    time.sleep(max(0, event_time + (scan_setting["periodInMs"]
+                                                    + scan_time) / 1000 -
+                                   time.monotonic()))
                     if self.dut.droid.wifiScannerGetScanResults():
                         event = self.dut.ed.pop_event(event_name, 1)
                         self.log.debug("Event onResults: %s", event)